@@ -0,0 +1,81 @@
+"""Outcome attainment from course content scores.
+
+A course outcome's attainment is the weighted average of the scores of the
+course contents that feed it (CC -> CO relation weights); a program
+outcome's is the weighted average of its course outcomes' attainments
+(CO -> PO weights). Inputs a student has no score for are left out of the
+average rather than counted as zero.
+"""
+
+from itertools import groupby
+
+from giraph.models import LayerChoices, Node, Relation
+
+from .models import StudentScore
+
+
+class CourseMatrices:
+    """The weight structure of one course graph, loaded in two queries.
+
+    ``co_inputs`` maps each course outcome id to its ``[(cc_id, weight)]``
+    and ``po_inputs`` each linked program outcome id to its
+    ``[(co_id, weight)]``.
+    """
+
+    def __init__(self, course_id):
+        self.course_id = course_id
+        self.course_outcomes = list(
+            Node.objects.filter(course_id=course_id, layer=LayerChoices.COURSE_OUTCOME)
+            .order_by("id")
+            .values_list("id", "name")
+        )
+        self.co_inputs = {co_id: [] for co_id, _ in self.course_outcomes}
+        self.po_inputs = {}
+        po_names = {}
+        relations = Relation.objects.filter(node1__course_id=course_id).values_list(
+            "node1_id", "node1__layer", "node2_id", "node2__layer", "node2__name", "weight"
+        )
+        for node1_id, layer1, node2_id, layer2, name2, weight in relations:
+            if layer1 == LayerChoices.COURSE_CONTENT and node2_id in self.co_inputs:
+                self.co_inputs[node2_id].append((node1_id, weight))
+            elif layer1 == LayerChoices.COURSE_OUTCOME and layer2 == LayerChoices.PROGRAM_OUTCOME:
+                self.po_inputs.setdefault(node2_id, []).append((node1_id, weight))
+                po_names[node2_id] = name2
+        self.program_outcomes = sorted(po_names.items())
+
+
+def weighted_average(values, inputs):
+    total = weight_sum = 0.0
+    for input_id, weight in inputs:
+        value = values.get(input_id)
+        if value is not None:
+            total += value * weight
+            weight_sum += weight
+    return total / weight_sum if weight_sum else None
+
+
+def attainment(scores, matrices):
+    """Return ``(co_values, po_values)`` for one student's ``{cc_id: score}``,
+    keyed by node id."""
+    co_values = {
+        co_id: weighted_average(scores, inputs)
+        for co_id, inputs in matrices.co_inputs.items()
+    }
+    po_values = {
+        po_id: weighted_average(co_values, inputs)
+        for po_id, inputs in matrices.po_inputs.items()
+    }
+    return co_values, po_values
+
+
+def student_scores(course_id, chunk_size=2000):
+    """Yield ``(student_id, {cc_id: score})`` for every student of the
+    course, one at a time, from a single streamed query."""
+    rows = (
+        StudentScore.objects.filter(course_id=course_id)
+        .order_by("student_id")
+        .values_list("student_id", "node_id", "score")
+        .iterator(chunk_size=chunk_size)
+    )
+    for student_id, group in groupby(rows, key=lambda row: row[0]):
+        yield student_id, {node_id: score for _, node_id, score in group}
@@ -0,0 +1,106 @@
+"""Attainment reports as streamed CSV or XLSX.
+
+Reports are generators of rows: the header first, then one row per student,
+computed while the response is being sent. Only one student's scores are
+held at a time, so memory stays flat however many students there are.
+"""
+
+import csv
+import io
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+from giraph.models import LayerChoices, Node
+from programs.models import Program
+
+from .compute import CourseMatrices, attainment, student_scores
+
+try:
+    import openpyxl
+except ImportError:  # optional, only needed for XLSX
+    openpyxl = None
+
+CSV_CHUNK_SIZE = 64 * 1024
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _cell(value):
+    return "" if value is None else round(value, 2)
+
+
+def course_report(course):
+    """Per student: CC scores, then CO and PO attainment of one course."""
+    matrices = CourseMatrices(course.id)
+    contents = list(
+        Node.objects.filter(course=course, layer=LayerChoices.COURSE_CONTENT)
+        .order_by("id")
+        .values_list("id", "name")
+    )
+    yield [
+        "student_id",
+        *(f"CC: {name}" for _, name in contents),
+        *(f"CO: {name}" for _, name in matrices.course_outcomes),
+        *(f"PO: {name}" for _, name in matrices.program_outcomes),
+    ]
+    for student_id, scores in student_scores(course.id):
+        co_values, po_values = attainment(scores, matrices)
+        yield [
+            student_id,
+            *(_cell(scores.get(cc_id)) for cc_id, _ in contents),
+            *(_cell(co_values[co_id]) for co_id, _ in matrices.course_outcomes),
+            *(_cell(po_values[po_id]) for po_id, _ in matrices.program_outcomes),
+        ]
+
+
+def department_report():
+    """PO attainment of every student in every course."""
+    outcomes = list(
+        Node.objects.filter(layer=LayerChoices.PROGRAM_OUTCOME)
+        .order_by("id")
+        .values_list("id", "name")
+    )
+    yield ["course", "student_id", *(f"PO: {name}" for _, name in outcomes)]
+    courses = list(Program.objects.order_by("name", "id").values_list("id", "name"))
+    for course_id, course_name in courses:
+        matrices = CourseMatrices(course_id)
+        for student_id, scores in student_scores(course_id):
+            _, po_values = attainment(scores, matrices)
+            yield [
+                course_name,
+                student_id,
+                *(_cell(po_values.get(po_id)) for po_id, _ in outcomes),
+            ]
+
+
+def _csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CSV_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def csv_response(rows, filename):
+    response = StreamingHttpResponse(_csv_chunks(rows), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def xlsx_response(rows, filename):
+    """XLSX is a zip archive, so it can only be sent once complete. The
+    write-only workbook spools rows to disk as they come, which keeps
+    memory flat; the finished file is then streamed from disk."""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Attainment")
+    for row in rows:
+        sheet.append(row)
+    spool = tempfile.TemporaryFile()
+    workbook.save(spool)
+    spool.seek(0)
+    return FileResponse(
+        spool, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE
+    )
@@ -0,0 +1,45 @@
+import numpy as np
+from jobs.registry import HEAD_ROLES, register
+from programs.models import Program
+
+from .whatif import base_state
+
+
+def _cohort_means(values, index, names):
+    means = []
+    for node_id, column in index.items():
+        defined = values[:, column][~np.isnan(values[:, column])]
+        means.append(
+            {
+                "id": node_id,
+                "name": names[node_id],
+                "mean": round(float(defined.mean()), 2) if defined.size else None,
+                "students": int(defined.size),
+            }
+        )
+    return means
+
+
+@register("attainment_rollup", roles=HEAD_ROLES)
+def attainment_rollup(job, course_ids=None):
+    """Cohort mean CO and PO attainment of the given courses, or of every
+    course in the department."""
+    courses = Program.objects.order_by("name", "id")
+    if course_ids:
+        courses = courses.filter(pk__in=course_ids)
+    courses = list(courses.values_list("id", "name"))
+
+    rollup = []
+    for done, (course_id, name) in enumerate(courses, start=1):
+        state = base_state(course_id)
+        rollup.append(
+            {
+                "course_id": str(course_id),
+                "name": name,
+                "students": len(state.student_ids),
+                "course_outcomes": _cohort_means(state.co, state.co_index, state.co_names),
+                "program_outcomes": _cohort_means(state.po, state.po_index, state.po_names),
+            }
+        )
+        job.report(done / len(courses), f"Rolled up {name}")
+    return {"courses": rollup}
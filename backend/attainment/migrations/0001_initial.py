@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('giraph', '0004_graphversion_graphpayload'),
+        ('programs', '0003_program_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_id', models.CharField(max_length=50)),
+                ('score', models.FloatField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='programs.program')),
+                ('node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='giraph.node')),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attainment', '0001_initial'),
+        ('giraph', '0004_graphversion_graphpayload'),
+        ('programs', '0003_program_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentscore',
+            name='course',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='programs.program'),
+        ),
+        migrations.AddConstraint(
+            model_name='studentscore',
+            constraint=models.UniqueConstraint(fields=('course', 'student_id', 'node'), name='unique_student_score'),
+        ),
+    ]
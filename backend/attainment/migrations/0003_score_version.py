@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attainment', '0002_unique_student_score'),
+        ('programs', '0003_program_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreVersion',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='programs.program')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
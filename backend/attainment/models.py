@@ -0,0 +1,45 @@
+from django.db import models
+from giraph.models import Node
+from programs.models import Program
+
+
+class StudentScore(models.Model):
+    """One student's score (0-100) on one course content node.
+
+    Rows are written with bulk upserts (see store.py). The unique
+    (course, student_id, node) index doubles as the read path: a course's
+    scores come out of it already grouped by student.
+    """
+
+    # Lookups by course use the unique index below
+    course = models.ForeignKey(
+        Program, on_delete=models.CASCADE, related_name="scores", db_index=False
+    )
+    student_id = models.CharField(max_length=50)
+    node = models.ForeignKey(Node, on_delete=models.CASCADE, related_name="scores")
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["course", "student_id", "node"],
+                name="unique_student_score",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} | {self.node_id} = {self.score}"
+
+
+class ScoreVersion(models.Model):
+    """Change stamp of a course's stored scores, bumped by
+    store.upsert_scores once the upload commits. Caches derived from the
+    scores key themselves on it."""
+
+    course = models.OneToOneField(
+        Program, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.course_id} @ {self.version}"
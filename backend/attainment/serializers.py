@@ -0,0 +1,13 @@
+from rest_framework import serializers
+
+
+# /api/attainment/whatif
+class WhatIfChangeSerializer(serializers.Serializer):
+    node1_id = serializers.IntegerField()
+    node2_id = serializers.IntegerField()
+    # 0 removes the edge
+    weight = serializers.ChoiceField(choices=[0, 1, 2, 3, 4, 5])
+
+
+class WhatIfSerializer(serializers.Serializer):
+    changes = WhatIfChangeSerializer(many=True, allow_empty=False, max_length=500)
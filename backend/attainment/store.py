@@ -0,0 +1,135 @@
+"""Writing and bulk-reading student scores."""
+
+import csv
+import time
+from itertools import islice
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from giraph.models import LayerChoices, Node
+
+from .models import ScoreVersion, StudentScore
+
+UPSERT_BATCH_SIZE = 1000
+
+
+def score_version(course_id):
+    """Current stamp of a course's scores (0 before the first upload)."""
+    return (
+        ScoreVersion.objects.filter(pk=course_id).values_list("version", flat=True).first()
+        or 0
+    )
+
+
+def bump_score_version(course_id):
+    """Move the course's stamp forward: the larger of the clock and the
+    old version plus one, so it never comes back to a served value."""
+    now = time.time_ns()
+    with transaction.atomic():
+        ScoreVersion.objects.bulk_create(
+            [ScoreVersion(course_id=course_id, version=now)], ignore_conflicts=True
+        )
+        ScoreVersion.objects.filter(pk=course_id).update(
+            version=Greatest(F("version") + 1, Value(now))
+        )
+
+
+def upsert_scores(course_id, rows, batch_size=UPSERT_BATCH_SIZE):
+    """Insert or update ``(student_id, node_id, score)`` rows of a course.
+
+    Each batch is one ``INSERT ... ON CONFLICT DO UPDATE``, so re-uploading
+    a sheet overwrites scores in place instead of duplicating them.
+    The course's score version is bumped once the enclosing transaction
+    commits, so no reader can cache pre-upload scores under the new one.
+    Returns the number of rows written.
+    """
+    written = 0
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        StudentScore.objects.bulk_create(
+            [
+                StudentScore(course_id=course_id, student_id=student_id, node_id=node_id, score=score)
+                for student_id, node_id, score in batch
+            ],
+            update_conflicts=True,
+            unique_fields=["course", "student_id", "node"],
+            update_fields=["score"],
+        )
+        written += len(batch)
+    if written:
+        transaction.on_commit(lambda: bump_score_version(course_id))
+    return written
+
+
+def parse_score_sheet(course_id, lines):
+    """Read a score sheet: a ``student_id`` column plus one column per
+    course content, named after the node (or its id). Blank cells are
+    skipped.
+
+    Returns ``(rows, unknown_columns)`` where rows is a generator of
+    ``(student_id, node_id, score)``; raises ValueError for a bad sheet.
+    """
+    reader = csv.reader(lines)
+    headers = [h.strip() for h in next(reader, [])]
+    if "student_id" not in headers:
+        raise ValueError("The sheet must have a student_id column.")
+
+    contents = dict(
+        Node.objects.filter(course_id=course_id, layer=LayerChoices.COURSE_CONTENT)
+        .values_list("name", "id")
+    )
+    contents.update({str(node_id): node_id for node_id in contents.values()})
+    student_col = headers.index("student_id")
+    columns = [
+        (i, contents[h]) for i, h in enumerate(headers) if h in contents and i != student_col
+    ]
+    unknown = [h for i, h in enumerate(headers) if i != student_col and h not in contents]
+
+    def rows():
+        for line_no, values in enumerate(reader, start=2):
+            if not values or not values[student_col].strip():
+                continue
+            student_id = values[student_col].strip()
+            for i, node_id in columns:
+                cell = values[i].strip() if i < len(values) else ""
+                if not cell:
+                    continue
+                try:
+                    yield student_id, node_id, float(cell)
+                except ValueError:
+                    raise ValueError(f"Line {line_no}: {cell!r} is not a number.")
+
+    return rows(), unknown
+
+
+def score_matrix(course_id, cc_ids=None):
+    """Load a course's scores as a dense students x course-contents matrix.
+
+    One query, read in index order. Returns ``(student_ids, cc_ids,
+    matrix)`` where ``matrix[i, j]`` is student i's score on content j and
+    NaN where there is none. Pass ``cc_ids`` to fix the columns (e.g. to
+    include contents nobody has a score for yet); otherwise they are the
+    contents that appear in the scores, in id order.
+    """
+    rows = list(
+        StudentScore.objects.filter(course_id=course_id)
+        .order_by("student_id", "node_id")
+        .values_list("student_id", "node_id", "score")
+    )
+    if rows:
+        students, nodes, scores = zip(*rows)
+    else:
+        students, nodes, scores = (), (), ()
+
+    student_ids, student_idx = np.unique(np.array(students, dtype=object), return_inverse=True)
+    if cc_ids is None:
+        cc_ids = sorted(set(nodes))
+    column = {node_id: j for j, node_id in enumerate(cc_ids)}
+    node_idx = np.fromiter((column.get(n, -1) for n in nodes), dtype=np.intp, count=len(nodes))
+
+    matrix = np.full((len(student_ids), len(cc_ids)), np.nan)
+    keep = node_idx >= 0
+    matrix[student_idx[keep], node_idx[keep]] = np.asarray(scores, dtype=float)[keep]
+    return [str(s) for s in student_ids], list(cc_ids), matrix
@@ -0,0 +1,256 @@
+import csv
+import io
+import math
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from giraph.models import LayerChoices, Node, Relation
+from jobs.models import JobStatus
+from jobs.queue import claim_next, run_job, submit
+from programs.models import Program
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import User
+
+from attainment import export
+from attainment.compute import CourseMatrices, attainment, student_scores
+from attainment.models import StudentScore
+from attainment.store import score_matrix, score_version, upsert_scores
+
+
+class AttainmentExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.head = User.objects.create(username="exphead", email="exphead@example.com", role="head")
+        self.lecturer = User.objects.create(username="explec", email="explec@example.com", role="lecturer")
+        self.course = Program.objects.create(name="Data Structures", lecturer=self.lecturer, university="U", department="D")
+
+        node = lambda name, layer, course=self.course: Node.objects.create(name=name, layer=layer, course=course)
+        self.lists = node("Lists", LayerChoices.COURSE_CONTENT)
+        self.trees = node("Trees", LayerChoices.COURSE_CONTENT)
+        self.co = node("Analyse structures", LayerChoices.COURSE_OUTCOME)
+        self.po = node("Problem solving", LayerChoices.PROGRAM_OUTCOME, None)
+        Relation.objects.create(node1=self.lists, node2=self.co, weight=1)
+        Relation.objects.create(node1=self.trees, node2=self.co, weight=3)
+        Relation.objects.create(node1=self.co, node2=self.po, weight=5)
+
+        for student_id, lists, trees in [("s1", 80, 40), ("s2", 100, None)]:
+            StudentScore.objects.create(course=self.course, student_id=student_id, node=self.lists, score=lists)
+            if trees is not None:
+                StudentScore.objects.create(course=self.course, student_id=student_id, node=self.trees, score=trees)
+
+    def read_csv(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_course_export(self):
+        self.client.force_authenticate(self.lecturer)
+        response = self.client.get("/api/attainment/export/", {"courseId": str(self.course.id)})
+        self.assertIn("attainment-data-structures.csv", response["Content-Disposition"])
+        rows = self.read_csv(response)
+        self.assertEqual(
+            rows[0],
+            ["student_id", "CC: Lists", "CC: Trees", "CO: Analyse structures", "PO: Problem solving"],
+        )
+        # (80*1 + 40*3) / 4 = 50; a missing score is left out of the average
+        self.assertEqual(rows[1], ["s1", "80.0", "40.0", "50.0", "50.0"])
+        self.assertEqual(rows[2], ["s2", "100.0", "", "100.0", "100.0"])
+
+    def test_department_export(self):
+        self.client.force_authenticate(self.head)
+        rows = self.read_csv(self.client.get("/api/attainment/export/"))
+        self.assertEqual(rows[0], ["course", "student_id", "PO: Problem solving"])
+        self.assertEqual(rows[1:], [["Data Structures", "s1", "50.0"], ["Data Structures", "s2", "100.0"]])
+
+    def test_permissions_and_validation(self):
+        other = User.objects.create(username="other", email="other@example.com", role="lecturer")
+        self.client.force_authenticate(other)
+        response = self.client.get("/api/attainment/export/", {"courseId": str(self.course.id)})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get("/api/attainment/export/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.head)
+        response = self.client.get("/api/attainment/export/", {"courseId": "nope"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get("/api/attainment/export/", {"type": "pdf"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_xlsx_export(self):
+        self.client.force_authenticate(self.head)
+        response = self.client.get("/api/attainment/export/", {"courseId": str(self.course.id), "type": "xlsx"})
+        if export.openpyxl is None:
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            return
+        self.assertEqual(response["Content-Type"], export.XLSX_CONTENT_TYPE)
+        workbook = export.openpyxl.load_workbook(io.BytesIO(b"".join(response.streaming_content)))
+        rows = list(workbook.active.values)
+        self.assertEqual(rows[1], ("s1", 80, 40, 50, 50))
+
+    def test_rollup_job(self):
+        submit("attainment_rollup", {"course_ids": [str(self.course.id)]}, user=self.head)
+        job = run_job(claim_next("a"))
+        self.assertEqual(job.status, JobStatus.SUCCEEDED, job.error)
+        (course,) = job.result["courses"]
+        self.assertEqual(course["students"], 2)
+        # Cohort means of 50 and 100
+        self.assertEqual(course["course_outcomes"], [{"id": self.co.id, "name": "Analyse structures", "mean": 75.0, "students": 2}])
+        self.assertEqual(course["program_outcomes"][0]["mean"], 75.0)
+
+
+class ScoreStoreTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.lecturer = User.objects.create(username="storelec", email="storelec@example.com", role="lecturer")
+        self.course = Program.objects.create(name="Networks", lecturer=self.lecturer, university="U", department="D")
+        self.tcp = Node.objects.create(name="TCP", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+        self.udp = Node.objects.create(name="UDP", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+        self.client.force_authenticate(self.lecturer)
+
+    def upload(self, text):
+        sheet = SimpleUploadedFile("scores.csv", text.encode(), content_type="text/csv")
+        return self.client.post(f"/api/attainment/scores/?courseId={self.course.id}", {"file": sheet})
+
+    def test_upsert_overwrites_in_place(self):
+        upsert_scores(self.course.id, [("s1", self.tcp.id, 50), ("s1", self.udp.id, 60)])
+        with self.assertNumQueries(1):
+            upsert_scores(self.course.id, [("s1", self.tcp.id, 90), ("s2", self.tcp.id, 70)])
+        self.assertEqual(StudentScore.objects.count(), 3)
+        self.assertEqual(StudentScore.objects.get(student_id="s1", node=self.tcp).score, 90)
+
+    def test_score_matrix(self):
+        upsert_scores(self.course.id, [("s2", self.udp.id, 40), ("s1", self.tcp.id, 80), ("s1", self.udp.id, 60)])
+        with self.assertNumQueries(1):
+            students, cc_ids, matrix = score_matrix(self.course.id)
+        self.assertEqual(students, ["s1", "s2"])
+        self.assertEqual(cc_ids, [self.tcp.id, self.udp.id])
+        self.assertEqual(matrix[0].tolist(), [80.0, 60.0])
+        self.assertTrue(math.isnan(matrix[1, 0]))
+        self.assertEqual(matrix[1, 1], 40.0)
+
+    def test_upload_and_read_back(self):
+        response = self.upload(f"student_id,TCP,{self.udp.id},Extra\ns1,80,,1\ns2,70,65,2\n")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"scores": 3, "unknown_columns": ["Extra"]})
+
+        self.upload("student_id,TCP\ns1,85\n")
+        body = self.client.get("/api/attainment/scores/", {"courseId": str(self.course.id)}).json()
+        self.assertEqual(body["students"], ["s1", "s2"])
+        self.assertEqual([c["name"] for c in body["course_contents"]], ["TCP", "UDP"])
+        self.assertEqual(body["scores"], [[85.0, None], [70.0, 65.0]])
+
+    def test_bad_sheet_writes_nothing(self):
+        response = self.upload("student_id,TCP\ns1,80\ns2,abc\n")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Line 3", response.json()["detail"])
+        self.assertEqual(StudentScore.objects.count(), 0)
+
+
+class WhatIfTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.lecturer = User.objects.create(username="whatiflec", email="whatiflec@example.com", role="lecturer")
+        self.course = Program.objects.create(name="Compilers", lecturer=self.lecturer, university="U", department="D")
+        node = lambda name, layer, course=self.course: Node.objects.create(name=name, layer=layer, course=course)
+        self.lexing = node("Lexing", LayerChoices.COURSE_CONTENT)
+        self.parsing = node("Parsing", LayerChoices.COURSE_CONTENT)
+        self.codegen = node("Codegen", LayerChoices.COURSE_CONTENT)
+        self.front = node("Front end", LayerChoices.COURSE_OUTCOME)
+        self.back = node("Back end", LayerChoices.COURSE_OUTCOME)
+        self.design = node("Design", LayerChoices.PROGRAM_OUTCOME, None)
+        self.theory = node("Theory", LayerChoices.PROGRAM_OUTCOME, None)
+        Relation.objects.create(node1=self.lexing, node2=self.front, weight=2)
+        Relation.objects.create(node1=self.parsing, node2=self.front, weight=3)
+        Relation.objects.create(node1=self.codegen, node2=self.back, weight=5)
+        Relation.objects.create(node1=self.front, node2=self.design, weight=4)
+        Relation.objects.create(node1=self.back, node2=self.design, weight=1)
+        upsert_scores(self.course.id, [
+            ("s1", self.lexing.id, 90), ("s1", self.parsing.id, 60), ("s1", self.codegen.id, 70),
+            ("s2", self.lexing.id, 50), ("s2", self.codegen.id, 80),
+            ("s3", self.parsing.id, 100),
+        ])
+        self.client.force_authenticate(self.lecturer)
+
+    def what_if(self, *changes):
+        return self.client.post(
+            f"/api/attainment/whatif/?courseId={self.course.id}",
+            {"changes": [{"node1_id": a.id, "node2_id": b.id, "weight": w} for a, b, w in changes]},
+            format="json",
+        )
+
+    def cohort_means(self):
+        matrices = CourseMatrices(self.course.id)
+        co_values, po_values = {}, {}
+        for _, scores in student_scores(self.course.id):
+            co, po = attainment(scores, matrices)
+            for values, out in ((co, co_values), (po, po_values)):
+                for node_id, value in values.items():
+                    if value is not None:
+                        out.setdefault(node_id, []).append(value)
+        mean = lambda values: {k: sum(v) / len(v) for k, v in values.items()}
+        return mean(co_values), mean(po_values)
+
+    def test_matches_a_full_recompute(self):
+        changes = [
+            (self.parsing, self.front, 1),
+            (self.lexing, self.back, 2),  # new edge
+            (self.back, self.theory, 3),  # new edge to a PO the course did not feed
+        ]
+        response = self.what_if(*changes)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual(body["students"], 3)
+        self.assertEqual({o["name"] for o in body["course_outcomes"]}, {"Front end", "Back end"})
+        self.assertEqual({o["name"] for o in body["program_outcomes"]}, {"Design", "Theory"})
+        theory = next(o for o in body["program_outcomes"] if o["name"] == "Theory")
+        self.assertIsNone(theory["before"])
+
+        # Apply the changes for real: the simulation must agree
+        for node1, node2, weight in changes:
+            Relation.objects.update_or_create(node1=node1, node2=node2, defaults={"weight": weight})
+        co_means, po_means = self.cohort_means()
+        for outcome in body["course_outcomes"]:
+            self.assertAlmostEqual(outcome["after"], co_means[outcome["id"]])
+        for outcome in body["program_outcomes"]:
+            self.assertAlmostEqual(outcome["after"], po_means[outcome["id"]])
+
+    def test_only_touched_outcomes_and_cached_base(self):
+        self.what_if((self.codegen, self.back, 1))
+        # the base is cached: course lookup, edge validation, graph and
+        # score stamps
+        with self.assertNumQueries(4):
+            body = self.what_if((self.codegen, self.back, 2)).json()
+        self.assertEqual([o["name"] for o in body["course_outcomes"]], ["Back end"])
+        back = body["course_outcomes"][0]
+        # a single input: reweighting it can't move the average
+        self.assertAlmostEqual(back["delta"], 0.0)
+        self.assertEqual([o["name"] for o in body["program_outcomes"]], ["Design"])
+
+    def test_committed_upload_starts_a_new_base(self):
+        before = self.what_if((self.codegen, self.back, 2)).json()["course_outcomes"][0]["before"]
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            upsert_scores(self.course.id, [("s1", self.codegen.id, 10), ("s2", self.codegen.id, 10)])
+            # not bumped until the upload commits
+            self.assertEqual(score_version(self.course.id), 0)
+        self.assertEqual(len(callbacks), 1)
+        self.assertGreater(score_version(self.course.id), 0)
+        after = self.what_if((self.codegen, self.back, 2)).json()["course_outcomes"][0]["before"]
+        self.assertEqual((before, after), (75.0, 10.0))
+
+    def test_removing_the_only_input_empties_the_outcome(self):
+        body = self.what_if((self.codegen, self.back, 0)).json()
+        back = body["course_outcomes"][0]
+        self.assertEqual(back["before"], 75.0)
+        self.assertIsNone(back["after"])
+        self.assertEqual(back["students"], 0)
+
+    def test_invalid_edges(self):
+        other = Program.objects.create(name="Other", lecturer=self.lecturer, university="U", department="D")
+        foreign = Node.objects.create(name="Foreign", layer=LayerChoices.COURSE_OUTCOME, course=other)
+        self.assertEqual(self.what_if((self.lexing, foreign, 2)).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.what_if((self.lexing, self.design, 2)).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.what_if((self.lexing, self.front, 9)).status_code, status.HTTP_400_BAD_REQUEST)
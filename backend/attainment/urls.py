@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import course_scores, export_attainment, what_if
+
+urlpatterns = [
+    path("scores/", course_scores, name="course-scores"),
+    path("export/", export_attainment, name="export-attainment"),
+    path("whatif/", what_if, name="what-if"),
+]
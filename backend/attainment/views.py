@@ -0,0 +1,154 @@
+import io
+import math
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.text import slugify
+from giraph.models import Node
+from programs.models import Program
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from . import export
+from .serializers import WhatIfSerializer
+from .store import parse_score_sheet, score_matrix, upsert_scores
+from .whatif import simulate
+
+HEAD_ROLES = ["head", "department_head"]
+
+
+def _get_course(request, course_id):
+    """Return ``(course, None)`` if the user may work with the course's
+    scores, else ``(None, error_response)``."""
+    try:
+        course = Program.objects.get(pk=course_id)
+    except (Program.DoesNotExist, ValidationError):
+        return None, Response(
+            {"detail": f"Course {course_id} not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    if request.user.role not in HEAD_ROLES and course.lecturer_id != request.user.pk:
+        return None, Response(
+            {"detail": "You can only access your own courses."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    return course, None
+
+
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated])
+def course_scores(request):
+    """
+    GET /api/attainment/scores/?courseId=<uuid>
+    The course's stored scores as a students x course contents matrix.
+
+    POST /api/attainment/scores/?courseId=<uuid>
+    Multipart "file": a CSV with a student_id column and one column per
+    course content (node name or id). Scores are upserted, so uploading a
+    corrected sheet overwrites the old values.
+    """
+    course, error = _get_course(request, request.query_params.get("courseId"))
+    if error:
+        return error
+
+    if request.method == "GET":
+        student_ids, cc_ids, matrix = score_matrix(course.pk)
+        names = dict(Node.objects.filter(pk__in=cc_ids).values_list("id", "name"))
+        return Response(
+            {
+                "students": student_ids,
+                "course_contents": [{"id": i, "name": names[i]} for i in cc_ids],
+                "scores": [
+                    [None if math.isnan(v) else v for v in row] for row in matrix.tolist()
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response(
+            {"detail": "file is required."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    try:
+        rows, unknown = parse_score_sheet(course.pk, lines)
+        with transaction.atomic():
+            written = upsert_scores(course.pk, rows)
+    except (ValueError, UnicodeDecodeError) as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(
+        {"scores": written, "unknown_columns": unknown},
+        status=status.HTTP_200_OK,
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_attainment(request):
+    """
+    GET /api/attainment/export/?courseId=<uuid>&type=csv|xlsx
+    Streams per-student CC scores with CO and PO attainment for a course,
+    or, without courseId, PO attainment of every student in every course
+    (department heads only).
+    """
+    file_type = request.query_params.get("type", "csv")
+    if file_type not in ("csv", "xlsx"):
+        return Response(
+            {"detail": "type must be csv or xlsx."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if file_type == "xlsx" and export.openpyxl is None:
+        return Response(
+            {"detail": "XLSX export is not available on this server."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    course_id = request.query_params.get("courseId")
+    if course_id:
+        course, error = _get_course(request, course_id)
+        if error:
+            return error
+        rows = export.course_report(course)
+        filename = f"attainment-{slugify(course.name) or course.pk}.{file_type}"
+    else:
+        if request.user.role not in HEAD_ROLES:
+            return Response(
+                {"detail": "Only department heads can export the whole department."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        rows = export.department_report()
+        filename = f"attainment-department.{file_type}"
+
+    if file_type == "xlsx":
+        return export.xlsx_response(rows, filename)
+    return export.csv_response(rows, filename)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def what_if(request):
+    """
+    POST /api/attainment/whatif/?courseId=<uuid>
+    Body: {"changes": [{"node1_id": int, "node2_id": int, "weight": 0-5}]}
+    Cohort CO and PO attainment before and after hypothetical weight
+    changes or new edges. Nothing is saved.
+    """
+    course, error = _get_course(request, request.query_params.get("courseId"))
+    if error:
+        return error
+
+    ser = WhatIfSerializer(data=request.data)
+    ser.is_valid(raise_exception=True)
+    changes = [
+        (c["node1_id"], c["node2_id"], int(c["weight"]))
+        for c in ser.validated_data["changes"]
+    ]
+    try:
+        result = simulate(course.pk, changes)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(result, status=status.HTTP_200_OK)
@@ -0,0 +1,243 @@
+"""What-if simulation of relation weight changes.
+
+The cohort's attainment is held as column sums over dense matrices:
+
+    co_num = S @ W1      co_den = M @ W1      co = co_num / co_den
+    po_num = C @ W2      po_den = N @ W2      po = po_num / po_den
+
+with ``S`` the students x CC scores (0 where missing), ``M`` its 0/1
+presence mask, ``W1`` the CC -> CO and ``W2`` the CO -> PO weights, and
+``C``/``N`` the same pair for the CO values. This is the same weighted
+average as ``compute.attainment``, for every student at once.
+
+The base state is computed once per graph and score version and cached.
+A change to the weight of one edge only moves the column sums of its
+target by ``delta * column_of_source``, so a simulation copies and patches
+the columns of the outcomes it touches and leaves everything else alone.
+"""
+
+import uuid
+from dataclasses import dataclass
+
+import numpy as np
+from backend.cache import cache_key, get_or_compute
+from giraph.models import LayerChoices, Node
+from giraph.versioning import graph_stamp
+
+from .compute import CourseMatrices
+from .store import score_matrix, score_version
+
+BASE_TIMEOUT = 60 * 60
+
+
+@dataclass
+class BaseState:
+    student_ids: list
+    cc_index: dict
+    co_index: dict
+    po_index: dict
+    co_names: dict
+    po_names: dict
+    scores: np.ndarray  # students x CC, 0 where missing
+    present: np.ndarray  # students x CC, 1.0 where there is a score
+    w1: np.ndarray  # CC x CO
+    w2: np.ndarray  # CO x PO
+    co_num: np.ndarray
+    co_den: np.ndarray
+    co: np.ndarray  # students x CO, NaN where undefined
+    po_num: np.ndarray
+    po_den: np.ndarray
+    po: np.ndarray
+
+
+def _ratio(num, den):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / den, np.nan)
+
+
+def _build_base(course_id):
+    matrices = CourseMatrices(course_id)
+    cc_ids = list(
+        Node.objects.filter(course_id=course_id, layer=LayerChoices.COURSE_CONTENT)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    student_ids, cc_ids, raw = score_matrix(course_id, cc_ids)
+    cc_index = {cc_id: i for i, cc_id in enumerate(cc_ids)}
+    co_index = {co_id: j for j, (co_id, _) in enumerate(matrices.course_outcomes)}
+    po_index = {po_id: k for k, (po_id, _) in enumerate(matrices.program_outcomes)}
+
+    w1 = np.zeros((len(cc_index), len(co_index)))
+    for co_id, inputs in matrices.co_inputs.items():
+        for cc_id, weight in inputs:
+            if cc_id in cc_index:
+                w1[cc_index[cc_id], co_index[co_id]] = weight
+    w2 = np.zeros((len(co_index), len(po_index)))
+    for po_id, inputs in matrices.po_inputs.items():
+        for co_id, weight in inputs:
+            if co_id in co_index:
+                w2[co_index[co_id], po_index[po_id]] = weight
+
+    present = (~np.isnan(raw)).astype(float)
+    scores = np.nan_to_num(raw)
+    co_num, co_den = scores @ w1, present @ w1
+    co = _ratio(co_num, co_den)
+    po_num = np.nan_to_num(co) @ w2
+    po_den = (~np.isnan(co)).astype(float) @ w2
+    return BaseState(
+        student_ids=student_ids,
+        cc_index=cc_index,
+        co_index=co_index,
+        po_index=po_index,
+        co_names=dict(matrices.course_outcomes),
+        po_names=dict(matrices.program_outcomes),
+        scores=scores,
+        present=present,
+        w1=w1,
+        w2=w2,
+        co_num=co_num,
+        co_den=co_den,
+        co=co,
+        po_num=po_num,
+        po_den=po_den,
+        po=_ratio(po_num, po_den),
+    )
+
+
+def base_state(course_id):
+    """The cached base matrices of a course. The key carries the course's
+    graph and score stamps, both read from the database, so any edit or
+    committed upload starts a new entry on every worker."""
+    key = cache_key(
+        "attainment", "whatif", course_id, graph_stamp(course_id), score_version(course_id)
+    )
+    return get_or_compute(key, lambda: _build_base(course_id), BASE_TIMEOUT)
+
+
+def resolve_changes(course_id, changes):
+    """Check ``[(node1_id, node2_id, weight)]`` against the graph of the
+    course: each edge must be CC -> CO inside the course or CO -> PO from
+    one of its outcomes. Weight 0 removes an edge. Returns
+    ``(cc_co, co_po)`` dicts of ``{(node1_id, node2_id): weight}``; raises
+    ValueError for an edge that can't exist."""
+    node_ids = {n for n1, n2, _ in changes for n in (n1, n2)}
+    nodes = {
+        pk: (layer, node_course_id)
+        for pk, layer, node_course_id in Node.objects.filter(pk__in=node_ids).values_list(
+            "id", "layer", "course_id"
+        )
+    }
+    course_id = uuid.UUID(str(course_id))
+    cc_co, co_po = {}, {}
+    for node1_id, node2_id, weight in changes:
+        layer1, course1 = nodes.get(node1_id, (None, None))
+        layer2, course2 = nodes.get(node2_id, (None, None))
+        if course1 != course_id:
+            raise ValueError(f"Node {node1_id} is not part of this course.")
+        if layer1 == LayerChoices.COURSE_CONTENT and layer2 == LayerChoices.COURSE_OUTCOME:
+            if course2 != course_id:
+                raise ValueError(f"Node {node2_id} is not part of this course.")
+            cc_co[(node1_id, node2_id)] = weight
+        elif layer1 == LayerChoices.COURSE_OUTCOME and layer2 == LayerChoices.PROGRAM_OUTCOME:
+            co_po[(node1_id, node2_id)] = weight
+        else:
+            raise ValueError(
+                f"{node1_id} -> {node2_id}: only cc -> co or co -> po edges are allowed."
+            )
+    return cc_co, co_po
+
+
+def _cohort(values):
+    """Mean over the students who have a value, and how many do."""
+    count = int(np.count_nonzero(~np.isnan(values)))
+    return (float(np.nanmean(values)) if count else None), count
+
+
+def _summary(node_id, name, before, after):
+    mean_before, _ = _cohort(before)
+    mean_after, students = _cohort(after)
+    delta = None
+    if mean_before is not None and mean_after is not None:
+        delta = mean_after - mean_before
+    return {
+        "id": node_id,
+        "name": name,
+        "before": mean_before,
+        "after": mean_after,
+        "delta": delta,
+        "students": students,
+    }
+
+
+def simulate(course_id, changes):
+    """Cohort CO and PO attainment before and after the hypothetical
+    ``changes`` (see ``resolve_changes``). Only outcomes whose values can
+    move are recomputed and reported."""
+    cc_co, co_po = resolve_changes(course_id, changes)
+    base = base_state(course_id)
+
+    # CC -> CO: patch the sums of the touched CO columns only. A CC with
+    # no column has no scores and can't move anything.
+    co_num, co_den = {}, {}
+    for (cc_id, co_id), weight in cc_co.items():
+        j = base.co_index[co_id]
+        i = base.cc_index.get(cc_id)
+        if j not in co_num:
+            co_num[j], co_den[j] = base.co_num[:, j].copy(), base.co_den[:, j].copy()
+        if i is None:
+            continue
+        delta = weight - base.w1[i, j]
+        co_num[j] += delta * base.scores[:, i]
+        co_den[j] += delta * base.present[:, i]
+    new_co = {j: _ratio(co_num[j], co_den[j]) for j in co_num}
+
+    # CO -> PO: a PO moves when one of its CO inputs moved or when the
+    # weight of one of its CO edges changed. A PO the course did not feed
+    # before starts from empty sums.
+    edges = {}
+    for j in new_co:
+        for k in np.flatnonzero(base.w2[j]):
+            edges[(j, int(k))] = base.w2[j, k]
+    po_ids = dict(base.po_index)
+    po_names = dict(base.po_names)
+    for (co_id, po_id), weight in co_po.items():
+        if po_id not in po_ids:
+            po_ids[po_id] = len(po_ids)
+        edges[(base.co_index[co_id], po_ids[po_id])] = weight
+    missing = [po_id for po_id in po_ids if po_id not in po_names]
+    if missing:
+        po_names.update(Node.objects.filter(pk__in=missing).values_list("id", "name"))
+
+    students = len(base.student_ids)
+    po_num, po_den = {}, {}
+    for (j, k), weight in edges.items():
+        if k not in po_num:
+            if k < base.po.shape[1]:
+                po_num[k], po_den[k] = base.po_num[:, k].copy(), base.po_den[:, k].copy()
+            else:
+                po_num[k], po_den[k] = np.zeros(students), np.zeros(students)
+        old_co = base.co[:, j]
+        old_weight = base.w2[j, k] if k < base.w2.shape[1] else 0.0
+        co_value = new_co.get(j, old_co)
+        po_num[k] += weight * np.nan_to_num(co_value) - old_weight * np.nan_to_num(old_co)
+        po_den[k] += weight * ~np.isnan(co_value) - old_weight * ~np.isnan(old_co)
+
+    empty = np.full(students, np.nan)
+    co_ids = {j: co_id for co_id, j in base.co_index.items()}
+    po_by_index = {k: po_id for po_id, k in po_ids.items()}
+    return {
+        "students": students,
+        "course_outcomes": [
+            _summary(co_ids[j], base.co_names[co_ids[j]], base.co[:, j], values)
+            for j, values in sorted(new_co.items())
+        ],
+        "program_outcomes": [
+            _summary(
+                po_by_index[k],
+                po_names.get(po_by_index[k]),
+                base.po[:, k] if k < base.po.shape[1] else empty,
+                _ratio(po_num[k], po_den[k]),
+            )
+            for k in sorted(po_num)
+        ],
+    }
@@ -0,0 +1,16 @@
+from rest_framework.authtoken.models import Token
+
+
+async def aauthenticate(request):
+    """Async counterpart of TokenAuthentication for plain async views.
+
+    Session and auth middleware skip ``/api/``, so these views are
+    token-only. Returns the active user or None."""
+    keyword, _, key = request.headers.get("Authorization", "").partition(" ")
+    if keyword != "Token" or not key:
+        return None
+    try:
+        token = await Token.objects.select_related("user").aget(key=key.strip())
+    except Token.DoesNotExist:
+        return None
+    return token.user if token.user.is_active else None
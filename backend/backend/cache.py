@@ -0,0 +1,138 @@
+"""Shared caching helpers on top of Django's cache framework.
+
+Every app builds its cached reads from the same pieces:
+
+* ``cache_key(namespace, *parts)`` - namespaced keys (``"programs:ids"``);
+* ``get_version`` / ``bump_version`` - a per-namespace version stamp baked
+  into keys by ``versioned_key``, so one bump invalidates every key of the
+  namespace without having to find and delete them;
+* ``get_or_compute`` - read-through caching with single-flight recompute:
+  on a miss only one caller per key computes the value, the others wait
+  for it instead of stampeding the database.
+
+The backend is configured through ``settings.CACHES``: a file cache shared
+by the workers of a host unless ``CACHE_BACKEND`` says otherwise. Versions
+and deletes are only seen by workers sharing the cache, so a per-process
+(locmem) cache only fits a single worker.
+"""
+
+import asyncio
+import threading
+import time
+import zlib
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+# Striped in-process locks: bounded memory, and two keys rarely share one
+_LOCAL_LOCKS = [threading.Lock() for _ in range(64)]
+LOCK_TIMEOUT = 30  # seconds a recompute may hold the shared lock
+WAIT_TIMEOUT = 5  # seconds a waiter polls before computing itself
+POLL_INTERVAL = 0.05
+
+_MISSING = object()
+
+
+def get_cache(alias=DEFAULT_CACHE_ALIAS):
+    return caches[alias]
+
+
+def cache_key(namespace, *parts):
+    return ":".join([namespace, *(str(p) for p in parts)])
+
+
+def _version_key(namespace):
+    return cache_key(namespace, "version")
+
+
+def get_version(namespace):
+    # Versions start from the clock, so a version entry that was evicted and
+    # recreated can't bring back keys written under an earlier one.
+    return get_cache().get_or_set(_version_key(namespace), time.time_ns, None)
+
+
+async def aget_version(namespace):
+    return await get_cache().aget_or_set(_version_key(namespace), time.time_ns, None)
+
+
+def bump_version(namespace):
+    """Invalidate every ``versioned_key`` of ``namespace``."""
+    cache = get_cache()
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.set(_version_key(namespace), time.time_ns(), None)
+
+
+def versioned_key(namespace, *parts):
+    return cache_key(namespace, f"v{get_version(namespace)}", *parts)
+
+
+async def aversioned_key(namespace, *parts):
+    return cache_key(namespace, f"v{await aget_version(namespace)}", *parts)
+
+
+def _local_lock(key):
+    return _LOCAL_LOCKS[zlib.crc32(key.encode()) % len(_LOCAL_LOCKS)]
+
+
+def get_or_compute(key, compute, timeout=DEFAULT_TIMEOUT):
+    """Return the cached value of ``key``, computing and storing it on a miss.
+
+    Threads of this process queue on a local lock; other processes are held
+    off with a short-lived lock entry (``cache.add``), so a hot key that
+    expires is recomputed once, not once per concurrent request. A waiter
+    that gives up after WAIT_TIMEOUT computes the value itself.
+    """
+    cache = get_cache()
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    with _local_lock(key):
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        lock_key = f"{key}:lock"
+        owner = cache.add(lock_key, 1, LOCK_TIMEOUT)
+        if not owner:
+            deadline = time.monotonic() + WAIT_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                value = cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    return value
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            if owner:
+                cache.delete(lock_key)
+        return value
+
+
+async def aget_or_compute(key, compute, timeout=DEFAULT_TIMEOUT):
+    """Async ``get_or_compute``; ``compute`` is a coroutine function. Only
+    the shared lock entry is used, as thread locks would block the loop."""
+    cache = get_cache()
+    value = await cache.aget(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    lock_key = f"{key}:lock"
+    owner = await cache.aadd(lock_key, 1, LOCK_TIMEOUT)
+    if not owner:
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(POLL_INTERVAL)
+            value = await cache.aget(key, _MISSING)
+            if value is not _MISSING:
+                return value
+    try:
+        value = await compute()
+        await cache.aset(key, value, timeout)
+    finally:
+        if owner:
+            await cache.adelete(lock_key)
+    return value
@@ -0,0 +1,44 @@
+"""Database helpers shared by the apps."""
+
+import functools
+import random
+import time
+
+from django.db import OperationalError, connection
+
+BUSY_MESSAGES = ("database is locked", "database table is locked", "database is busy")
+
+
+def is_busy_error(exc):
+    return isinstance(exc, OperationalError) and any(
+        message in str(exc) for message in BUSY_MESSAGES
+    )
+
+
+def retry_on_busy(func=None, *, attempts=4, base_delay=0.05, max_delay=1.0):
+    """Retry ``func`` when SQLite reports the database as locked.
+
+    busy_timeout already makes each statement wait for the lock; this covers
+    the cases where that wait runs out under heavy write bursts. Delays grow
+    exponentially with jitter and are capped at ``max_delay``. Calls made
+    inside an outer transaction are not retried, since the outer block is
+    already broken by then.
+    """
+    if func is None:
+        return functools.partial(
+            retry_on_busy, attempts=attempts, base_delay=base_delay, max_delay=max_delay
+        )
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(attempts):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as e:
+                last_try = attempt == attempts - 1
+                if last_try or not is_busy_error(e) or connection.in_atomic_block:
+                    raise
+                delay = min(base_delay * 2 ** attempt, max_delay)
+                time.sleep(delay + random.uniform(0, delay))
+
+    return wrapper
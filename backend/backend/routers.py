@@ -0,0 +1,130 @@
+"""Primary/replica database routing.
+
+Reads go to the ``replica`` alias only inside views marked with
+``replica_reads`` and only when that client has not written recently;
+everything else (writes, auth lookups, unmarked views) uses ``default``.
+"""
+
+import functools
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+
+from django.conf import settings
+from django.db import connections
+
+from .cache import cache_key, get_cache
+
+PRIMARY = "default"
+REPLICA = "replica"
+
+_reads_on_replica = ContextVar("reads_on_replica", default=False)
+_primary_only = ContextVar("primary_only", default=False)
+
+
+def replica_configured():
+    return REPLICA in connections.databases
+
+
+def client_key(request):
+    """Identify the caller: their auth token, session, or failing that, IP."""
+    identity = (
+        request.META.get("HTTP_AUTHORIZATION")
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get("REMOTE_ADDR", "")
+    )
+    return cache_key("db", "pin", hashlib.sha1(identity.encode()).hexdigest())
+
+
+def pin_to_primary(request):
+    # Kept in the cache so every worker sees it; settings refuse a
+    # per-process cache when a replica is configured
+    get_cache().set(client_key(request), True, settings.REPLICA_PIN_SECONDS)
+
+
+async def apin_to_primary(request):
+    await get_cache().aset(client_key(request), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(request):
+    return get_cache().get(client_key(request), False)
+
+
+async def ais_pinned(request):
+    return await get_cache().aget(client_key(request), False)
+
+
+@contextmanager
+def primary_reads():
+    """Keep every read inside the block on the primary, ``replica_reads``
+    views included (e.g. the rest of a batch after one of its writes)."""
+    token = _primary_only.set(True)
+    try:
+        yield
+    finally:
+        _primary_only.reset(token)
+
+
+def _use_primary(request):
+    return not replica_configured() or _primary_only.get() or is_pinned(request)
+
+
+async def _ause_primary(request):
+    return not replica_configured() or _primary_only.get() or await ais_pinned(request)
+
+
+def replica_reads(view):
+    """Let the ORM reads of ``view`` go to the replica.
+
+    Works on sync and async function views and on APIView handler methods.
+    """
+
+    def find_request(args):
+        return next(arg for arg in args if hasattr(arg, "META"))
+
+    if iscoroutinefunction(view):
+
+        @functools.wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            request = find_request(args)
+            if await _ause_primary(request):
+                return await view(*args, **kwargs)
+            token = _reads_on_replica.set(True)
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                _reads_on_replica.reset(token)
+
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        request = find_request(args)
+        if _use_primary(request):
+            return view(*args, **kwargs)
+        token = _reads_on_replica.set(True)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _reads_on_replica.reset(token)
+
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _reads_on_replica.get() and replica_configured():
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
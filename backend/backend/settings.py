@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -27,6 +30,15 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# API-only profile for the token API workers: set DJANGO_API_ONLY=1 to leave
+# out the admin, messages, static files and the browser middleware, which
+# makes workers start and answer faster. The full profile stays the default.
+API_ONLY = os.environ.get('DJANGO_API_ONLY') == '1'
+
+# Requests under this prefix are token-authenticated API calls and skip
+# BROWSER_MIDDLEWARE.
+API_PATH_PREFIX = '/api/'
+
 
 # Application definition
 
@@ -45,31 +57,67 @@ INSTALLED_APPS = [
     'users',
     'programs',
     'outcomes',
+    'core',
+    'jobs',
+    'attainment',
+]
+
+if API_ONLY:
+    INSTALLED_APPS = [
+        app for app in INSTALLED_APPS
+        if app not in {
+            'django.contrib.admin',
+            'django.contrib.messages',
+            'django.contrib.staticfiles',
+        }
+    ]
+
+# The browser-only middleware are the Django ones, subclassed in
+# backend/middleware.py to step aside for paths under API_PATH_PREFIX. The
+# API-only profile leaves them out altogether.
+BROWSER_MIDDLEWARE = [
+    'backend.middleware.SessionMiddleware',
+    'backend.middleware.CsrfViewMiddleware',
+    'backend.middleware.AuthenticationMiddleware',
+    'backend.middleware.MessageMiddleware',
+    'backend.middleware.XFrameOptionsMiddleware',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Must be first
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'backend.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'backend.middleware.CsrfViewMiddleware',
+    'backend.middleware.AuthenticationMiddleware',
+    'backend.middleware.MessageMiddleware',
+    'backend.middleware.XFrameOptionsMiddleware',
+    'backend.middleware.ReplicaPinningMiddleware',
+    'backend.middleware.IdempotencyMiddleware',
 ]
 
+if API_ONLY:
+    MIDDLEWARE = [m for m in MIDDLEWARE if m not in BROWSER_MIDDLEWARE]
+
 ROOT_URLCONF = 'backend.urls'
 
+TEST_RUNNER = 'backend.test_runner.TestRunner'
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
-        'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
 }
 
+if API_ONLY:
+    # The browsable API needs sessions and CSRF, which this profile drops
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'rest_framework.renderers.JSONRenderer',
+    ]
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -86,6 +134,7 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'idempotency-key',
     'origin',
     'user-agent',
     'x-csrftoken',
@@ -110,8 +159,9 @@ TEMPLATES = [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-            ],
+            ] + (
+                [] if API_ONLY else ['django.contrib.messages.context_processors.messages']
+            ),
         },
     },
 ]
@@ -122,10 +172,93 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Applied to every new SQLite connection through OPTIONS['init_command'].
+# WAL lets readers run alongside the single writer; synchronous=NORMAL is
+# durable under WAL except for power loss; busy_timeout makes writers wait
+# for the lock instead of failing with "database is locked" right away.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # ms
+    'cache_size': -64000,  # negative = KiB, so ~64 MB of page cache
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': ';'.join(
+                f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()
+            ),
+            # Take the write lock at BEGIN so busy_timeout applies, instead of
+            # failing when a read transaction tries to upgrade to a write.
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+
+# Optional read replica for reporting-heavy GETs (see backend/routers.py).
+# Locally this is a second SQLite file refreshed with
+# `python manage.py sync_replica`.
+REPLICA_DATABASE_NAME = os.environ.get('REPLICA_DATABASE_NAME')
+if REPLICA_DATABASE_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': REPLICA_DATABASE_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['backend.routers.PrimaryReplicaRouter']
+
+# After a client writes, its reads stay on the primary this long so it
+# never sees its own change missing from a lagging replica. The pin is kept
+# in the cache, so with a replica the cache must be shared by every worker.
+REPLICA_PIN_SECONDS = 15
+
+# POSTs sent with an Idempotency-Key header are answered from the stored
+# first response for this long (see core/idempotency.py). Sweep expired
+# keys with `manage.py sweep_idempotency_keys`.
+IDEMPOTENCY_KEY_TTL_SECONDS = 24 * 60 * 60
+# A request that is still running holds its key this long; a retry after
+# that (e.g. the worker was killed mid-request) runs again.
+IDEMPOTENCY_LEASE_SECONDS = 60
+
+# Graph edit audit events are buffered in memory and written in batches
+# (see giraph/audit.py): when this many are pending, or when a request
+# finishes and the oldest pending one is this many seconds old.
+AUDIT_BUFFER_SIZE = 200
+AUDIT_FLUSH_SECONDS = 5
+
+
+# Cache (see backend/cache.py). Version bumps and deletes only reach the
+# workers that share the cache, so the default is a file cache, shared by
+# every worker on the host (CACHE_LOCATION is a directory). Use "redis"
+# (CACHE_LOCATION is the server URL) across hosts; "locmem" is per process
+# and only fits a single worker. Tests always run on a private locmem cache.
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'file')
+if REPLICA_DATABASE_NAME and CACHE_BACKEND == 'locmem':
+    # A pin set by the worker that took the write must be seen by whichever
+    # worker serves the next read
+    raise ImproperlyConfigured('A read replica needs a shared CACHE_BACKEND ("file" or "redis").')
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.environ.get(
+            'CACHE_LOCATION',
+            str(BASE_DIR / '.cache') if CACHE_BACKEND == 'file' else 'eys',
+        ),
+        'KEY_PREFIX': 'eys',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000} if CACHE_BACKEND != 'redis' else {},
     }
 }
 
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Run tests on a private in-memory cache, and drop buffered audit
+    events before the test databases go away.
+
+    The shared file cache would carry entries over from one run to the
+    next (and into a running dev server). The audit events come from test
+    transactions that were rolled back, and the exit flush would otherwise
+    write them to the real database.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._private_cache = override_settings(
+            CACHES={
+                "default": {
+                    **settings.CACHES["default"],
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": "tests",
+                    "OPTIONS": {"MAX_ENTRIES": 10000},
+                }
+            }
+        )
+        self._private_cache.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._private_cache.disable()
+        super().teardown_test_environment(**kwargs)
+
+    def teardown_databases(self, old_config, **kwargs):
+        from giraph import audit
+
+        audit.buffer.clear()
+        super().teardown_databases(old_config, **kwargs)
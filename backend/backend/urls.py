@@ -1,10 +1,17 @@
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/giraph/', include('giraph.urls')),
     path('api/users/', include("users.urls")),
     path('api/outcomes/', include("outcomes.urls")),
     path('api/programs/', include("programs.urls")),
-]
\ No newline at end of file
+    path('api/jobs/', include("jobs.urls")),
+    path('api/attainment/', include("attainment.urls")),
+    path('api/', include("core.urls")),
+]
+
+if not settings.API_ONLY:
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
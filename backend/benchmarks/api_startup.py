@@ -0,0 +1,142 @@
+"""Worker cold start and per-request middleware cost, by settings profile.
+
+Each profile runs in fresh interpreters so imports are really cold:
+
+* stock    - the original stack: Django's session, CSRF, auth, messages
+             and clickjacking middleware on every request, admin installed;
+* full     - the default settings, where those middleware step aside
+             for /api/ paths;
+* api-only - DJANGO_API_ONLY=1: no admin, messages, static files or
+             browser middleware.
+
+"startup" is django.setup() plus loading the URLconf, which is what a new
+worker does before it can answer. "first" is the first DRF request, which
+pays for DRF's lazy imports (GET /api/giraph/search/ without a query, so
+it stops at validation and never touches the database). "request" is the
+steady-state time the WSGI handler spends on GET /api/giraph/ping/, a view
+that does no work of its own.
+
+    python benchmarks/api_startup.py --runs 7 --requests 5000
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES = ("stock", "full", "api-only")
+STOCK_MIDDLEWARE = {
+    "backend.middleware.SessionMiddleware": "django.contrib.sessions.middleware.SessionMiddleware",
+    "backend.middleware.CsrfViewMiddleware": "django.middleware.csrf.CsrfViewMiddleware",
+    "backend.middleware.AuthenticationMiddleware": "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "backend.middleware.MessageMiddleware": "django.contrib.messages.middleware.MessageMiddleware",
+    "backend.middleware.XFrameOptionsMiddleware": "django.middleware.clickjacking.XFrameOptionsMiddleware",
+}
+
+
+def child(profile, requests):
+    """Runs inside the fresh interpreter; prints one JSON line."""
+    started = time.perf_counter()
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ["DJANGO_SETTINGS_MODULE"] = "backend.settings"
+    if profile == "api-only":
+        os.environ["DJANGO_API_ONLY"] = "1"
+
+    import backend.settings as project_settings
+
+    if profile == "stock":
+        project_settings.MIDDLEWARE = [
+            STOCK_MIDDLEWARE.get(m, m) for m in project_settings.MIDDLEWARE
+        ]
+
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+
+    application = get_wsgi_application()
+    get_resolver().url_patterns
+    startup = time.perf_counter() - started
+
+    def start_response(status, headers):
+        pass
+
+    def environ(path="/api/giraph/ping/"):
+        return {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": "",
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.url_scheme": "http",
+        }
+
+    started = time.perf_counter()
+    application(environ("/api/giraph/search/"), start_response)
+    first = time.perf_counter() - started
+
+    for _ in range(100):  # warm up
+        application(environ(), start_response)
+    started = time.perf_counter()
+    for _ in range(requests):
+        application(environ(), start_response)
+    per_request = (time.perf_counter() - started) / requests
+
+    print(json.dumps({
+        "startup": startup,
+        "first": first,
+        "request": per_request,
+        "modules": len(sys.modules),
+    }))
+
+
+def measure(profile, runs, requests):
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", profile, "--requests", str(requests)],
+            check=True,
+            capture_output=True,
+            text=True,
+            env={k: v for k, v in os.environ.items() if k != "DJANGO_API_ONLY"},
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "startup": statistics.median(r["startup"] for r in results),
+        "first": statistics.median(r["first"] for r in results),
+        "request": statistics.median(r["request"] for r in results),
+        "modules": results[0]["modules"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--child", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.requests)
+        return
+
+    print(f"median of {args.runs} cold starts, {args.requests} requests each")
+    baseline = None
+    for profile in PROFILES:
+        r = measure(profile, args.runs, args.requests)
+        baseline = baseline or r
+        print(
+            f"{profile:>8}: startup {r['startup'] * 1000:6.1f} ms "
+            f"({r['modules']} modules), first request {r['first'] * 1000:5.1f} ms, "
+            f"request {r['request'] * 1e6:6.1f} us "
+            f"(x{baseline['request'] / r['request']:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
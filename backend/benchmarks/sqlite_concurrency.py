@@ -0,0 +1,184 @@
+"""Concurrent read/write throughput: stock SQLite vs. the tuned settings.
+
+Runs N threads against a throwaway copy of the giraph schema, each mixing
+graph reads (a course's nodes joined with its relations) and short write
+transactions (reweight a relation, add a node). The "stock" profile is
+Django's default connection (rollback journal, deferred BEGIN); "tuned"
+applies settings.SQLITE_PRAGMAS, BEGIN IMMEDIATE and busy retries.
+
+    python benchmarks/sqlite_concurrency.py --threads 8 --seconds 5 --write-ratio 0.2
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.settings import SQLITE_PRAGMAS  # noqa: E402
+
+COURSES = 20
+CC_PER_COURSE = 20
+CO_PER_COURSE = 8
+PROGRAM_OUTCOMES = 10
+
+
+def create_database(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE node (id INTEGER PRIMARY KEY, name TEXT, layer TEXT, course_id INTEGER);
+        CREATE INDEX node_course ON node(course_id);
+        CREATE TABLE relation (
+            id INTEGER PRIMARY KEY, node1_id INTEGER, node2_id INTEGER, weight INTEGER,
+            UNIQUE (node1_id, node2_id)
+        );
+        CREATE INDEX relation_node2 ON relation(node2_id);
+        """
+    )
+    pos = []
+    for i in range(PROGRAM_OUTCOMES):
+        pos.append(conn.execute(
+            "INSERT INTO node (name, layer, course_id) VALUES (?, 'program_outcome', NULL)",
+            (f"PO {i}",),
+        ).lastrowid)
+    for course in range(COURSES):
+        ccs = [
+            conn.execute(
+                "INSERT INTO node (name, layer, course_id) VALUES (?, 'course_content', ?)",
+                (f"CC {course}.{i}", course),
+            ).lastrowid
+            for i in range(CC_PER_COURSE)
+        ]
+        cos = [
+            conn.execute(
+                "INSERT INTO node (name, layer, course_id) VALUES (?, 'course_outcome', ?)",
+                (f"CO {course}.{i}", course),
+            ).lastrowid
+            for i in range(CO_PER_COURSE)
+        ]
+        rows = [(cc, random.choice(cos), random.randint(1, 5)) for cc in ccs]
+        rows += [(co, random.choice(pos), random.randint(1, 5)) for co in cos]
+        conn.executemany(
+            "INSERT OR IGNORE INTO relation (node1_id, node2_id, weight) VALUES (?, ?, ?)", rows
+        )
+    conn.commit()
+    conn.close()
+
+
+def connect(path, tuned):
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    if tuned:
+        for name, value in SQLITE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+def read_graph(conn, course):
+    conn.execute(
+        "SELECT n.id, n.name, r.id, r.node2_id, r.weight FROM node n "
+        "LEFT JOIN relation r ON r.node1_id = n.id WHERE n.course_id = ?",
+        (course,),
+    ).fetchall()
+
+
+def write_graph(conn, course, tuned):
+    conn.execute("BEGIN IMMEDIATE" if tuned else "BEGIN")
+    try:
+        # Read-then-write, like the views' validation before saving
+        row = conn.execute(
+            "SELECT r.id FROM relation r JOIN node n ON n.id = r.node1_id "
+            "WHERE n.course_id = ? ORDER BY random() LIMIT 1",
+            (course,),
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE relation SET weight = ? WHERE id = ?", (random.randint(1, 5), row[0])
+            )
+        conn.execute(
+            "INSERT INTO node (name, layer, course_id) VALUES ('bench', 'course_content', ?)",
+            (course,),
+        )
+        conn.execute("COMMIT")
+    except sqlite3.OperationalError:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def worker(path, tuned, write_ratio, deadline, stats, lock):
+    conn = connect(path, tuned)
+    reads = writes = errors = 0
+    while time.perf_counter() < deadline:
+        course = random.randrange(COURSES)
+        if random.random() < write_ratio:
+            for attempt in range(4 if tuned else 1):
+                try:
+                    write_graph(conn, course, tuned)
+                    writes += 1
+                    break
+                except sqlite3.OperationalError:
+                    if not tuned or attempt == 3:
+                        errors += 1
+                        break
+                    time.sleep(min(0.05 * 2 ** attempt, 1.0))
+        else:
+            try:
+                read_graph(conn, course)
+                reads += 1
+            except sqlite3.OperationalError:
+                errors += 1
+    conn.close()
+    with lock:
+        stats["reads"] += reads
+        stats["writes"] += writes
+        stats["errors"] += errors
+
+
+def run(profile, threads, seconds, write_ratio):
+    tuned = profile == "tuned"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite3")
+        create_database(path)
+        if tuned:
+            # journal_mode=WAL is persistent; set it once before the run
+            connect(path, tuned=True).close()
+        stats = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+        pool = [
+            threading.Thread(target=worker, args=(path, tuned, write_ratio, deadline, stats, lock))
+            for _ in range(threads)
+        ]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+    total = stats["reads"] + stats["writes"]
+    print(
+        f"{profile:>6}: {total / seconds:9.0f} ops/s "
+        f"({stats['reads'] / seconds:.0f} reads/s, {stats['writes'] / seconds:.0f} writes/s, "
+        f"{stats['errors']} lock errors)"
+    )
+    return total / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads, {args.seconds:g}s, {args.write_ratio:.0%} writes")
+    stock = run("stock", args.threads, args.seconds, args.write_ratio)
+    tuned = run("tuned", args.threads, args.seconds, args.write_ratio)
+    print(f"speedup: {tuned / stock:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""In-process dispatch of batched API sub-requests.
+
+Each sub-request is turned into its own request object and handed
+straight to the view the URL resolver picks, so a batch of N small calls
+costs one round trip instead of N. Sub-requests run as the batch's caller:
+the already-authenticated user is forced onto them instead of looking the
+token up again. Middleware doesn't run for sub-requests; the batch request
+itself went through it, and pins the caller to the primary afterwards if
+one of its writes went through (``batch_wrote``). Within the batch, reads
+stay on the primary once a write has run, and throughout an atomic batch,
+whose writes only the primary connection can see.
+"""
+
+import io
+import json
+from contextlib import ExitStack
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from backend.routers import primary_reads
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from rest_framework.permissions import SAFE_METHODS
+
+MAX_REQUESTS = 25
+# Headers of the batch request that sub-requests inherit
+INHERITED_META = (
+    "HTTP_AUTHORIZATION",
+    "HTTP_ACCEPT_LANGUAGE",
+    "HTTP_HOST",
+    "HTTP_USER_AGENT",
+    "REMOTE_ADDR",
+    "SERVER_NAME",
+    "SERVER_PORT",
+    "SERVER_PROTOCOL",
+    "wsgi.url_scheme",
+)
+
+
+class BatchError(Exception):
+    """A sub-request that can't be dispatched at all."""
+
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _build_request(parent, method, path, body):
+    parts = urlsplit(path)
+    content = b"" if body is None else json.dumps(body).encode()
+    environ = {key: parent.META[key] for key in INHERITED_META if key in parent.META}
+    environ.update(
+        {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": parts.path,
+            "QUERY_STRING": parts.query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(content)),
+            "wsgi.input": io.BytesIO(content),
+        }
+    )
+    request = WSGIRequest(environ)
+    user = getattr(parent, "user", None)
+    if user is not None and user.is_authenticated:
+        # DRF authenticates requests carrying these with the given user
+        request._force_auth_user = user
+        request._force_auth_token = getattr(parent, "auth", None)
+    return request
+
+
+def _decode(response):
+    if response.get("Content-Type", "").startswith("application/json"):
+        return json.loads(response.content or b"null")
+    return response.content.decode(response.charset or "utf-8", errors="replace")
+
+
+def dispatch(parent, method, path, body=None):
+    """Run one sub-request and return ``(status, body)``."""
+    if not path.startswith(settings.API_PATH_PREFIX):
+        raise BatchError(400, f"{path}: only {settings.API_PATH_PREFIX} paths can be batched.")
+    request = _build_request(parent, method, path, body)
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return 404, {"detail": "Not found."}
+    if getattr(match.func, "batchable", True) is False:
+        raise BatchError(400, f"{path} can't be batched.")
+
+    view = match.func
+    if iscoroutinefunction(view):
+        view = async_to_sync(view)
+    try:
+        response = view(request, *match.args, **match.kwargs)
+    except Http404:
+        return 404, {"detail": "Not found."}
+    if hasattr(response, "render") and not response.is_rendered:
+        response.render()
+    if response.streaming:
+        raise BatchError(400, f"{path} streams its response and can't be batched.")
+    return response.status_code, _decode(response)
+
+
+def run_batch(parent, sub_requests, atomic=False):
+    """Dispatch ``sub_requests`` (dicts with method, path and body) in order.
+
+    With ``atomic`` they share one transaction: the first sub-request that
+    fails (status >= 400) rolls all of them back, and the ones after it
+    are not run (status 424).
+    """
+    results = []
+    wrote = False
+
+    def run_all(reads):
+        nonlocal wrote
+        failed = False
+        for sub in sub_requests:
+            if failed:
+                results.append({"status": 424, "body": {"detail": "Not run: an earlier request failed."}})
+                continue
+            try:
+                status, body = dispatch(parent, sub["method"], sub["path"], sub.get("body"))
+            except BatchError as e:
+                status, body = e.status, {"detail": e.detail}
+            results.append({"status": status, "body": body})
+            if sub["method"] not in SAFE_METHODS and status < 400:
+                wrote = True
+                # later sub-requests must see this write
+                reads.enter_context(primary_reads())
+            failed = atomic and status >= 400
+        return failed
+
+    with ExitStack() as reads:
+        if atomic:
+            reads.enter_context(primary_reads())
+            with transaction.atomic():
+                if run_all(reads):
+                    transaction.set_rollback(True)
+                    wrote = False
+        else:
+            run_all(reads)
+    # For ReplicaPinningMiddleware, which sees the Django request DRF wraps
+    getattr(parent, "_request", parent).batch_wrote = wrote
+    return results
@@ -0,0 +1,139 @@
+"""Idempotency keys for API POSTs.
+
+A client that may retry a write sends ``Idempotency-Key: <unique value>``.
+The first request with a key reserves it, runs, and stores its response;
+a retry with the same key gets that response back without the view
+running again (one primary-key lookup). A retry that arrives while the
+first request is still running gets 409, and a key reused with a
+different body gets 422. Server errors are not stored, so a request that
+failed with a 5xx can be retried with the same key.
+
+A running request only holds its key for IDEMPOTENCY_LEASE_SECONDS: if
+its worker dies before storing the response, a retry after the lease
+takes the key over and runs, instead of getting 409 until the key expires.
+"""
+
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+def applies_to(request):
+    """JSON POSTs to the API that carry a key. Multipart uploads are left
+    out: their bodies can be too big to hash in memory."""
+    return (
+        request.method == "POST"
+        and HEADER in request.headers
+        and request.path_info.startswith(settings.API_PATH_PREFIX)
+        and not request.content_type.startswith("multipart/")
+    )
+
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def scope_hash(request):
+    return _digest(
+        request.headers[HEADER],
+        request.method,
+        request.get_full_path(),
+        request.headers.get("Authorization", ""),
+    )
+
+
+def _error(detail, status):
+    return JsonResponse({"detail": detail}, status=status)
+
+
+def _replay(row):
+    response = HttpResponse(
+        bytes(row.body), status=row.status_code, content_type=row.content_type or None
+    )
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def begin(request):
+    """Check the key of ``request``. Returns ``(scope, None)`` when the
+    request should run (the key is now reserved), or ``(None, response)``
+    when it must be answered with ``response`` instead."""
+    key = request.headers[HEADER]
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return None, _error(f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters.", 400)
+
+    scope = scope_hash(request)
+    fingerprint = _digest(request.body)
+    now = timezone.now()
+    lease = now + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+    row = IdempotencyKey.objects.filter(pk=scope).first()
+    if row is not None and row.expires_at <= now:
+        IdempotencyKey.objects.filter(pk=scope, expires_at__lte=now).delete()
+        row = None
+    if row is None:
+        try:
+            IdempotencyKey.objects.create(
+                pk=scope,
+                fingerprint=fingerprint,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+                reserved_until=lease,
+            )
+            return scope, None
+        except IntegrityError:
+            # Another request with the same key reserved it first
+            row = IdempotencyKey.objects.filter(pk=scope).first()
+
+    if row is not None and row.fingerprint != fingerprint:
+        return None, _error(f"This {HEADER} was already used with a different request.", 422)
+    if row is not None and row.status_code is None:
+        # Take over a reservation whose lease ran out; the update only
+        # succeeds for one of several concurrent retries
+        taken = IdempotencyKey.objects.filter(
+            Q(reserved_until__lte=now) | Q(reserved_until__isnull=True),
+            pk=scope,
+            status_code__isnull=True,
+        ).update(reserved_until=lease)
+        if taken:
+            return scope, None
+    if row is None or row.status_code is None:
+        return None, _error(f"A request with this {HEADER} is still being processed.", 409)
+    return None, _replay(row)
+
+
+def finish(scope, response):
+    """Store ``response`` for ``scope``, or release the key if the response
+    shouldn't be replayed (server errors, streams)."""
+    if response.status_code >= 500 or response.streaming:
+        IdempotencyKey.objects.filter(pk=scope).delete()
+        return
+    IdempotencyKey.objects.filter(pk=scope).update(
+        status_code=response.status_code,
+        content_type=response.get("Content-Type", ""),
+        body=response.content,
+    )
+
+
+def release(scope):
+    IdempotencyKey.objects.filter(pk=scope).delete()
+
+
+def sweep_expired_keys(now=None):
+    """Delete every expired key in one statement; returns the row count."""
+    deleted, _ = IdempotencyKey.objects.filter(
+        expires_at__lte=now or timezone.now()
+    ).delete()
+    return deleted
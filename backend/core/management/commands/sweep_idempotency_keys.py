@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.idempotency import sweep_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Delete expired idempotency keys. Meant to run periodically (e.g. cron)."
+
+    def handle(self, *args, **options):
+        deleted = sweep_expired_keys()
+        self.stdout.write(f"Deleted {deleted} expired idempotency keys")
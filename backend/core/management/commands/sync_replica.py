@@ -0,0 +1,39 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from backend.routers import PRIMARY, REPLICA, replica_configured
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database onto the replica file with the "
+        "online backup API. Run it periodically (e.g. every minute) as the "
+        "local stand-in for real replication."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=1024,
+            help="Pages copied per step; readers of the replica can run between steps.",
+        )
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError("No replica database configured (set REPLICA_DATABASE_NAME).")
+        primary = connections.databases[PRIMARY]
+        replica = connections.databases[REPLICA]
+        if primary["ENGINE"] != replica["ENGINE"] or "sqlite3" not in primary["ENGINE"]:
+            raise CommandError("sync_replica only supports SQLite primary and replica.")
+
+        source = sqlite3.connect(primary["NAME"])
+        target = sqlite3.connect(replica["NAME"])
+        try:
+            source.backup(target, pages=options["pages"])
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(f"Replica {replica['NAME']} synced from {primary['NAME']}")
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('scope_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('body', models.BinaryField(blank=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
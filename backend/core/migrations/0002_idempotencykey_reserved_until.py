@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='reserved_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
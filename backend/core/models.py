@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """The stored first response to a request sent with an Idempotency-Key.
+
+    The primary key is the SHA-256 of the key together with the method,
+    path and credentials it was used with, so keys of different clients
+    never collide. ``status_code`` is null while the first request is
+    still running; it holds the key until ``reserved_until``, after which
+    a retry may take it over (the first worker is presumed dead).
+    """
+
+    scope_hash = models.CharField(max_length=64, primary_key=True)
+    fingerprint = models.CharField(max_length=64)  # SHA-256 of the request body
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    body = models.BinaryField(blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+    reserved_until = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.scope_hash[:12]} | {self.status_code} | expires {self.expires_at}"
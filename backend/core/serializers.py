@@ -0,0 +1,15 @@
+from rest_framework import serializers
+
+from .batch import MAX_REQUESTS
+
+
+# /api/batch
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=["GET", "POST", "PUT", "PATCH", "DELETE"])
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False, allow_null=True)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False, max_length=MAX_REQUESTS)
+    atomic = serializers.BooleanField(default=False)
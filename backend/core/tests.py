@@ -0,0 +1,293 @@
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, RequestFactory, TestCase
+from django.utils import timezone
+from core.models import IdempotencyKey
+from giraph.models import LayerChoices, Node, Relation
+from programs.models import Program
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from users.models import User
+
+from backend import cache as shared_cache
+from backend import routers
+from backend.routers import PrimaryReplicaRouter, replica_reads
+
+
+class ReplicaRouterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        patcher = mock.patch.object(routers, "replica_configured", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_alias(self, request):
+        @replica_reads
+        def view(request):
+            return self.router.db_for_read(Node)
+
+        return view(request)
+
+    def test_marked_views_read_from_replica(self):
+        request = self.factory.get("/", HTTP_AUTHORIZATION="Token abc")
+        self.assertEqual(self.read_alias(request), "replica")
+        # Outside a marked view everything stays on the primary
+        self.assertEqual(self.router.db_for_read(Node), "default")
+
+    def test_writes_always_go_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Node), "default")
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token abc")
+        client.post("/api/giraph/create_program_outcome/", {"name": "PO"}, format="json")
+
+        same_client = self.factory.get("/", HTTP_AUTHORIZATION="Token abc")
+        other_client = self.factory.get("/", HTTP_AUTHORIZATION="Token xyz")
+        self.assertEqual(self.read_alias(same_client), "default")
+        self.assertEqual(self.read_alias(other_client), "replica")
+
+    def test_falls_back_to_primary_without_replica(self):
+        request = self.factory.get("/")
+        with mock.patch.object(routers, "replica_configured", return_value=False):
+            self.assertEqual(self.read_alias(request), "default")
+
+
+class BrowserMiddlewareTest(TestCase):
+    def test_api_requests_skip_browser_middleware(self):
+        response = self.client.get("/api/giraph/ping/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Frame-Options", response)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+        self.assertFalse(hasattr(response.wsgi_request, "user"))
+
+    def test_admin_keeps_the_full_stack(self):
+        response = self.client.get("/admin/login/")
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+        self.assertTrue(hasattr(response.wsgi_request, "session"))
+
+        csrf_client = Client(enforce_csrf_checks=True)
+        response = csrf_client.post("/admin/login/", {"username": "x", "password": "y"})
+        self.assertEqual(response.status_code, 403)
+
+
+class SharedCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_version_invalidates_the_namespace(self):
+        key = shared_cache.versioned_key("things", "list")
+        self.assertEqual(shared_cache.get_or_compute(key, lambda: "old"), "old")
+        self.assertEqual(shared_cache.get_or_compute(key, lambda: "new"), "old")
+
+        shared_cache.bump_version("things")
+        key = shared_cache.versioned_key("things", "list")
+        self.assertEqual(shared_cache.get_or_compute(key, lambda: "new"), "new")
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return 42
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(shared_cache.get_or_compute("slow", compute)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_waiter_computes_when_the_lock_is_held_too_long(self):
+        cache.add("stuck:lock", 1)
+        with mock.patch.object(shared_cache, "WAIT_TIMEOUT", 0):
+            self.assertEqual(shared_cache.get_or_compute("stuck", lambda: "mine"), "mine")
+        self.assertTrue(cache.get("stuck:lock"))  # not ours to release
+
+
+class BatchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="batchhead", email="batchhead@example.com", role="head")
+        self.course = Program.objects.create(name="Batch Course", lecturer=self.user)
+        self.auth = f"Token {Token.objects.create(user=self.user).key}"
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.auth)
+
+    def batch(self, *requests, atomic=False):
+        response = self.client.post(
+            "/api/batch/",
+            {"requests": [dict(zip(("method", "path", "body"), r)) for r in requests], "atomic": atomic},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["responses"]
+
+    def test_page_load_calls_in_one_request(self):
+        responses = self.batch(
+            ("GET", "/api/users/me/"),
+            ("GET", "/api/programs/list_courses/"),
+            ("GET", f"/api/giraph/get_nodes/?courseId={self.course.id}"),
+            ("GET", "/api/giraph/async/get_program_outcomes/"),
+            ("GET", "/api/nowhere/"),
+        )
+        self.assertEqual([r["status"] for r in responses], [200, 200, 200, 200, 404])
+        self.assertEqual(responses[0]["body"]["username"], "batchhead")
+        self.assertEqual(responses[2]["body"]["program_outcomes"], [])
+
+    def test_caller_identity_is_used(self):
+        anonymous = APIClient().post(
+            "/api/batch/", {"requests": [{"method": "GET", "path": "/api/users/me/"}]}, format="json"
+        )
+        self.assertEqual(anonymous.json()["responses"][0]["status"], 401)
+
+    def test_atomic_batch_rolls_back_on_failure(self):
+        node = {"name": "CC", "layer": LayerChoices.COURSE_CONTENT, "course_id": str(self.course.id)}
+        responses = self.batch(
+            ("POST", "/api/giraph/new_node/", node),
+            ("POST", "/api/giraph/new_relation/", {"node1_id": 0, "node2_id": 0, "weight": 9}),
+            ("POST", "/api/giraph/new_node/", node),
+            atomic=True,
+        )
+        self.assertEqual([r["status"] for r in responses], [201, 400, 424])
+        self.assertFalse(Node.objects.exists())
+
+        responses = self.batch(
+            ("POST", "/api/giraph/new_node/", node),
+            ("POST", "/api/giraph/new_relation/", {"node1_id": 0, "node2_id": 0, "weight": 9}),
+        )
+        self.assertEqual([r["status"] for r in responses], [201, 400])
+        self.assertEqual(Node.objects.count(), 1)
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        primary_only = []
+
+        def use_primary(request):
+            primary_only.append(routers._primary_only.get())
+            return True  # the tests have no replica to read from
+
+        node = {"name": "CC", "layer": LayerChoices.COURSE_CONTENT, "course_id": str(self.course.id)}
+        get_nodes = ("GET", f"/api/giraph/get_nodes/?courseId={self.course.id}")
+        with mock.patch.object(routers, "_use_primary", side_effect=use_primary):
+            self.batch(get_nodes, ("POST", "/api/giraph/new_node/", node), get_nodes)
+            self.batch(get_nodes, atomic=True)
+        self.assertEqual(primary_only, [False, True, True])
+        self.assertFalse(routers._primary_only.get())
+
+    def test_only_batches_that_wrote_pin_to_primary(self):
+        caller = RequestFactory().get("/", HTTP_AUTHORIZATION=self.auth)
+        node = {"name": "CC", "layer": LayerChoices.COURSE_CONTENT, "course_id": str(self.course.id)}
+        with mock.patch.object(routers, "replica_configured", return_value=True), \
+                mock.patch.object(routers, "_use_primary", return_value=True):
+            self.batch(("GET", "/api/users/me/"), ("GET", "/api/programs/list_courses/"))
+            self.assertFalse(routers.is_pinned(caller))
+            # A rolled back atomic batch wrote nothing either
+            self.batch(("POST", "/api/giraph/new_node/", node), ("GET", "/api/nowhere/"), atomic=True)
+            self.assertFalse(routers.is_pinned(caller))
+            self.batch(("POST", "/api/giraph/new_node/", node))
+            self.assertTrue(routers.is_pinned(caller))
+
+    def test_rejected_sub_requests(self):
+        responses = self.batch(
+            ("POST", "/api/batch/", {"requests": []}),
+            ("GET", "/admin/"),
+            ("GET", f"/api/attainment/export/?courseId={self.course.id}"),
+        )
+        self.assertEqual([r["status"] for r in responses], [400, 400, 400])
+        self.assertIn("streams", responses[2]["body"]["detail"])
+
+
+class IdempotencyKeyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.head = User.objects.create(username="idemhead", email="idemhead@example.com", role="head")
+        self.course = Program.objects.create(name="Idempotent Course", lecturer=self.head)
+        self.client = APIClient()
+
+    def post(self, path, data, key, **headers):
+        return self.client.post(path, data, format="json", headers={"Idempotency-Key": key, **headers})
+
+    def new_node(self, key, name="CC"):
+        data = {"name": name, "layer": LayerChoices.COURSE_CONTENT, "course_id": str(self.course.id)}
+        return self.post("/api/giraph/new_node/", data, key)
+
+    def test_retry_replays_the_first_response(self):
+        first = self.new_node("retry-1")
+        self.assertEqual(first.status_code, 201)
+        with self.assertNumQueries(1):
+            retry = self.new_node("retry-1")
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Node.objects.count(), 1)
+
+        # a new key is a new request
+        self.assertEqual(self.new_node("retry-2").status_code, 201)
+        self.assertEqual(Node.objects.count(), 2)
+
+    def test_relation_retry_is_not_a_conflict(self):
+        cc = Node.objects.create(name="CC", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+        co = Node.objects.create(name="CO", layer=LayerChoices.COURSE_OUTCOME, course=self.course)
+        data = {"node1_id": cc.id, "node2_id": co.id, "weight": 3}
+        first = self.post("/api/giraph/new_relation/", data, "rel")
+        retry = self.post("/api/giraph/new_relation/", data, "rel")
+        self.assertEqual((first.status_code, retry.status_code), (201, 201))
+        self.assertEqual(Relation.objects.count(), 1)
+
+    def test_key_reuse_and_in_flight_requests(self):
+        self.new_node("reuse")
+        self.assertEqual(self.new_node("reuse", name="Other").status_code, 422)
+
+        self.new_node("in-flight")
+        IdempotencyKey.objects.update(status_code=None)
+        self.assertEqual(self.new_node("in-flight").status_code, 409)
+
+    def test_abandoned_reservation_is_taken_over(self):
+        # the first worker died after reserving the key
+        self.new_node("abandoned")
+        IdempotencyKey.objects.update(
+            status_code=None, reserved_until=timezone.now() - timedelta(seconds=1)
+        )
+        retry = self.new_node("abandoned")
+        self.assertEqual(retry.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", retry)
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 201)
+        self.assertEqual(self.new_node("abandoned")["Idempotent-Replayed"], "true")
+
+    def test_keys_are_scoped_to_the_caller(self):
+        token = Token.objects.create(user=self.head).key
+        data = {"name": "Course", "lecturer_id": str(self.head.id), "university": "U", "department": "D"}
+        auth = {"Authorization": f"Token {token}"}
+        first = self.post("/api/programs/create_course/", data, "course", **auth)
+        retry = self.post("/api/programs/create_course/", data, "course", **auth)
+        self.assertEqual((first.status_code, retry.status_code), (201, 201))
+        self.assertEqual(Program.objects.filter(name="Course").count(), 1)
+        # same key without the credentials: not the same request
+        self.assertEqual(self.post("/api/programs/create_course/", data, "course").status_code, 401)
+
+    def test_sweep_and_expiry(self):
+        self.new_node("old")
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        # an expired key no longer replays
+        self.assertNotIn("Idempotent-Replayed", self.new_node("old"))
+        self.assertEqual(Node.objects.count(), 2)
+
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        out = StringIO()
+        call_command("sweep_idempotency_keys", stdout=out)
+        self.assertIn("Deleted 1", out.getvalue())
+        self.assertFalse(IdempotencyKey.objects.exists())
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import batch
+
+urlpatterns = [
+    path("batch/", batch, name="batch"),
+]
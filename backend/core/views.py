@@ -0,0 +1,30 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from .batch import run_batch
+from .serializers import BatchSerializer
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def batch(request):
+    """
+    POST /api/batch/
+    Body: {"requests": [{"method": str, "path": str, "body": any}], "atomic": bool}
+    Runs the sub-requests in order as the caller and returns their
+    responses as {"responses": [{"status": int, "body": any}]}. Each
+    sub-request is authorized by its own view.
+    """
+    ser = BatchSerializer(data=request.data)
+    ser.is_valid(raise_exception=True)
+
+    responses = run_batch(
+        request, ser.validated_data["requests"], atomic=ser.validated_data["atomic"]
+    )
+    return Response({"responses": responses}, status=status.HTTP_200_OK)
+
+
+# No batches inside batches
+batch.batchable = False
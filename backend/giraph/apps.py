@@ -1,6 +1,25 @@
+import atexit
+
 from django.apps import AppConfig
+from django.core.signals import request_finished
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def install_search_index(sender, using, **kwargs):
+    from .search import ensure_fts_schema
+
+    ensure_fts_schema(connections[using])
 
 
 class GiraphConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'giraph'
+
+    def ready(self):
+        post_migrate.connect(install_search_index, sender=self)
+
+        from . import audit
+
+        request_finished.connect(audit.flush_if_due, dispatch_uid="giraph_audit_flush")
+        atexit.register(audit.flush)
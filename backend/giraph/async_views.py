@@ -0,0 +1,63 @@
+"""Async variants of the giraph read endpoints for ASGI deployments.
+
+They return the same payloads as their APIView counterparts but never
+block the event loop, so one worker can serve many concurrent graph loads.
+"""
+
+from asgiref.sync import sync_to_async
+from backend.routers import replica_reads
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from programs.lookups import acourse_exists
+
+from .models import LayerChoices, Node
+from .payloads import (
+    aget_graph_payload,
+    get_graph_payloads,
+    multi_payload_response,
+    parse_course_ids,
+    payload_response,
+)
+
+
+async def _fetch(queryset):
+    return [obj async for obj in queryset.aiterator()]
+
+
+@require_GET
+@replica_reads
+async def get_nodes(request):
+    """GET /api/giraph/async/get_nodes/?courseId=<id>
+    GET /api/giraph/async/get_nodes/?courseIds=<id>,<id>,...
+    """
+    if "courseIds" in request.GET:
+        return await _get_many(request.GET["courseIds"])
+
+    course_id = request.GET.get("courseId") or None
+    if course_id and not await acourse_exists(course_id):
+        return JsonResponse({"detail": f"Course {course_id} not found"}, status=404)
+
+    return payload_response(await aget_graph_payload(course_id), request)
+
+
+async def _get_many(raw_ids):
+    try:
+        scopes = parse_course_ids(raw_ids)
+    except ValueError as e:
+        return JsonResponse({"detail": str(e)}, status=422)
+    for scope in scopes:
+        if not await acourse_exists(scope):
+            return JsonResponse({"detail": f"Course {scope} not found"}, status=404)
+
+    payloads = await sync_to_async(get_graph_payloads)(scopes)
+    return multi_payload_response({scope: payloads[scope] for scope in scopes})
+
+
+@require_GET
+@replica_reads
+async def get_program_outcomes(request):
+    """GET /api/giraph/async/get_program_outcomes/"""
+    outcomes = await _fetch(
+        Node.objects.filter(layer=LayerChoices.PROGRAM_OUTCOME).values("id", "name")
+    )
+    return JsonResponse({"program_outcomes": outcomes})
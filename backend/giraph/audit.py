@@ -0,0 +1,130 @@
+"""Write-behind audit log of graph edits.
+
+Mutation views call ``record()``, which only appends to an in-process
+buffer, and only once the enclosing transaction commits: an edit that is
+rolled back (e.g. with the rest of an atomic batch) leaves no event.
+Nothing is written on the request's path. The buffer is written
+with one ``bulk_create`` when it holds AUDIT_BUFFER_SIZE events, when a
+request finishes and the oldest event is older than AUDIT_FLUSH_SECONDS,
+and when the process exits. Flushing on request_finished rather than from
+a timer thread keeps every write on a request thread's own connection.
+
+Events are kept in memory until flushed, so a process that is killed
+(rather than shut down) loses at most one buffer's worth of events. A
+flush never happens inside a transaction, where it could be rolled back
+along with somebody else's work; the events wait for the next chance.
+
+The giraph views don't authenticate, so the actor is taken from the
+request's token when there is one; tokens are resolved to users in one
+query per flush.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+
+def _token_key(request):
+    keyword, _, key = request.headers.get("Authorization", "").partition(" ")
+    return key.strip() if keyword == "Token" and key else None
+
+
+class AuditBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = []  # (AuditEvent, token key or None)
+        self._oldest = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def add(self, event, token_key=None):
+        with self._lock:
+            self._events.append((event, token_key))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._events) >= settings.AUDIT_BUFFER_SIZE
+        if full:
+            self.flush()
+
+    def due(self):
+        oldest = self._oldest
+        return oldest is not None and time.monotonic() - oldest >= settings.AUDIT_FLUSH_SECONDS
+
+    def take(self):
+        with self._lock:
+            events, self._events, self._oldest = self._events, [], None
+        return events
+
+    def clear(self):
+        self.take()
+
+    def flush(self):
+        """Write every buffered event; returns how many were written.
+        Inside a transaction nothing is written and the events stay."""
+        if connection.in_atomic_block:
+            return 0
+        events = self.take()
+        if not events:
+            return 0
+        keys = {key for _, key in events if key}
+        actors = {}
+        if keys:
+            actors = {
+                key: (user_id, username)
+                for key, user_id, username in Token.objects.filter(key__in=keys).values_list(
+                    "key", "user_id", "user__username"
+                )
+            }
+        for event, key in events:
+            if key in actors:
+                event.actor_id, event.actor_username = actors[key]
+        try:
+            AuditEvent.objects.bulk_create([event for event, _ in events])
+        except DatabaseError:
+            # Write-behind: a failed flush must not fail whatever request
+            # happened to trigger it
+            logger.exception("Dropped %d audit events", len(events))
+            return 0
+        return len(events)
+
+
+buffer = AuditBuffer()
+
+
+def record(request, action, object_id=None, course_id=None, **data):
+    """Buffer an audit event for ``request``'s caller once the current
+    transaction commits (right away outside one)."""
+    event = AuditEvent(
+        created_at=timezone.now(),
+        course_id=course_id,
+        action=action,
+        object_id=object_id,
+        data=data,
+    )
+    user = getattr(request, "user", None)
+    token_key = None
+    if user is not None and user.is_authenticated:
+        event.actor_id, event.actor_username = user.pk, user.get_username()
+    else:
+        token_key = _token_key(request)
+    transaction.on_commit(lambda: buffer.add(event, token_key))
+
+
+def flush():
+    return buffer.flush()
+
+
+def flush_if_due(sender, **kwargs):
+    """request_finished receiver, connected in apps.py."""
+    if buffer.due():
+        buffer.flush()
@@ -0,0 +1,52 @@
+"""Set-based deletes of nodes and relations.
+
+Each call is one transaction: a handful of statements whatever the number
+of rows, the weight totals and outcome paths adjusted in bulk, and a single
+graph version bump covering every course touched.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import LayerChoices, Relation
+from .paths import refresh_paths
+from .totals import apply_relation_deltas, detach_nodes
+from .versioning import bump_graph_version
+
+
+def delete_nodes(nodes):
+    """Delete the ``nodes`` queryset with everything hanging off it.
+    Returns ``(nodes_deleted, relations_deleted, per_course)``, the last
+    being ``{course_id: nodes_deleted}`` (``None`` for program outcomes)."""
+    with transaction.atomic():
+        scopes = list(
+            nodes.order_by().values_list("course_id", "layer").annotate(count=Count("pk"))
+        )
+        if not scopes:
+            return 0, 0, {}
+        detach_nodes(nodes)
+        _, counts = nodes.delete()
+        bump_graph_version(
+            course_ids={course_id for course_id, _, _ in scopes},
+            program_outcomes=any(layer == LayerChoices.PROGRAM_OUTCOME for _, layer, _ in scopes),
+        )
+    per_course = Counter()
+    for course_id, _, count in scopes:
+        per_course[course_id] += count
+    return counts.get("giraph.Node", 0), counts.get("giraph.Relation", 0), dict(per_course)
+
+
+def delete_relations(relations):
+    """Delete the ``relations`` queryset. Returns ``(deleted, per_course)``
+    with ``per_course`` as ``{course_id: deleted}``."""
+    with transaction.atomic():
+        rows = list(relations.values_list("pk", "node1_id", "node2_id", "weight", "node1__course_id"))
+        if not rows:
+            return 0, {}
+        deleted, _ = Relation.objects.filter(pk__in=[row[0] for row in rows]).delete()
+        apply_relation_deltas((node1_id, node2_id, -weight, -1) for _, node1_id, node2_id, weight, _ in rows)
+        refresh_paths(node_id for row in rows for node_id in row[1:3])
+        bump_graph_version(course_ids={row[4] for row in rows})
+    return deleted, dict(Counter(row[4] for row in rows))
@@ -0,0 +1,92 @@
+"""Queries and payload assembly for the get_nodes/ graph response.
+
+The three querysets are independent of each other, so callers can run them
+in any order, or concurrently in the async views.
+"""
+
+from django.db.models import F, Q
+
+from .models import LayerChoices, Node, Relation
+
+NODE_FIELDS = ("id", "name", "layer", "course_id")
+RELATION_FIELDS = ("id", "node1_id", "node2_id", "weight")
+
+
+def program_outcome_nodes():
+    """Program outcomes are global (course=None) and part of every graph."""
+    return Node.objects.filter(layer=LayerChoices.PROGRAM_OUTCOME).only(*NODE_FIELDS)
+
+
+def course_nodes(course_id=None):
+    """Course contents and outcomes of one course, or of all courses."""
+    qs = Node.objects.exclude(layer=LayerChoices.PROGRAM_OUTCOME)
+    if course_id is not None:
+        qs = qs.filter(course_id=course_id)
+    return qs.only(*NODE_FIELDS)
+
+
+def graph_relations(course_id=None):
+    """Relations whose two ends both belong to the graph of ``course_id``."""
+    qs = Relation.objects.all()
+    if course_id is not None:
+        qs = qs.filter(node1__course_id=course_id).filter(
+            Q(node2__course_id=course_id) | Q(node2__layer=LayerChoices.PROGRAM_OUTCOME)
+        )
+    return qs.only(*RELATION_FIELDS)
+
+
+def multi_course_nodes(course_ids):
+    """Nodes of several course graphs in one query: the courses' own nodes
+    plus the program outcomes, which every one of those graphs shares."""
+    return Node.objects.filter(
+        Q(course_id__in=course_ids) | Q(layer=LayerChoices.PROGRAM_OUTCOME)
+    ).only(*NODE_FIELDS)
+
+
+def multi_course_relations(course_ids):
+    """``graph_relations`` of several courses in one query; group them by
+    ``node1_course_id``."""
+    return (
+        Relation.objects.filter(node1__course_id__in=course_ids)
+        .filter(
+            Q(node2__course_id=F("node1__course_id"))
+            | Q(node2__layer=LayerChoices.PROGRAM_OUTCOME)
+        )
+        .annotate(node1_course_id=F("node1__course_id"))
+        .only(*RELATION_FIELDS)
+    )
+
+
+def build_graph_payload(nodes, relations, positions=None):
+    """Group ``nodes`` by layer, each with the relations touching it, and
+    with its ``x``/``y`` when ``positions`` (``{node_id: (x, y)}``) is given."""
+    rel_map = {n.id: [] for n in nodes}
+    for r in relations:
+        stub = {
+            "node1_id": r.node1_id,
+            "node2_id": r.node2_id,
+            "relation_id": r.id,
+            "weight": r.weight,
+        }
+        if r.node1_id in rel_map:
+            rel_map[r.node1_id].append(stub)
+        if r.node2_id in rel_map:
+            rel_map[r.node2_id].append(stub)
+
+    cc, co, po = [], [], []
+    for n in nodes:
+        pack = {"id": n.id, "name": n.name, "relations": rel_map[n.id]}
+        if positions is not None:
+            pack["x"], pack["y"] = positions[n.id]
+        if n.layer == LayerChoices.COURSE_CONTENT:
+            cc.append(pack)
+        elif n.layer == LayerChoices.COURSE_OUTCOME:
+            co.append(pack)
+        else:
+            po.append(pack)
+
+    return {
+        "course_contents": cc,
+        "course_outcomes": co,
+        "program_outcomes": po,
+    }
@@ -0,0 +1,114 @@
+"""Layered layout of a graph: course contents, course outcomes and program
+outcomes in three columns, ordered within each column to keep edge
+crossings down.
+
+The ordering is the barycenter heuristic of Sugiyama-style layouts: sweep
+down and up the layers, and sort each layer by the mean position of its
+neighbours in the layer just fixed. The best ordering seen (by exact
+crossing count) is kept. Nodes without neighbours on the reference side
+keep their place.
+
+Layouts are computed when a get_nodes/ payload is rendered and stored in
+it, so they are cached per graph stamp like the rest of the response.
+"""
+
+from collections import defaultdict
+
+from .models import LayerChoices
+
+LAYERS = (
+    LayerChoices.COURSE_CONTENT,
+    LayerChoices.COURSE_OUTCOME,
+    LayerChoices.PROGRAM_OUTCOME,
+)
+# Matches the columns MainGraph.tsx used to hardcode
+COLUMN_X = (50, 500, 950)
+ROW_HEIGHT = 120
+TOP = 100
+MAX_SWEEPS = 8
+
+
+def _crossings(upper, lower, edges):
+    """Crossings between two adjacent layers, counted as inversions of the
+    lower positions once edges are sorted by their upper position."""
+    up = {n: i for i, n in enumerate(upper)}
+    down = {n: i for i, n in enumerate(lower)}
+    pairs = sorted((up[a], down[b]) for a, b in edges if a in up and b in down)
+    # Fenwick tree over lower positions: for each edge, count the edges
+    # already seen (smaller upper) that land further down than it.
+    tree = [0] * (len(lower) + 1)
+    crossings = seen = 0
+    for _, pos in pairs:
+        i, not_crossing = pos + 1, 0
+        while i > 0:
+            not_crossing += tree[i]
+            i -= i & -i
+        crossings += seen - not_crossing
+        seen += 1
+        i = pos + 1
+        while i <= len(lower):
+            tree[i] += 1
+            i += i & -i
+    return crossings
+
+
+def _reorder(layer, fixed, neighbours):
+    """Sort ``layer`` by the barycenter of each node's neighbours in the
+    ``fixed`` layer; a node with none keeps its current position."""
+    pos = {n: i for i, n in enumerate(fixed)}
+    keys = {}
+    for i, node in enumerate(layer):
+        ranks = [pos[m] for m in neighbours[node] if m in pos]
+        keys[node] = sum(ranks) / len(ranks) if ranks else i * len(fixed) / max(len(layer), 1)
+    # sorted() is stable, so ties keep their current order
+    return sorted(layer, key=keys.__getitem__)
+
+
+def order_layers(layers, edges):
+    """Return ``layers`` (lists of node ids) reordered to reduce crossings.
+    ``edges`` are ``(node1_id, node2_id)`` pairs between adjacent layers."""
+    layers = [list(layer) for layer in layers]
+    neighbours = defaultdict(list)
+    for a, b in edges:
+        neighbours[a].append(b)
+        neighbours[b].append(a)
+
+    def total(candidate):
+        return sum(
+            _crossings(candidate[i], candidate[i + 1], edges)
+            for i in range(len(candidate) - 1)
+        )
+
+    best, best_crossings = [list(layer) for layer in layers], total(layers)
+    for sweep in range(MAX_SWEEPS):
+        if best_crossings == 0:
+            break
+        if sweep % 2 == 0:
+            for i in range(1, len(layers)):
+                layers[i] = _reorder(layers[i], layers[i - 1], neighbours)
+        else:
+            for i in range(len(layers) - 2, -1, -1):
+                layers[i] = _reorder(layers[i], layers[i + 1], neighbours)
+        crossings = total(layers)
+        if crossings < best_crossings:
+            best, best_crossings = [list(layer) for layer in layers], crossings
+    return best
+
+
+def layered_layout(nodes, relations):
+    """``{node_id: (x, y)}`` for ``nodes`` (objects with ``id`` and
+    ``layer``) and ``relations`` (with ``node1_id`` and ``node2_id``).
+    Shorter columns are centred against the tallest one."""
+    layers = [[] for _ in LAYERS]
+    for n in sorted(nodes, key=lambda n: n.id):
+        layers[LAYERS.index(n.layer)].append(n.id)
+    edges = [(r.node1_id, r.node2_id) for r in relations]
+
+    ordered = order_layers(layers, edges)
+    tallest = max((len(layer) for layer in ordered), default=0)
+    positions = {}
+    for column, layer in enumerate(ordered):
+        offset = TOP + (tallest - len(layer)) * ROW_HEIGHT // 2
+        for row, node_id in enumerate(layer):
+            positions[node_id] = (COLUMN_X[column], offset + row * ROW_HEIGHT)
+    return positions
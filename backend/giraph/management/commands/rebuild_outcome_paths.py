@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from giraph.paths import rebuild_paths, stale_paths
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the course content -> course outcome -> program outcome "
+        "path table from the relations table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report how many paths are missing or stale; change nothing.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            self.stdout.write(f"{stale_paths()} paths are missing or stale")
+            return
+        total = rebuild_paths()
+        self.stdout.write(f"Rebuilt {total} paths")
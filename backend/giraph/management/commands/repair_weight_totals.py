@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from giraph.totals import drifted_nodes, repair_weight_totals
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized relation weight totals of every node "
+        "from the relations table, in one grouped UPDATE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report how many nodes have drifted; change nothing.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            self.stdout.write(f"{drifted_nodes().count()} nodes have drifted totals")
+            return
+        repaired = repair_weight_totals()
+        self.stdout.write(f"Repaired the totals of {repaired} nodes")
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('giraph', '0003_node_course'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GraphPayload',
+            fields=[
+                ('scope', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('stamp', models.CharField(max_length=64)),
+                ('identity', models.BinaryField()),
+                ('gzip', models.BinaryField()),
+                ('brotli', models.BinaryField(null=True)),
+                ('rendered_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GraphVersion',
+            fields=[
+                ('scope', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('giraph', '0004_graphversion_graphpayload'),
+        ('programs', '0003_program_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotNode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node_id', models.BigIntegerField()),
+                ('name', models.CharField(max_length=255)),
+                ('layer', models.CharField(choices=[('course_content', 'course_content'), ('course_outcome', 'course_outcome'), ('program_outcome', 'program_outcome')], max_length=32)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('node_id', 'name', 'layer'), name='unique_snapshot_node')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SnapshotRelation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node1_id', models.BigIntegerField()),
+                ('node2_id', models.BigIntegerField()),
+                ('weight', models.PositiveSmallIntegerField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('node1_id', 'node2_id', 'weight'), name='unique_snapshot_relation')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GraphSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='programs.program')),
+                ('nodes', models.ManyToManyField(related_name='snapshots', to='giraph.snapshotnode')),
+                ('relations', models.ManyToManyField(related_name='snapshots', to='giraph.snapshotrelation')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('course', 'semester'), name='unique_course_semester')],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:59
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_totals(apps, schema_editor):
+    Node = apps.get_model("giraph", "Node")
+    Relation = apps.get_model("giraph", "Relation")
+
+    def aggregate(end, expression):
+        totals = (
+            Relation.objects.filter(**{end: OuterRef("pk")})
+            .order_by()
+            .values(end)
+            .annotate(total=expression)
+            .values("total")
+        )
+        return Coalesce(Subquery(totals), Value(0), output_field=IntegerField())
+
+    Node.objects.update(
+        in_weight_sum=aggregate("node2", Sum("weight")),
+        in_count=aggregate("node2", Count("pk")),
+        out_weight_sum=aggregate("node1", Sum("weight")),
+        out_count=aggregate("node1", Count("pk")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('giraph', '0005_graph_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='node',
+            name='in_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='in_weight_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='out_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='out_weight_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
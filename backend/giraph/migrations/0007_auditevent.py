@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('giraph', '0006_node_weight_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('course_id', models.UUIDField(blank=True, null=True)),
+                ('action', models.CharField(max_length=32)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('actor_id', models.UUIDField(blank=True, null=True)),
+                ('actor_username', models.CharField(blank=True, max_length=150)),
+                ('data', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course_id', 'created_at'], name='audit_course_time_idx'), models.Index(fields=['created_at'], name='audit_time_idx')],
+            },
+        ),
+    ]
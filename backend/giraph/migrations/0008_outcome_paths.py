@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_paths(apps, schema_editor):
+    OutcomePath = apps.get_model("giraph", "OutcomePath")
+    Relation = apps.get_model("giraph", "Relation")
+
+    outcomes = {}
+    for co_id, po_id, weight in Relation.objects.filter(
+        node1__layer="course_outcome", node2__layer="program_outcome"
+    ).values_list("node1_id", "node2_id", "weight"):
+        outcomes.setdefault(co_id, []).append((po_id, weight))
+    OutcomePath.objects.bulk_create(
+        [
+            OutcomePath(
+                course_content_id=cc_id,
+                course_outcome_id=co_id,
+                program_outcome_id=po_id,
+                course_id=course_id,
+                content_weight=content_weight,
+                outcome_weight=outcome_weight,
+                weight=content_weight * outcome_weight,
+            )
+            for cc_id, co_id, content_weight, course_id in Relation.objects.filter(
+                node1__layer="course_content", node2__layer="course_outcome"
+            ).values_list("node1_id", "node2_id", "weight", "node1__course_id")
+            for po_id, outcome_weight in outcomes.get(co_id, ())
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('giraph', '0007_auditevent'),
+        ('programs', '0003_program_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutcomePath',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_weight', models.PositiveSmallIntegerField()),
+                ('outcome_weight', models.PositiveSmallIntegerField()),
+                ('weight', models.PositiveSmallIntegerField()),
+                ('course', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='programs.program')),
+                ('course_content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='giraph.node')),
+                ('course_outcome', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='giraph.node')),
+                ('program_outcome', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='giraph.node')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['program_outcome', 'course'], name='path_po_course_idx')],
+                'constraints': [models.UniqueConstraint(fields=('course_content', 'course_outcome', 'program_outcome'), name='unique_outcome_path')],
+            },
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
@@ -14,6 +14,12 @@ class Node(models.Model):
     course = models.ForeignKey(
         Program, on_delete=models.CASCADE, related_name="nodes", null=True, blank=True
     )
+    # Totals of the relations ending (in_) and starting (out_) here, kept in
+    # step with every relation write by giraph.totals
+    in_weight_sum = models.PositiveIntegerField(default=0)
+    in_count = models.PositiveIntegerField(default=0)
+    out_weight_sum = models.PositiveIntegerField(default=0)
+    out_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.id} | {self.layer} | {self.name}"
@@ -34,3 +40,150 @@ class Relation(models.Model):
 
     def __str__(self):
         return f"{self.id} | {self.node1_id}->{self.node2_id} (w={self.weight})"
+
+
+class OutcomePath(models.Model):
+    """One course content → course outcome → program outcome path with the
+    product of its two weights. Kept in step with every relation write by
+    giraph.paths; deleting a node takes its paths with it. ``course`` is
+    the course content's course."""
+
+    course_content = models.ForeignKey(Node, on_delete=models.CASCADE, related_name="+")
+    course_outcome = models.ForeignKey(Node, on_delete=models.CASCADE, related_name="+")
+    program_outcome = models.ForeignKey(Node, on_delete=models.CASCADE, related_name="+")
+    course = models.ForeignKey(
+        Program, on_delete=models.CASCADE, related_name="+", null=True, blank=True
+    )
+    content_weight = models.PositiveSmallIntegerField()  # cc→co, 1..5
+    outcome_weight = models.PositiveSmallIntegerField()  # co→po, 1..5
+    weight = models.PositiveSmallIntegerField()  # their product, 1..25
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["course_content", "course_outcome", "program_outcome"],
+                name="unique_outcome_path",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["program_outcome", "course"], name="path_po_course_idx"),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.course_content_id}->{self.course_outcome_id}->"
+            f"{self.program_outcome_id} (w={self.weight})"
+        )
+
+
+class GraphVersion(models.Model):
+    """Change stamp for one graph scope: a course id, "global" (program
+    outcomes, shared by every course graph) or "all" (the department-wide
+    graph). Written by giraph.versioning.bump_graph_version."""
+
+    scope = models.CharField(max_length=40, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.scope} @ {self.version}"
+
+
+class GraphPayload(models.Model):
+    """Rendered get_nodes/ response for one scope, ready to send as-is or
+    pre-compressed. Valid while ``stamp`` matches the scope's current
+    version stamp."""
+
+    scope = models.CharField(max_length=40, primary_key=True)
+    stamp = models.CharField(max_length=64)
+    identity = models.BinaryField()
+    gzip = models.BinaryField()
+    brotli = models.BinaryField(null=True)
+    rendered_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.scope} @ {self.stamp}"
+
+
+class SnapshotNode(models.Model):
+    """Frozen state of a node. Identical states are stored once and shared
+    by every snapshot that contains them. ``node_id`` is the live node's id
+    (not a foreign key: the live node may be deleted later)."""
+
+    node_id = models.BigIntegerField()
+    name = models.CharField(max_length=255)
+    layer = models.CharField(max_length=32, choices=LayerChoices.choices)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["node_id", "name", "layer"], name="unique_snapshot_node"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.node_id} | {self.layer} | {self.name}"
+
+
+class SnapshotRelation(models.Model):
+    """Frozen relation between two live node ids, shared like SnapshotNode."""
+
+    node1_id = models.BigIntegerField()
+    node2_id = models.BigIntegerField()
+    weight = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["node1_id", "node2_id", "weight"],
+                name="unique_snapshot_relation",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.node1_id}->{self.node2_id} (w={self.weight})"
+
+
+class GraphSnapshot(models.Model):
+    """A course graph as it was in one semester. Only the membership rows
+    are per snapshot; node and relation states are shared."""
+
+    course = models.ForeignKey(
+        Program, on_delete=models.CASCADE, related_name="snapshots"
+    )
+    semester = models.CharField(max_length=20)
+    created_at = models.DateTimeField(auto_now_add=True)
+    nodes = models.ManyToManyField(SnapshotNode, related_name="snapshots")
+    relations = models.ManyToManyField(SnapshotRelation, related_name="snapshots")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["course", "semester"], name="unique_course_semester"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.course_id} @ {self.semester}"
+
+
+class AuditEvent(models.Model):
+    """One graph edit. Written in batches by giraph.audit, so rows appear a
+    few seconds after the edit. Course and actor are plain values, not
+    foreign keys: the trail outlives deleted courses and users."""
+
+    created_at = models.DateTimeField()
+    course_id = models.UUIDField(null=True, blank=True)
+    action = models.CharField(max_length=32)  # e.g. "node.create"
+    object_id = models.BigIntegerField(null=True, blank=True)
+    actor_id = models.UUIDField(null=True, blank=True)
+    actor_username = models.CharField(max_length=150, blank=True)
+    data = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["course_id", "created_at"], name="audit_course_time_idx"),
+            models.Index(fields=["created_at"], name="audit_time_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.created_at} | {self.action} {self.object_id} by {self.actor_username or '?'}"
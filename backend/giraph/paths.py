@@ -0,0 +1,143 @@
+"""Closure of the outcome graph: every course content → course outcome →
+program outcome path, stored as an OutcomePath row with its weight product.
+
+Relations only run cc→co and co→po, so every path goes through exactly one
+course outcome, and a relation write only changes the paths through the
+course outcome at one of its ends. Code that writes relations calls
+``refresh_paths`` with both ends, in the same transaction as the write;
+it rebuilds those outcomes' paths in a delete and an insert. Node deletes
+need nothing: the paths cascade. ``rebuild_paths`` recomputes the whole
+table if it ever drifts.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import LayerChoices, OutcomePath, Relation
+
+BATCH_SIZE = 500
+
+
+def _paths_through(course_outcome_ids=None):
+    """OutcomePath objects (unsaved) for the paths through
+    ``course_outcome_ids``, or through every course outcome."""
+    inbound = Relation.objects.filter(
+        node1__layer=LayerChoices.COURSE_CONTENT, node2__layer=LayerChoices.COURSE_OUTCOME
+    )
+    outbound = Relation.objects.filter(
+        node1__layer=LayerChoices.COURSE_OUTCOME, node2__layer=LayerChoices.PROGRAM_OUTCOME
+    )
+    if course_outcome_ids is not None:
+        inbound = inbound.filter(node2_id__in=course_outcome_ids)
+        outbound = outbound.filter(node1_id__in=course_outcome_ids)
+
+    outcomes = defaultdict(list)
+    for co_id, po_id, weight in outbound.values_list("node1_id", "node2_id", "weight"):
+        outcomes[co_id].append((po_id, weight))
+    for cc_id, co_id, content_weight, course_id in inbound.values_list(
+        "node1_id", "node2_id", "weight", "node1__course_id"
+    ):
+        for po_id, outcome_weight in outcomes.get(co_id, ()):
+            yield OutcomePath(
+                course_content_id=cc_id,
+                course_outcome_id=co_id,
+                program_outcome_id=po_id,
+                course_id=course_id,
+                content_weight=content_weight,
+                outcome_weight=outcome_weight,
+                weight=content_weight * outcome_weight,
+            )
+
+
+def refresh_paths(node_ids):
+    """Rebuild the paths through whichever of ``node_ids`` are course
+    outcomes. Pass both ends of every relation written."""
+    node_ids = set(node_ids)
+    if not node_ids:
+        return
+    with transaction.atomic():
+        OutcomePath.objects.filter(course_outcome_id__in=node_ids).delete()
+        OutcomePath.objects.bulk_create(_paths_through(node_ids), batch_size=BATCH_SIZE)
+
+
+def _key(path):
+    return (
+        path.course_content_id,
+        path.course_outcome_id,
+        path.program_outcome_id,
+        path.course_id,
+        path.content_weight,
+        path.outcome_weight,
+    )
+
+
+def stale_paths():
+    """How many paths are missing from or extra in the table; a path with
+    stale weights counts as one of each."""
+    expected = {_key(p) for p in _paths_through()}
+    stored = set(
+        OutcomePath.objects.values_list(
+            "course_content_id",
+            "course_outcome_id",
+            "program_outcome_id",
+            "course_id",
+            "content_weight",
+            "outcome_weight",
+        )
+    )
+    return len(expected ^ stored)
+
+
+def rebuild_paths():
+    """Recompute the whole table; returns the number of paths."""
+    with transaction.atomic():
+        OutcomePath.objects.all().delete()
+        return len(OutcomePath.objects.bulk_create(_paths_through(), batch_size=BATCH_SIZE))
+
+
+def _aggregate(paths, *fields):
+    return (
+        paths.values(*fields)
+        .annotate(paths=Count("pk"), weight=Sum("weight"))
+        .order_by("-weight", fields[0])
+    )
+
+
+def reachable_outcomes(course_content_id):
+    """Program outcomes reachable from a course content, with the number
+    of paths to each and the sum of their weight products."""
+    rows = _aggregate(
+        OutcomePath.objects.filter(course_content_id=course_content_id),
+        "program_outcome_id",
+        "program_outcome__name",
+    )
+    return [
+        {
+            "id": r["program_outcome_id"],
+            "name": r["program_outcome__name"],
+            "paths": r["paths"],
+            "weight": r["weight"],
+        }
+        for r in rows
+    ]
+
+
+def contributing_contents(program_outcome_id, course_id=None):
+    """Course contents of every course (or of ``course_id``) that feed a
+    program outcome, aggregated like ``reachable_outcomes``."""
+    paths = OutcomePath.objects.filter(program_outcome_id=program_outcome_id)
+    if course_id is not None:
+        paths = paths.filter(course_id=course_id)
+    rows = _aggregate(paths, "course_content_id", "course_content__name", "course_id")
+    return [
+        {
+            "id": r["course_content_id"],
+            "name": r["course_content__name"],
+            "course_id": r["course_id"],
+            "paths": r["paths"],
+            "weight": r["weight"],
+        }
+        for r in rows
+    ]
@@ -0,0 +1,234 @@
+"""Pre-rendered, pre-compressed get_nodes/ responses.
+
+Each scope (one course, or ``all`` for the department-wide graph) keeps its
+rendered JSON (node coordinates from ``layout`` included) together with
+gzip and brotli variants in ``GraphPayload``. A blob is reused while its
+stamp matches ``graph_stamp``; the first read after a bump re-renders and
+overwrites it. Blobs are also kept in the shared cache under their stamp,
+so a hot graph costs one stamp query per request and concurrent first
+reads render it only once.
+"""
+
+import asyncio
+import gzip
+import json
+
+from asgiref.sync import sync_to_async
+from backend.cache import aget_or_compute, cache_key, get_cache, get_or_compute
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .graph import (
+    build_graph_payload,
+    course_nodes,
+    graph_relations,
+    multi_course_nodes,
+    multi_course_relations,
+    program_outcome_nodes,
+)
+from .layout import layered_layout
+from .models import GraphPayload, LayerChoices
+from .versioning import ALL, course_scope, agraph_stamp, graph_stamp, graph_stamps
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+GZIP_LEVEL = 9
+# Most course graphs a single courseIds request may ask for
+MAX_COURSES = 50
+BROTLI_QUALITY = 9
+
+
+def payload_scope(course_id=None):
+    return ALL if course_id is None else course_scope(course_id)
+
+
+def _render(scope, stamp, data):
+    identity = json.dumps(data, separators=(",", ":")).encode()
+    return GraphPayload(
+        scope=scope,
+        stamp=stamp,
+        identity=identity,
+        gzip=gzip.compress(identity, compresslevel=GZIP_LEVEL, mtime=0),
+        brotli=brotli.compress(identity, quality=BROTLI_QUALITY) if brotli else None,
+    )
+
+
+def _layout_and_render(scope, stamp, nodes, relations):
+    positions = layered_layout(nodes, relations)
+    return _render(scope, stamp, build_graph_payload(nodes, relations, positions))
+
+
+_UPSERT = dict(
+    update_conflicts=True,
+    unique_fields=["scope"],
+    update_fields=["stamp", "identity", "gzip", "brotli", "rendered_at"],
+)
+
+
+def get_graph_payload(course_id=None):
+    """Return the up-to-date ``GraphPayload`` for ``course_id``.
+
+    The stamp is read before the graph, so a write landing mid-render can
+    only leave a blob that looks stale, never one that looks fresh.
+    """
+    scope = payload_scope(course_id)
+    stamp = graph_stamp(course_id)
+
+    def load():
+        payload = GraphPayload.objects.filter(scope=scope, stamp=stamp).first()
+        if payload is None:
+            nodes = list(course_nodes(course_id)) + list(program_outcome_nodes())
+            payload = _layout_and_render(
+                scope, stamp, nodes, list(graph_relations(course_id))
+            )
+            GraphPayload.objects.bulk_create([payload], **_UPSERT)
+        return payload
+
+    return get_or_compute(cache_key("giraph", "payload", scope, stamp), load)
+
+
+def get_graph_payloads(course_ids):
+    """``{course_scope: GraphPayload}`` for several courses at once.
+
+    The same per-course blobs as ``get_graph_payload``, looked up in bulk:
+    one stamp query, one cache round trip, one blob query for cache misses,
+    and for the graphs that need rendering a single node query and a single
+    relation query, split per course afterwards. The program outcome layer
+    is fetched once and shared by every course.
+    """
+    stamps = graph_stamps(course_ids)
+    cache = get_cache()
+    keys = {
+        scope: cache_key("giraph", "payload", scope, stamp)
+        for scope, stamp in stamps.items()
+    }
+    cached = cache.get_many(keys.values())
+    payloads = {scope: cached[key] for scope, key in keys.items() if key in cached}
+
+    missing = [scope for scope in stamps if scope not in payloads]
+    if not missing:
+        return payloads
+    for payload in GraphPayload.objects.filter(scope__in=missing):
+        if payload.stamp == stamps[payload.scope]:
+            payloads[payload.scope] = payload
+
+    stale = [scope for scope in missing if scope not in payloads]
+    if stale:
+        nodes = {scope: [] for scope in stale}
+        program_outcomes = []
+        for n in multi_course_nodes(stale):
+            if n.layer == LayerChoices.PROGRAM_OUTCOME:
+                program_outcomes.append(n)
+            else:
+                nodes[course_scope(n.course_id)].append(n)
+        relations = {scope: [] for scope in stale}
+        for r in multi_course_relations(stale):
+            relations[course_scope(r.node1_course_id)].append(r)
+
+        rendered = [
+            _layout_and_render(
+                scope, stamps[scope], nodes[scope] + program_outcomes, relations[scope]
+            )
+            for scope in stale
+        ]
+        GraphPayload.objects.bulk_create(rendered, **_UPSERT)
+        payloads.update((payload.scope, payload) for payload in rendered)
+
+    cache.set_many({keys[scope]: payloads[scope] for scope in missing})
+    return payloads
+
+
+async def _fetch(queryset):
+    return [obj async for obj in queryset.aiterator()]
+
+
+async def aget_graph_payload(course_id=None):
+    scope = payload_scope(course_id)
+    stamp = await agraph_stamp(course_id)
+
+    async def load():
+        payload = await GraphPayload.objects.filter(scope=scope, stamp=stamp).afirst()
+        if payload is None:
+            # The three queries don't depend on each other
+            course_specific, program_outcomes, relations = await asyncio.gather(
+                _fetch(course_nodes(course_id)),
+                _fetch(program_outcome_nodes()),
+                _fetch(graph_relations(course_id)),
+            )
+            # Layout and compression are CPU-bound; keep them off the event loop
+            payload = await sync_to_async(_layout_and_render, thread_sensitive=False)(
+                scope, stamp, course_specific + program_outcomes, relations
+            )
+            await GraphPayload.objects.abulk_create([payload], **_UPSERT)
+        return payload
+
+    return await aget_or_compute(cache_key("giraph", "payload", scope, stamp), load)
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def negotiate(payload, accept_encoding):
+    """Pick the best variant of ``payload`` for an Accept-Encoding header.
+
+    Returns ``(body, content_encoding)``, the encoding being None for the
+    uncompressed body.
+    """
+    accepted = _accepted_encodings(accept_encoding or "")
+    if payload.brotli is not None and "br" in accepted:
+        return bytes(payload.brotli), "br"
+    if "gzip" in accepted:
+        return bytes(payload.gzip), "gzip"
+    return bytes(payload.identity), None
+
+
+def parse_course_ids(raw):
+    """Course scopes of a ``courseIds`` query value, in order and without
+    duplicates. Raises ValueError with a message for the client."""
+    try:
+        scopes = list(
+            dict.fromkeys(course_scope(c.strip()) for c in raw.split(",") if c.strip())
+        )
+    except ValueError:
+        raise ValueError("courseIds must be a comma-separated list of course ids.")
+    if not scopes or len(scopes) > MAX_COURSES:
+        raise ValueError(f"courseIds takes between 1 and {MAX_COURSES} ids.")
+    return scopes
+
+
+def multi_payload_response(payloads):
+    """``{"courses": {course_id: <get_nodes payload>}}``, spliced together
+    from the stored blobs without decoding them. Only the identity bodies
+    are stored, so this response goes out uncompressed."""
+    body = b",".join(
+        b'"%s":%s' % (scope.encode(), bytes(payload.identity))
+        for scope, payload in payloads.items()
+    )
+    return HttpResponse(b'{"courses":{' + body + b"}}", content_type="application/json")
+
+
+def payload_response(payload, request):
+    body, encoding = negotiate(payload, request.headers.get("Accept-Encoding"))
+    response = HttpResponse(body, content_type="application/json")
+    if encoding:
+        response["Content-Encoding"] = encoding
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
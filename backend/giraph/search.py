@@ -0,0 +1,113 @@
+"""Full-text search over node names, backed by an SQLite FTS5 index.
+
+``giraph_node_fts`` is an external-content FTS5 table over ``giraph_node``;
+triggers keep it in sync with every INSERT/UPDATE/DELETE, including bulk
+and cascade deletes that bypass model signals. The schema is (re)installed
+on ``post_migrate`` because SQLite migrations that rebuild ``giraph_node``
+drop its triggers.
+"""
+
+import re
+import uuid
+
+from django.db import connection
+
+from .models import Node
+
+FTS_TABLE = "giraph_node_fts"
+
+_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS giraph_node_fts_ai AFTER INSERT ON giraph_node BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS giraph_node_fts_ad AFTER DELETE ON giraph_node BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS giraph_node_fts_au AFTER UPDATE OF name ON giraph_node BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+]
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_available(conn=connection):
+    return conn.vendor == "sqlite"
+
+
+def ensure_fts_schema(conn=connection):
+    """Create the FTS table and triggers if they are missing."""
+    if not fts_available(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [FTS_TABLE],
+        )
+        created = cursor.fetchone() is None
+        if created:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                "name, content='giraph_node', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+        for sql in _TRIGGERS:
+            cursor.execute(sql)
+        if created:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def build_match_query(text):
+    """Turn free text into a safe FTS5 query: every word as a quoted prefix
+    term, all of which must match."""
+    tokens = _TOKEN_RE.findall(text)
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_nodes(text, layer=None, course_id=None, limit=20):
+    """Return nodes whose name matches ``text``, best match first.
+
+    Each node carries ``course_name`` and ``rank`` (bm25, lower is better).
+    """
+    match = build_match_query(text)
+    if not match:
+        return []
+
+    if not fts_available():
+        qs = Node.objects.select_related("course").filter(name__icontains=text)
+        if layer:
+            qs = qs.filter(layer=layer)
+        if course_id:
+            qs = qs.filter(course_id=course_id)
+        nodes = list(qs.order_by("name")[:limit])
+        for n in nodes:
+            n.course_name = n.course.name if n.course else None
+            n.rank = 0.0
+        return nodes
+
+    sql = [
+        "SELECT n.id, n.name, n.layer, n.course_id, p.name AS course_name, "
+        f"bm25({FTS_TABLE}) AS rank "
+        f"FROM {FTS_TABLE} "
+        f"JOIN giraph_node n ON n.id = {FTS_TABLE}.rowid "
+        "LEFT JOIN programs_program p ON p.id = n.course_id "
+        f"WHERE {FTS_TABLE} MATCH %s"
+    ]
+    params = [match]
+    if layer:
+        sql.append("AND n.layer = %s")
+        params.append(layer)
+    if course_id:
+        sql.append("AND n.course_id = %s")
+        # UUIDs are stored as 32-char hex on SQLite
+        params.append(uuid.UUID(str(course_id)).hex)
+    sql.append("ORDER BY rank LIMIT %s")
+    params.append(limit)
+    return list(Node.objects.raw(" ".join(sql), params))
@@ -59,6 +59,43 @@ class UpdateRelationSerializer(serializers.Serializer):
     weight = serializers.ChoiceField(choices=[1, 2, 3, 4, 5])
 
 
+# /api/giraph/bulk_delete_nodes
+class BulkDeleteNodesSerializer(serializers.Serializer):
+    course_id = serializers.UUIDField(required=False)
+    layer = serializers.ChoiceField(
+        choices=[c[0] for c in LayerChoices.choices], required=False
+    )
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=10000
+    )
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError(
+                "Give at least one of course_id, layer or ids."
+            )
+        return attrs
+
+
+# /api/giraph/bulk_delete_relations
+class BulkDeleteRelationsSerializer(serializers.Serializer):
+    course_id = serializers.UUIDField(required=False)
+    min_weight = serializers.IntegerField(min_value=1, max_value=5, required=False)
+    max_weight = serializers.IntegerField(min_value=1, max_value=5, required=False)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=10000
+    )
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError(
+                "Give at least one of course_id, min_weight, max_weight or ids."
+            )
+        if attrs.get("min_weight", 1) > attrs.get("max_weight", 5):
+            raise serializers.ValidationError("min_weight is above max_weight.")
+        return attrs
+
+
 # /api/giraph/get_nodes
 class RelationStubSerializer(serializers.Serializer):
     node1_id = serializers.IntegerField()
@@ -77,3 +114,91 @@ class GetNodesResponseSerializer(serializers.Serializer):
     course_contents = NodeWithRelationsSerializer(many=True)
     course_outcomes = NodeWithRelationsSerializer(many=True)
     program_outcomes = NodeWithRelationsSerializer(many=True)
+
+
+# /api/giraph/search
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=1, max_length=255)
+    layer = serializers.ChoiceField(
+        choices=[c[0] for c in LayerChoices.choices], required=False
+    )
+    courseId = serializers.UUIDField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class SearchResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    layer = serializers.CharField()
+    course_id = serializers.UUIDField(allow_null=True)
+    course_name = serializers.CharField(allow_null=True)
+    rank = serializers.FloatField()
+
+
+# /api/giraph/snapshots/create
+class NewSnapshotSerializer(serializers.Serializer):
+    course_id = serializers.UUIDField()
+    semester = serializers.CharField(min_length=1, max_length=20)
+
+
+class SnapshotSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    course_id = serializers.UUIDField()
+    semester = serializers.CharField()
+    created_at = serializers.DateTimeField()
+
+
+# /api/giraph/snapshots/diff
+class SnapshotDiffQuerySerializer(serializers.Serializer):
+    # ?from=&to= in the query string; "from" is a Python keyword
+    from_id = serializers.IntegerField()
+    to_id = serializers.IntegerField()
+
+
+# /api/giraph/paths
+class PathQuerySerializer(serializers.Serializer):
+    courseId = serializers.UUIDField(required=False)
+    ccId = serializers.IntegerField(required=False)
+    coId = serializers.IntegerField(required=False)
+    poId = serializers.IntegerField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=10000, default=1000)
+
+
+class OutcomePathSerializer(serializers.Serializer):
+    course_content_id = serializers.IntegerField()
+    course_outcome_id = serializers.IntegerField()
+    program_outcome_id = serializers.IntegerField()
+    course_id = serializers.UUIDField(allow_null=True)
+    content_weight = serializers.IntegerField()
+    outcome_weight = serializers.IntegerField()
+    weight = serializers.IntegerField()
+
+
+# /api/giraph/paths/reachable
+class ReachableQuerySerializer(serializers.Serializer):
+    ccId = serializers.IntegerField()
+
+
+# /api/giraph/paths/contributing
+class ContributingQuerySerializer(serializers.Serializer):
+    poId = serializers.IntegerField()
+    courseId = serializers.UUIDField(required=False)
+
+
+# /api/giraph/audit
+class AuditQuerySerializer(serializers.Serializer):
+    courseId = serializers.UUIDField(required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+
+class AuditEventSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    created_at = serializers.DateTimeField()
+    course_id = serializers.UUIDField(allow_null=True)
+    action = serializers.CharField()
+    object_id = serializers.IntegerField(allow_null=True)
+    actor_id = serializers.UUIDField(allow_null=True)
+    actor_username = serializers.CharField()
+    data = serializers.JSONField()
@@ -0,0 +1,121 @@
+"""Per-semester snapshots of course graphs.
+
+Node and relation states are content-addressed: ``SnapshotNode`` and
+``SnapshotRelation`` rows are unique on their values, and a snapshot only
+adds membership rows pointing at them. A relation that kept its weight
+from one semester to the next is the same row in both snapshots, which is
+also what makes diffs cheap: rows shared by both snapshots are unchanged
+and never need to be loaded.
+"""
+
+from types import SimpleNamespace
+
+from django.db import transaction
+
+from .graph import build_graph_payload, course_nodes, graph_relations, program_outcome_nodes
+from .models import GraphSnapshot, SnapshotNode, SnapshotRelation
+
+
+def _intern(model, keys, fields, lookup):
+    """Make sure a row exists for every key tuple; return their ids."""
+    model.objects.bulk_create(
+        [model(**dict(zip(fields, key))) for key in keys], ignore_conflicts=True
+    )
+    existing = model.objects.filter(**{f"{lookup}__in": {key[0] for key in keys}})
+    return [
+        pk
+        for pk, *key in existing.values_list("pk", *fields)
+        if tuple(key) in keys
+    ]
+
+
+def take_snapshot(course_id, semester):
+    """Freeze the current graph of ``course_id`` (its nodes, every program
+    outcome and the relations between them) as ``semester``."""
+    node_keys = {
+        (n.id, n.name, n.layer)
+        for n in list(course_nodes(course_id)) + list(program_outcome_nodes())
+    }
+    relation_keys = {(r.node1_id, r.node2_id, r.weight) for r in graph_relations(course_id)}
+
+    with transaction.atomic():
+        snapshot = GraphSnapshot.objects.create(course_id=course_id, semester=semester)
+        node_ids = _intern(SnapshotNode, node_keys, ("node_id", "name", "layer"), "node_id")
+        relation_ids = _intern(
+            SnapshotRelation, relation_keys, ("node1_id", "node2_id", "weight"), "node1_id"
+        )
+        GraphSnapshot.nodes.through.objects.bulk_create(
+            [
+                GraphSnapshot.nodes.through(graphsnapshot_id=snapshot.pk, snapshotnode_id=pk)
+                for pk in node_ids
+            ]
+        )
+        GraphSnapshot.relations.through.objects.bulk_create(
+            [
+                GraphSnapshot.relations.through(
+                    graphsnapshot_id=snapshot.pk, snapshotrelation_id=pk
+                )
+                for pk in relation_ids
+            ]
+        )
+    return snapshot
+
+
+def snapshot_payload(snapshot):
+    """The snapshot in the get_nodes/ response shape."""
+    nodes = [
+        SimpleNamespace(id=node_id, name=name, layer=layer)
+        for node_id, name, layer in snapshot.nodes.values_list("node_id", "name", "layer")
+    ]
+    relations = [
+        SimpleNamespace(id=pk, node1_id=node1_id, node2_id=node2_id, weight=weight)
+        for pk, node1_id, node2_id, weight in snapshot.relations.values_list(
+            "pk", "node1_id", "node2_id", "weight"
+        )
+    ]
+    return build_graph_payload(nodes, relations)
+
+
+def _edge_map(relation_ids):
+    return {
+        (node1_id, node2_id): weight
+        for node1_id, node2_id, weight in SnapshotRelation.objects.filter(
+            pk__in=relation_ids
+        ).values_list("node1_id", "node2_id", "weight")
+    }
+
+
+def diff_snapshots(old, new):
+    """Edges added, removed and reweighted from snapshot ``old`` to ``new``.
+
+    Shared relation rows are unchanged by construction, so only the
+    symmetric difference of the two id sets is loaded and compared.
+    """
+    old_ids = set(old.relations.values_list("pk", flat=True))
+    new_ids = set(new.relations.values_list("pk", flat=True))
+    before = _edge_map(old_ids - new_ids)
+    after = _edge_map(new_ids - old_ids)
+
+    names = dict(
+        SnapshotNode.objects.filter(snapshots__in=[old, new]).values_list("node_id", "name")
+    )
+
+    def edge(key, **extra):
+        node1_id, node2_id = key
+        return {
+            "node1_id": node1_id,
+            "node1_name": names.get(node1_id),
+            "node2_id": node2_id,
+            "node2_name": names.get(node2_id),
+            **extra,
+        }
+
+    return {
+        "added": [edge(k, weight=after[k]) for k in sorted(after.keys() - before.keys())],
+        "removed": [edge(k, weight=before[k]) for k in sorted(before.keys() - after.keys())],
+        "reweighted": [
+            edge(k, old_weight=before[k], new_weight=after[k])
+            for k in sorted(before.keys() & after.keys())
+        ],
+        "unchanged": len(old_ids & new_ids),
+    }
@@ -1,6 +1,23 @@
-from django.test import TestCase
+import gzip
+import json
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from backend.db import retry_on_busy
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
-from giraph.models import Node, Relation, LayerChoices
+from giraph import audit, payloads, views
+from giraph.layout import COLUMN_X, _crossings, order_layers
+from giraph.totals import drifted_nodes
+from giraph.versioning import bump_graph_version, course_scope
+from giraph.models import AuditEvent, GraphPayload, GraphSnapshot, GraphVersion, Node, OutcomePath, Relation, LayerChoices, SnapshotRelation
+from giraph.paths import stale_paths
+from programs.jobs import clone_course
 from programs.models import Program
 from users.models import User
 
@@ -29,6 +46,32 @@ class NewNodeTests(TestCase):
         self.assertEqual(node.layer, LayerChoices.COURSE_CONTENT)
 
 
+class RetriedWriteTests(TransactionTestCase):
+    def test_busy_version_bump_does_not_duplicate_the_node(self):
+        lecturer = User.objects.create(username="testlecturer")
+        course = Program.objects.create(name="Test Course", lecturer=lecturer)
+        real_bump = views.bump_for_nodes
+        calls = []
+
+        def flaky_bump(nodes):
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError("database is locked")
+            return real_bump(nodes)
+
+        with mock.patch("giraph.views.bump_for_nodes", side_effect=flaky_bump):
+            response = APIClient().post(
+                "/api/giraph/new_node/",
+                {"name": "Once", "layer": LayerChoices.COURSE_CONTENT, "course_id": str(course.id)},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(Node.objects.count(), 1)
+        self.assertTrue(GraphVersion.objects.filter(scope=course_scope(course.id)).exists())
+
+
 class NewRelationTests(TestCase):
     def test_new_relation(self):
         n_cc = Node.objects.create(name="CC 1", layer=LayerChoices.COURSE_CONTENT)
@@ -219,4 +262,755 @@ class PingTest(TestCase):
     def test_ping(self):
         client = APIClient()
         response = client.get("/api/giraph/ping")
-        self.assertEqual(response.status_code, 200)
\ No newline at end of file
+        self.assertEqual(response.status_code, 200)
+
+class SearchNodesTests(TestCase):
+    def setUp(self):
+        lecturer = User.objects.create(username="searchlecturer")
+        self.course_a = Program.objects.create(name="Algorithms", lecturer=lecturer)
+        self.course_b = Program.objects.create(name="Databases", lecturer=lecturer)
+        self.sorting = Node.objects.create(name="Sorting algorithms", layer=LayerChoices.COURSE_CONTENT, course=self.course_a)
+        self.graphs = Node.objects.create(name="Graph algorithms and trees", layer=LayerChoices.COURSE_CONTENT, course=self.course_a)
+        self.indexes = Node.objects.create(name="Index structures", layer=LayerChoices.COURSE_CONTENT, course=self.course_b)
+        self.po = Node.objects.create(name="Design efficient algorithms", layer=LayerChoices.PROGRAM_OUTCOME)
+        self.client = APIClient()
+
+    def search(self, **params):
+        response = self.client.get("/api/giraph/search/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_search_across_courses_and_layers(self):
+        ids = {r["id"] for r in self.search(q="algorithm")}
+        self.assertEqual(ids, {self.sorting.id, self.graphs.id, self.po.id})
+
+    def test_search_filters_by_layer_and_course(self):
+        results = self.search(q="algorithms", layer=LayerChoices.PROGRAM_OUTCOME)
+        self.assertEqual([r["id"] for r in results], [self.po.id])
+
+        results = self.search(q="index", courseId=str(self.course_b.id))
+        self.assertEqual([r["id"] for r in results], [self.indexes.id])
+        self.assertEqual(results[0]["course_name"], "Databases")
+
+    def test_index_follows_updates_and_deletes(self):
+        self.indexes.name = "Query optimisation"
+        self.indexes.save()
+        self.assertEqual(self.search(q="index"), [])
+        self.assertEqual([r["id"] for r in self.search(q="optimisation")], [self.indexes.id])
+
+        self.course_a.delete()
+        self.assertEqual({r["id"] for r in self.search(q="algorithms")}, {self.po.id})
+
+    def test_query_syntax_is_escaped(self):
+        results = self.search(q='"sort* (')
+        self.assertEqual([r["id"] for r in results], [self.sorting.id])
+
+
+class SQLiteTuningTests(TestCase):
+    def test_connection_init_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+    def test_retry_on_busy_retries_lock_errors(self):
+        calls = []
+
+        @retry_on_busy(base_delay=0)
+        def write():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError("database is locked")
+            return "ok"
+
+        with mock.patch.object(connection, "in_atomic_block", False):
+            self.assertEqual(write(), "ok")
+        self.assertEqual(len(calls), 3)
+
+    def test_retry_on_busy_ignores_other_errors(self):
+        @retry_on_busy(base_delay=0)
+        def write():
+            raise OperationalError("no such table: nope")
+
+        with mock.patch.object(connection, "in_atomic_block", False):
+            with self.assertRaises(OperationalError):
+                write()
+
+
+class AsyncReadEndpointTests(TestCase):
+    def setUp(self):
+        lecturer = User.objects.create(username="asynclecturer")
+        self.course = Program.objects.create(name="Async Course", lecturer=lecturer)
+        self.other = Program.objects.create(name="Other Course", lecturer=lecturer)
+        self.cc = Node.objects.create(name="CC", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+        self.co = Node.objects.create(name="CO", layer=LayerChoices.COURSE_OUTCOME, course=self.course)
+        self.po = Node.objects.create(name="PO", layer=LayerChoices.PROGRAM_OUTCOME)
+        Node.objects.create(name="Other CC", layer=LayerChoices.COURSE_CONTENT, course=self.other)
+        self.r1 = Relation.objects.create(node1=self.cc, node2=self.co, weight=2)
+        self.r2 = Relation.objects.create(node1=self.co, node2=self.po, weight=4)
+
+    async def test_async_get_nodes_matches_sync_payload(self):
+        response = await self.async_client.get("/api/giraph/async/get_nodes/", {"courseId": str(self.course.id)})
+        self.assertEqual(response.status_code, 200)
+        sync_response = await sync_to_async(APIClient().get)("/api/giraph/get_nodes/", {"courseId": str(self.course.id)})
+        self.assertEqual(response.json(), sync_response.json())
+        self.assertEqual([n["id"] for n in response.json()["course_contents"]], [self.cc.id])
+
+    async def test_async_get_nodes_unknown_course(self):
+        response = await self.async_client.get("/api/giraph/async/get_nodes/", {"courseId": "not-a-uuid"})
+        self.assertEqual(response.status_code, 404)
+
+    async def test_async_get_nodes_for_several_courses(self):
+        params = {"courseIds": f"{self.course.id},{self.other.id}"}
+        response = await self.async_client.get("/api/giraph/async/get_nodes/", params)
+        sync_response = await sync_to_async(APIClient().get)("/api/giraph/get_nodes/", params)
+        self.assertEqual(response.json(), sync_response.json())
+        self.assertEqual(list(response.json()["courses"]), [str(self.course.id), str(self.other.id)])
+
+        response = await self.async_client.get("/api/giraph/async/get_nodes/", {"courseIds": "nope"})
+        self.assertEqual(response.status_code, 422)
+
+    async def test_async_get_program_outcomes(self):
+        response = await self.async_client.get("/api/giraph/async/get_program_outcomes/")
+        self.assertEqual(response.json(), {"program_outcomes": [{"id": self.po.id, "name": "PO"}]})
+
+
+class GraphPayloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        lecturer = User.objects.create(username="payloadlecturer")
+        self.course = Program.objects.create(name="Payload Course", lecturer=lecturer)
+        self.cc = Node.objects.create(name="CC", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+        self.co = Node.objects.create(name="CO", layer=LayerChoices.COURSE_OUTCOME, course=self.course)
+        Relation.objects.create(node1=self.cc, node2=self.co, weight=3)
+        self.client = APIClient()
+
+    def get_nodes(self, course=None, **headers):
+        params = {"courseId": str(course.id)} if course else {}
+        return self.client.get("/api/giraph/get_nodes/", params, headers=headers)
+
+    def test_blob_is_reused_until_the_graph_changes(self):
+        first = self.get_nodes(self.course)
+        self.assertEqual(GraphPayload.objects.count(), 1)
+        # only the version stamp; course ids and the blob come from the cache
+        with self.assertNumQueries(1):
+            second = self.get_nodes(self.course)
+        self.assertEqual(first.content, second.content)
+
+        self.client.post("/api/giraph/update_node/", {"node_id": self.co.id, "name": "Renamed"}, format="json")
+        names = [n["name"] for n in self.get_nodes(self.course).json()["course_outcomes"]]
+        self.assertEqual(names, ["Renamed"])
+
+    def test_program_outcome_change_reaches_course_and_department_graphs(self):
+        self.get_nodes(self.course)
+        self.get_nodes()
+        self.client.post("/api/giraph/create_program_outcome/", {"name": "PO"}, format="json")
+        for response in (self.get_nodes(self.course), self.get_nodes()):
+            self.assertEqual([n["name"] for n in response.json()["program_outcomes"]], ["PO"])
+
+    def test_stamps_never_go_back(self):
+        def bump(clock):
+            with mock.patch("giraph.versioning.time.time_ns", return_value=clock):
+                bump_graph_version(course_ids=[self.course.id])
+            return GraphVersion.objects.get(scope=course_scope(self.course.id)).version
+
+        # the same clock reading twice, then the clock stepping back
+        versions = [bump(10**18), bump(10**18), bump(10**17)]
+        self.assertEqual(versions, sorted(set(versions)))
+
+    def test_identity_gzip_and_brotli_variants(self):
+        identity = self.get_nodes(self.course)
+        self.assertNotIn("Content-Encoding", identity)
+        self.assertIn("Accept-Encoding", identity["Vary"])
+        data = identity.json()
+        self.assertEqual([n["id"] for n in data["course_contents"]], [self.cc.id])
+        self.assertEqual(data["course_contents"][0]["relations"][0]["weight"], 3)
+
+        gzipped = self.get_nodes(self.course, accept_encoding="gzip, deflate")
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(gzipped.content)), data)
+
+        refused = self.get_nodes(self.course, accept_encoding="br;q=0, gzip")
+        self.assertEqual(refused["Content-Encoding"], "gzip")
+
+        if payloads.brotli is None:
+            self.skipTest("brotli is not installed")
+        br = self.get_nodes(self.course, accept_encoding="gzip, br")
+        self.assertEqual(br["Content-Encoding"], "br")
+        self.assertEqual(json.loads(payloads.brotli.decompress(br.content)), data)
+
+
+class GraphSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        lecturer = User.objects.create(username="snapshotlecturer")
+        self.course = Program.objects.create(name="Snapshot Course", lecturer=lecturer)
+        self.cc1 = Node.objects.create(name="CC1", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+        self.cc2 = Node.objects.create(name="CC2", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+        self.co = Node.objects.create(name="CO", layer=LayerChoices.COURSE_OUTCOME, course=self.course)
+        self.po = Node.objects.create(name="PO", layer=LayerChoices.PROGRAM_OUTCOME)
+        self.r1 = Relation.objects.create(node1=self.cc1, node2=self.co, weight=3)
+        self.r2 = Relation.objects.create(node1=self.cc2, node2=self.co, weight=2)
+        Relation.objects.create(node1=self.co, node2=self.po, weight=5)
+        self.client = APIClient()
+
+    def snapshot(self, semester):
+        response = self.client.post(
+            "/api/giraph/snapshots/create/",
+            {"course_id": str(self.course.id), "semester": semester},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()["id"]
+
+    def test_unchanged_rows_are_shared(self):
+        self.snapshot("2025-fall")
+        self.snapshot("2026-spring")
+        self.assertEqual(SnapshotRelation.objects.count(), 3)
+
+        self.r1.weight = 4
+        self.r1.save()
+        self.snapshot("2026-fall")
+        # one new row for the reweighted edge, the other two are reused
+        self.assertEqual(SnapshotRelation.objects.count(), 4)
+        self.assertEqual(GraphSnapshot.objects.get(semester="2026-fall").relations.count(), 3)
+
+    def test_snapshot_graph_survives_live_changes(self):
+        snapshot_id = self.snapshot("2025-fall")
+        self.cc1.delete()
+        data = self.client.get(f"/api/giraph/snapshots/{snapshot_id}/").json()
+        self.assertEqual(data["semester"], "2025-fall")
+        names = [n["name"] for n in data["graph"]["course_contents"]]
+        self.assertEqual(sorted(names), ["CC1", "CC2"])
+        self.assertEqual([n["name"] for n in data["graph"]["program_outcomes"]], ["PO"])
+
+    def test_duplicate_semester_conflicts(self):
+        self.snapshot("2025-fall")
+        response = self.client.post(
+            "/api/giraph/snapshots/create/",
+            {"course_id": str(self.course.id), "semester": "2025-fall"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 409)
+
+    def test_diff(self):
+        old = self.snapshot("2025-fall")
+        self.r1.weight = 1
+        self.r1.save()
+        self.r2.delete()
+        cc3 = Node.objects.create(name="CC3", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+        Relation.objects.create(node1=cc3, node2=self.co, weight=4)
+        new = self.snapshot("2026-spring")
+
+        response = self.client.get("/api/giraph/snapshots/diff/", {"from": old, "to": new})
+        self.assertEqual(response.status_code, 200)
+        diff = response.json()
+        self.assertEqual(
+            [(e["node1_name"], e["node2_name"], e["weight"]) for e in diff["added"]],
+            [("CC3", "CO", 4)],
+        )
+        self.assertEqual(
+            [(e["node1_name"], e["weight"]) for e in diff["removed"]], [("CC2", 2)]
+        )
+        self.assertEqual(
+            [(e["node1_name"], e["old_weight"], e["new_weight"]) for e in diff["reweighted"]],
+            [("CC1", 3, 1)],
+        )
+        self.assertEqual(diff["unchanged"], 1)
+
+        listed = self.client.get("/api/giraph/snapshots/", {"courseId": str(self.course.id)}).json()
+        self.assertEqual([s["semester"] for s in listed], ["2026-spring", "2025-fall"])
+
+
+class WeightTotalsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        lecturer = User.objects.create(username="totalslecturer", email="totalslecturer@example.com")
+        self.course = Program.objects.create(name="Totals Course", lecturer=lecturer)
+        self.cc1 = Node.objects.create(name="CC1", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+        self.cc2 = Node.objects.create(name="CC2", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+        self.co = Node.objects.create(name="CO", layer=LayerChoices.COURSE_OUTCOME, course=self.course)
+        self.po = Node.objects.create(name="PO", layer=LayerChoices.PROGRAM_OUTCOME)
+        self.client = APIClient()
+
+    def relate(self, node1, node2, weight):
+        response = self.client.post(
+            "/api/giraph/new_relation/",
+            {"node1_id": node1.id, "node2_id": node2.id, "weight": weight},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()["relation_id"]
+
+    def totals(self, node):
+        node.refresh_from_db()
+        return node.in_weight_sum, node.in_count, node.out_weight_sum, node.out_count
+
+    def test_relation_writes_keep_totals(self):
+        r1 = self.relate(self.cc1, self.co, 3)
+        self.relate(self.cc2, self.co, 2)
+        self.relate(self.co, self.po, 5)
+        self.assertEqual(self.totals(self.co), (5, 2, 5, 1))
+        self.assertEqual(self.totals(self.cc1), (0, 0, 3, 1))
+
+        self.client.post("/api/giraph/update_relation/", {"relation_id": r1, "weight": 1}, format="json")
+        self.assertEqual(self.totals(self.co), (3, 2, 5, 1))
+        self.assertEqual(self.totals(self.cc1), (0, 0, 1, 1))
+
+        self.client.delete("/api/giraph/delete_relation/", {"relation_id": r1}, format="json")
+        self.assertEqual(self.totals(self.co), (2, 1, 5, 1))
+        self.assertEqual(self.totals(self.cc1), (0, 0, 0, 0))
+
+        # the cascade takes the CO's relations with it
+        self.client.delete("/api/giraph/delete_node/", {"node_id": self.co.id}, format="json")
+        self.assertEqual(self.totals(self.cc2), (0, 0, 0, 0))
+        self.assertEqual(self.totals(self.po), (0, 0, 0, 0))
+        self.assertFalse(drifted_nodes().exists())
+
+    def test_course_delete_updates_shared_outcomes(self):
+        head = User.objects.create(username="totalshead", email="totalshead@example.com", role="head")
+        self.relate(self.co, self.po, 4)
+        other = Program.objects.create(name="Other", lecturer=head)
+        other_co = Node.objects.create(name="Other CO", layer=LayerChoices.COURSE_OUTCOME, course=other)
+        self.relate(other_co, self.po, 2)
+
+        self.client.force_authenticate(head)
+        self.client.delete(f"/api/programs/delete_program/{self.course.id}/")
+        self.assertEqual(self.totals(self.po), (2, 1, 0, 0))
+        self.assertFalse(drifted_nodes().exists())
+
+    def test_repair_command(self):
+        self.relate(self.cc1, self.co, 3)
+        # writes that bypass giraph.totals leave the columns behind
+        Relation.objects.create(node1=self.co, node2=self.po, weight=4)
+        Node.objects.filter(pk=self.cc2.pk).update(out_weight_sum=9, out_count=1)
+
+        out = StringIO()
+        call_command("repair_weight_totals", "--check", stdout=out)
+        self.assertIn("3 nodes", out.getvalue())
+
+        with self.assertNumQueries(2):  # count the drift, then one UPDATE
+            call_command("repair_weight_totals", stdout=out)
+        self.assertEqual(self.totals(self.co), (3, 1, 4, 1))
+        self.assertEqual(self.totals(self.po), (4, 1, 0, 0))
+        self.assertEqual(self.totals(self.cc2), (0, 0, 0, 0))
+        self.assertFalse(drifted_nodes().exists())
+
+
+class LayoutTests(TestCase):
+    def test_crossing_count(self):
+        edges = [(1, 20), (2, 10), (3, 10)]
+        self.assertEqual(_crossings([1, 2, 3], [10, 20], edges), 2)
+        self.assertEqual(_crossings([2, 3, 1], [10, 20], edges), 0)
+
+    def test_barycenter_untangles_layers(self):
+        # cc 1..4 each feed the co "opposite" them: every pair crosses
+        layers = [[1, 2, 3, 4], [10, 20, 30, 40], [100, 200]]
+        edges = [(1, 40), (2, 30), (3, 20), (4, 10), (10, 200), (40, 100)]
+        ordered = order_layers(layers, edges)
+        total = sum(_crossings(ordered[i], ordered[i + 1], edges) for i in range(2))
+        self.assertEqual(total, 0)
+        self.assertEqual(sorted(ordered[0]), [1, 2, 3, 4])
+
+    def test_get_nodes_carries_positions(self):
+        cache.clear()
+        lecturer = User.objects.create(username="layoutlecturer", email="layoutlecturer@example.com")
+        course = Program.objects.create(name="Layout Course", lecturer=lecturer)
+        a = Node.objects.create(name="A", layer=LayerChoices.COURSE_CONTENT, course=course)
+        b = Node.objects.create(name="B", layer=LayerChoices.COURSE_CONTENT, course=course)
+        x = Node.objects.create(name="X", layer=LayerChoices.COURSE_OUTCOME, course=course)
+        y = Node.objects.create(name="Y", layer=LayerChoices.COURSE_OUTCOME, course=course)
+        Relation.objects.create(node1=a, node2=y, weight=1)
+        Relation.objects.create(node1=b, node2=x, weight=1)
+
+        data = APIClient().get("/api/giraph/get_nodes/", {"courseId": str(course.id)}).json()
+        position = {
+            n["name"]: (n["x"], n["y"])
+            for layer in ("course_contents", "course_outcomes")
+            for n in data[layer]
+        }
+        self.assertEqual({position["A"][0], position["B"][0]}, {COLUMN_X[0]})
+        self.assertEqual(position["X"][0], COLUMN_X[1])
+        # no crossing: A sits level with Y, B level with X
+        self.assertEqual(position["A"][1] < position["B"][1], position["Y"][1] < position["X"][1])
+
+
+class MultiCourseGetNodesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        lecturer = User.objects.create(username="multilecturer", email="multilecturer@example.com")
+        self.po = Node.objects.create(name="PO", layer=LayerChoices.PROGRAM_OUTCOME)
+        self.courses = []
+        for name in ("First", "Second", "Third"):
+            course = Program.objects.create(name=name, lecturer=lecturer)
+            cc = Node.objects.create(name=f"{name} CC", layer=LayerChoices.COURSE_CONTENT, course=course)
+            co = Node.objects.create(name=f"{name} CO", layer=LayerChoices.COURSE_OUTCOME, course=course)
+            Relation.objects.create(node1=cc, node2=co, weight=2)
+            Relation.objects.create(node1=co, node2=self.po, weight=4)
+            self.courses.append(course)
+        self.client = APIClient()
+
+    def get_many(self, *courses):
+        ids = ",".join(str(c.id) for c in courses)
+        return self.client.get("/api/giraph/get_nodes/", {"courseIds": ids})
+
+    def test_grouped_graphs_match_single_fetches(self):
+        first, _, third = self.courses
+        # one stamp, one blob, one node and one relation query, one upsert
+        # (plus the cached course index on this first call)
+        with self.assertNumQueries(6):
+            response = self.get_many(third, first)
+        self.assertEqual(response.status_code, 200)
+        courses = response.json()["courses"]
+        self.assertEqual(list(courses), [str(third.id), str(first.id)])
+        for course in (first, third):
+            single = self.client.get("/api/giraph/get_nodes/", {"courseId": str(course.id)}).json()
+            self.assertEqual(courses[str(course.id)], single)
+        self.assertEqual(courses[str(first.id)]["program_outcomes"][0]["name"], "PO")
+
+    def test_each_course_is_cached_on_its_own(self):
+        first, second, third = self.courses
+        self.get_many(first, second)
+        with self.assertNumQueries(1):  # the stamps
+            self.get_many(first, second)
+
+        cc = first.nodes.get(layer=LayerChoices.COURSE_CONTENT)
+        self.client.post("/api/giraph/update_node/", {"node_id": cc.id, "name": "Renamed"}, format="json")
+        before = GraphPayload.objects.get(scope=str(second.id)).rendered_at
+        courses = self.get_many(first, second, third).json()["courses"]
+        self.assertEqual(courses[str(first.id)]["course_contents"][0]["name"], "Renamed")
+        # the untouched course was served as stored, not re-rendered
+        self.assertEqual(GraphPayload.objects.get(scope=str(second.id)).rendered_at, before)
+
+    def test_validation(self):
+        self.assertEqual(self.client.get("/api/giraph/get_nodes/", {"courseIds": "nope"}).status_code, 422)
+        self.assertEqual(self.client.get("/api/giraph/get_nodes/", {"courseIds": ""}).status_code, 422)
+        unknown = "00000000-0000-0000-0000-000000000000"
+        response = self.client.get("/api/giraph/get_nodes/", {"courseIds": f"{self.courses[0].id},{unknown}"})
+        self.assertEqual(response.status_code, 404)
+
+
+class AuditLogTests(TransactionTestCase):
+    # Events are buffered on commit, which TestCase's wrapping transaction
+    # never reaches
+
+    def setUp(self):
+        audit.buffer.clear()
+        self.addCleanup(audit.buffer.clear)
+        self.head = User.objects.create(username="audithead", email="audithead@example.com", role="head")
+        self.lecturer = User.objects.create(username="auditlecturer", email="auditlecturer@example.com", role="lecturer")
+        self.course = Program.objects.create(name="Audit Course", lecturer=self.lecturer)
+        self.other = Program.objects.create(name="Other Course", lecturer=self.head)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=self.lecturer).key}")
+
+    def new_node(self, name, course=None):
+        course = course or self.course
+        data = {"name": name, "layer": LayerChoices.COURSE_CONTENT, "course_id": str(course.id)}
+        return self.client.post("/api/giraph/new_node/", data, format="json").json()["node_id"]
+
+    def read(self, user, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get("/api/giraph/audit/", params)
+
+    def test_events_are_written_behind(self):
+        node_id = self.new_node("CC")
+        self.client.post("/api/giraph/update_node/", {"node_id": node_id, "name": "Renamed"}, format="json")
+        self.assertFalse(AuditEvent.objects.exists())
+        self.assertEqual(len(audit.buffer), 2)
+
+        # the token lookup and one INSERT, with its BEGIN and COMMIT
+        with self.assertNumQueries(4):
+            self.assertEqual(audit.flush(), 2)
+        update = AuditEvent.objects.get(action="node.update")
+        self.assertEqual(update.object_id, node_id)
+        self.assertEqual(update.course_id, self.course.id)
+        self.assertEqual(update.actor_username, "auditlecturer")
+        self.assertEqual(update.data, {"old_name": "CC", "name": "Renamed"})
+
+    @override_settings(AUDIT_BUFFER_SIZE=3)
+    def test_flush_on_size(self):
+        self.new_node("A")
+        self.new_node("B")
+        self.assertFalse(AuditEvent.objects.exists())
+        self.new_node("C")
+        self.assertEqual(AuditEvent.objects.count(), 3)
+        self.assertEqual(len(audit.buffer), 0)
+
+    @override_settings(AUDIT_FLUSH_SECONDS=0)
+    def test_flush_on_age_when_a_request_finishes(self):
+        self.new_node("A")
+        self.assertEqual(AuditEvent.objects.count(), 1)
+
+    def test_rolled_back_edits_leave_no_event(self):
+        node = {"name": "CC", "layer": LayerChoices.COURSE_CONTENT, "course_id": str(self.course.id)}
+        responses = self.client.post(
+            "/api/batch/",
+            {
+                "requests": [
+                    {"method": "POST", "path": "/api/giraph/new_node/", "body": node},
+                    {"method": "POST", "path": "/api/giraph/update_node/", "body": {"node_id": 0, "name": "X"}},
+                ],
+                "atomic": True,
+            },
+            format="json",
+        ).json()["responses"]
+        self.assertEqual(responses[0]["status"], 201)
+        self.assertFalse(Node.objects.exists())
+        self.assertEqual(len(audit.buffer), 0)
+
+    def test_no_flush_inside_a_transaction(self):
+        self.new_node("A")
+        with transaction.atomic():
+            self.assertEqual(audit.flush(), 0)
+        self.assertEqual(len(audit.buffer), 1)
+        self.assertEqual(audit.flush(), 1)
+
+    def test_query_endpoint(self):
+        first = self.new_node("A")
+        self.new_node("B")
+        self.new_node("Elsewhere", course=self.other)
+        relation = self.client.post(
+            "/api/giraph/new_relation/",
+            {"node1_id": first, "node2_id": self.new_node("Not an outcome"), "weight": 2},
+            format="json",
+        )
+        self.assertEqual(relation.status_code, 400)  # rejected edits aren't logged
+
+        events = self.read(self.lecturer, courseId=str(self.course.id)).json()["events"]
+        self.assertEqual([e["data"]["name"] for e in events], ["Not an outcome", "B", "A"])
+
+        page = self.read(self.lecturer, courseId=str(self.course.id), limit=2).json()["events"]
+        rest = self.read(self.lecturer, courseId=str(self.course.id), until=page[-1]["created_at"]).json()["events"]
+        self.assertEqual([e["data"]["name"] for e in page + rest], ["Not an outcome", "B", "A"])
+
+        self.assertEqual(len(self.read(self.head).json()["events"]), 4)
+        self.assertEqual(self.read(self.lecturer, courseId=str(self.other.id)).status_code, 403)
+        self.assertEqual(self.read(self.lecturer).status_code, 422)
+
+
+class BulkDeleteTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        audit.buffer.clear()
+        self.addCleanup(audit.buffer.clear)
+        self.lecturer = User.objects.create(username="bulklecturer", email="bulklecturer@example.com", role="lecturer")
+        self.head = User.objects.create(username="bulkhead", email="bulkhead@example.com", role="head")
+        self.course = Program.objects.create(name="Bulk Course", lecturer=self.lecturer)
+        self.other = Program.objects.create(name="Bulk Other", lecturer=self.head)
+        self.ccs = [
+            Node.objects.create(name=f"CC{i}", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+            for i in range(3)
+        ]
+        self.co = Node.objects.create(name="CO", layer=LayerChoices.COURSE_OUTCOME, course=self.course)
+        self.other_co = Node.objects.create(name="Other CO", layer=LayerChoices.COURSE_OUTCOME, course=self.other)
+        self.po = Node.objects.create(name="PO", layer=LayerChoices.PROGRAM_OUTCOME)
+        self.client = APIClient()
+        for weight, cc in enumerate(self.ccs, start=1):
+            self.relate(cc, self.co, weight)
+        self.relate(self.co, self.po, 5)
+        self.relate(self.other_co, self.po, 2)
+        audit.buffer.clear()
+        self.client.force_authenticate(self.head)
+
+    def relate(self, node1, node2, weight):
+        response = self.client.post(
+            "/api/giraph/new_relation/",
+            {"node1_id": node1.id, "node2_id": node2.id, "weight": weight},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_delete_nodes_by_layer(self):
+        with mock.patch("giraph.bulk.bump_graph_version") as bump:
+            response = self.client.delete(
+                "/api/giraph/bulk_delete_nodes/",
+                {"course_id": str(self.course.id), "layer": LayerChoices.COURSE_CONTENT},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"deleted": {"nodes": 3, "relations": 3}})
+        bump.assert_called_once_with(course_ids={self.course.id}, program_outcomes=False)
+        self.assertFalse(Node.objects.filter(layer=LayerChoices.COURSE_CONTENT).exists())
+        self.co.refresh_from_db()
+        self.assertEqual((self.co.in_weight_sum, self.co.in_count), (0, 0))
+        self.assertFalse(drifted_nodes().exists())
+
+        [event] = audit.buffer.take()
+        self.assertEqual(event[0].action, "node.bulk_delete")
+        self.assertEqual(event[0].data["nodes"], 3)
+
+    def test_delete_relations_by_weight_range(self):
+        with mock.patch("giraph.bulk.bump_graph_version") as bump:
+            response = self.client.delete(
+                "/api/giraph/bulk_delete_relations/",
+                {"min_weight": 2, "max_weight": 5},
+                format="json",
+            )
+        self.assertEqual(response.json(), {"deleted": {"relations": 4}})
+        bump.assert_called_once_with(course_ids={self.course.id, self.other.id})
+        self.assertEqual(list(Relation.objects.values_list("weight", flat=True)), [1])
+        # one event per course touched
+        events = {event.course_id: event.data for event, _ in audit.buffer.take()}
+        self.assertEqual(
+            {course_id: data["relations"] for course_id, data in events.items()},
+            {self.course.id: 3, self.other.id: 1},
+        )
+        self.assertEqual(events[self.other.id]["operation"], {"relations": 4})
+        self.po.refresh_from_db()
+        self.assertEqual((self.po.in_weight_sum, self.po.in_count), (0, 0))
+        self.assertFalse(drifted_nodes().exists())
+
+    def test_delete_relations_by_ids_within_course(self):
+        ids = list(Relation.objects.values_list("pk", flat=True))
+        response = self.client.delete(
+            "/api/giraph/bulk_delete_relations/",
+            {"course_id": str(self.other.id), "ids": ids},
+            format="json",
+        )
+        self.assertEqual(response.json(), {"deleted": {"relations": 1}})
+        self.assertFalse(drifted_nodes().exists())
+
+    def test_permissions(self):
+        anonymous = APIClient().delete("/api/giraph/bulk_delete_nodes/", {"layer": LayerChoices.COURSE_CONTENT}, format="json")
+        self.assertEqual(anonymous.status_code, 401)
+
+        self.client.force_authenticate(self.lecturer)
+        for path, body in (
+            ("/api/giraph/bulk_delete_nodes/", {"layer": LayerChoices.COURSE_CONTENT}),
+            ("/api/giraph/bulk_delete_relations/", {"min_weight": 1}),
+            ("/api/giraph/bulk_delete_relations/", {"course_id": str(self.other.id)}),
+        ):
+            self.assertEqual(self.client.delete(path, body, format="json").status_code, 403)
+        self.assertEqual(Relation.objects.count(), 5)
+
+        response = self.client.delete(
+            "/api/giraph/bulk_delete_relations/", {"course_id": str(self.course.id)}, format="json"
+        )
+        self.assertEqual(response.json(), {"deleted": {"relations": 4}})
+
+    def test_no_match_and_validation(self):
+        response = self.client.delete("/api/giraph/bulk_delete_nodes/", {"ids": [0]}, format="json")
+        self.assertEqual(response.json(), {"deleted": {"nodes": 0, "relations": 0}})
+        self.assertEqual(len(audit.buffer), 0)
+        self.assertEqual(self.client.delete("/api/giraph/bulk_delete_nodes/", {}, format="json").status_code, 400)
+        response = self.client.delete(
+            "/api/giraph/bulk_delete_relations/", {"min_weight": 4, "max_weight": 2}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class OutcomePathTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.lecturer = User.objects.create(username="pathslecturer", email="pathslecturer@example.com")
+        self.course = Program.objects.create(name="Paths Course", lecturer=self.lecturer)
+        self.other = Program.objects.create(name="Paths Other", lecturer=self.lecturer)
+        self.cc = Node.objects.create(name="CC", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+        self.co1 = Node.objects.create(name="CO1", layer=LayerChoices.COURSE_OUTCOME, course=self.course)
+        self.co2 = Node.objects.create(name="CO2", layer=LayerChoices.COURSE_OUTCOME, course=self.course)
+        self.other_cc = Node.objects.create(name="Other CC", layer=LayerChoices.COURSE_CONTENT, course=self.other)
+        self.other_co = Node.objects.create(name="Other CO", layer=LayerChoices.COURSE_OUTCOME, course=self.other)
+        self.po1 = Node.objects.create(name="PO1", layer=LayerChoices.PROGRAM_OUTCOME)
+        self.po2 = Node.objects.create(name="PO2", layer=LayerChoices.PROGRAM_OUTCOME)
+        self.client = APIClient()
+
+        self.cc_co1 = self.relate(self.cc, self.co1, 2)
+        self.relate(self.cc, self.co2, 3)
+        self.relate(self.co1, self.po1, 4)
+        self.relate(self.co2, self.po1, 1)
+        self.relate(self.co2, self.po2, 5)
+        self.relate(self.other_cc, self.other_co, 5)
+        self.relate(self.other_co, self.po1, 5)
+
+    def relate(self, node1, node2, weight):
+        response = self.client.post(
+            "/api/giraph/new_relation/",
+            {"node1_id": node1.id, "node2_id": node2.id, "weight": weight},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()["relation_id"]
+
+    def stored(self):
+        return set(
+            OutcomePath.objects.values_list(
+                "course_content_id", "course_outcome_id", "program_outcome_id", "weight"
+            )
+        )
+
+    def test_relation_writes_keep_paths(self):
+        self.assertEqual(
+            self.stored(),
+            {
+                (self.cc.id, self.co1.id, self.po1.id, 8),
+                (self.cc.id, self.co2.id, self.po1.id, 3),
+                (self.cc.id, self.co2.id, self.po2.id, 15),
+                (self.other_cc.id, self.other_co.id, self.po1.id, 25),
+            },
+        )
+        self.client.post("/api/giraph/update_relation/", {"relation_id": self.cc_co1, "weight": 5}, format="json")
+        self.assertIn((self.cc.id, self.co1.id, self.po1.id, 20), self.stored())
+
+        self.client.delete("/api/giraph/delete_relation/", {"relation_id": self.cc_co1}, format="json")
+        self.client.delete("/api/giraph/delete_node/", {"node_id": self.po2.id}, format="json")
+        self.client.force_authenticate(self.lecturer)
+        self.client.delete(
+            "/api/giraph/bulk_delete_relations/", {"course_id": str(self.other.id)}, format="json"
+        )
+        self.assertEqual(self.stored(), {(self.cc.id, self.co2.id, self.po1.id, 3)})
+        self.assertEqual(stale_paths(), 0)
+
+    def test_reachable_outcomes(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/giraph/paths/reachable/", {"ccId": self.cc.id})
+        self.assertEqual(
+            response.json(),
+            {
+                "course_content": {"id": self.cc.id, "name": "CC"},
+                "program_outcomes": [
+                    {"id": self.po2.id, "name": "PO2", "paths": 1, "weight": 15},
+                    {"id": self.po1.id, "name": "PO1", "paths": 2, "weight": 11},
+                ],
+            },
+        )
+        response = self.client.get("/api/giraph/paths/reachable/", {"ccId": self.po1.id})
+        self.assertEqual(response.status_code, 404)
+
+    def test_contributing_contents_across_courses(self):
+        response = self.client.get("/api/giraph/paths/contributing/", {"poId": self.po1.id})
+        contents = response.json()["course_contents"]
+        self.assertEqual([(c["id"], c["paths"], c["weight"]) for c in contents], [(self.other_cc.id, 1, 25), (self.cc.id, 2, 11)])
+        self.assertEqual(contents[0]["course_id"], str(self.other.id))
+
+        response = self.client.get(
+            "/api/giraph/paths/contributing/", {"poId": self.po1.id, "courseId": str(self.course.id)}
+        )
+        self.assertEqual([c["id"] for c in response.json()["course_contents"]], [self.cc.id])
+
+    def test_path_listing(self):
+        paths = self.client.get("/api/giraph/paths/").json()["paths"]
+        self.assertEqual([p["weight"] for p in paths], [25, 15, 8, 3])
+        paths = self.client.get("/api/giraph/paths/", {"courseId": str(self.course.id), "poId": self.po1.id}).json()["paths"]
+        self.assertEqual(
+            [(p["course_outcome_id"], p["content_weight"], p["outcome_weight"]) for p in paths],
+            [(self.co1.id, 2, 4), (self.co2.id, 3, 1)],
+        )
+        self.assertEqual(len(self.client.get("/api/giraph/paths/", {"limit": 1}).json()["paths"]), 1)
+
+    def test_cloned_course_gets_paths(self):
+        clone_course(mock.Mock(), self.course.id)
+        self.assertEqual(OutcomePath.objects.count(), 7)
+        self.assertEqual(stale_paths(), 0)
+
+    def test_rebuild_command(self):
+        # writes that bypass giraph.paths leave the table behind
+        Relation.objects.create(node1=self.other_cc, node2=self.co1, weight=1)
+        out = StringIO()
+        call_command("rebuild_outcome_paths", "--check", stdout=out)
+        self.assertIn("1 paths are missing or stale", out.getvalue())
+        call_command("rebuild_outcome_paths", stdout=StringIO())
+        self.assertEqual(OutcomePath.objects.count(), 5)
+        self.assertEqual(stale_paths(), 0)
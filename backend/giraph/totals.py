@@ -0,0 +1,118 @@
+"""Denormalized relation weight totals on Node.
+
+Every node carries the sum and count of its incoming and outgoing relation
+weights, so normalizing attainment doesn't need an aggregate over Relation.
+Every code path that writes relations applies the matching delta here, in
+the same transaction as the write, with ``F()`` expressions so concurrent
+writers can't lose each other's updates. ``repair_weight_totals``
+recomputes everything from Relation if the columns ever drift.
+"""
+
+from collections import defaultdict
+
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Node, Relation
+
+TOTAL_FIELDS = ("in_weight_sum", "in_count", "out_weight_sum", "out_count")
+
+
+def apply_relation_deltas(rows, skip=()):
+    """Apply ``(node1_id, node2_id, weight_delta, count_delta)`` rows.
+
+    node1 gets the deltas on its outgoing totals, node2 on its incoming
+    ones. Nodes in ``skip`` (e.g. about to be deleted) are left alone.
+    Nodes that end up with the same deltas share one UPDATE.
+    """
+    deltas = defaultdict(lambda: [0, 0, 0, 0])
+    for node1_id, node2_id, weight, count in rows:
+        out = deltas[node1_id]
+        out[2] += weight
+        out[3] += count
+        inc = deltas[node2_id]
+        inc[0] += weight
+        inc[1] += count
+
+    groups = defaultdict(list)
+    for node_id, delta in deltas.items():
+        if node_id not in skip and any(delta):
+            groups[tuple(delta)].append(node_id)
+    for delta, node_ids in groups.items():
+        Node.objects.filter(pk__in=node_ids).update(
+            **{
+                field: F(field) + change
+                for field, change in zip(TOTAL_FIELDS, delta)
+                if change
+            }
+        )
+
+
+def relations_added(relations):
+    apply_relation_deltas((r.node1_id, r.node2_id, r.weight, 1) for r in relations)
+
+
+def relation_reweighted(relation, old_weight):
+    apply_relation_deltas(
+        [(relation.node1_id, relation.node2_id, relation.weight - old_weight, 0)]
+    )
+
+
+def relations_removed(relations):
+    apply_relation_deltas((r.node1_id, r.node2_id, -r.weight, -1) for r in relations)
+
+
+def detach_nodes(nodes):
+    """Call before deleting ``nodes`` (a Node queryset): their relations go
+    with them through the cascade, so the nodes at the other end lose them
+    from their totals."""
+    node_ids = set(nodes.values_list("pk", flat=True))
+    if not node_ids:
+        return
+    rows = Relation.objects.filter(
+        Q(node1_id__in=node_ids) | Q(node2_id__in=node_ids)
+    ).values_list("node1_id", "node2_id", "weight")
+    apply_relation_deltas(
+        ((node1_id, node2_id, -weight, -1) for node1_id, node2_id, weight in rows),
+        skip=node_ids,
+    )
+
+
+def _aggregate(end, expression):
+    totals = (
+        Relation.objects.filter(**{end: OuterRef("pk")})
+        .order_by()
+        .values(end)
+        .annotate(total=expression)
+        .values("total")
+    )
+    return Coalesce(Subquery(totals), Value(0), output_field=IntegerField())
+
+
+def expected_totals():
+    """The totals as they should be, as annotations on Node."""
+    return {
+        "expected_in_weight_sum": _aggregate("node2", Sum("weight")),
+        "expected_in_count": _aggregate("node2", Count("pk")),
+        "expected_out_weight_sum": _aggregate("node1", Sum("weight")),
+        "expected_out_count": _aggregate("node1", Count("pk")),
+    }
+
+
+def drifted_nodes():
+    """Nodes whose stored totals don't match their relations."""
+    drift = Q()
+    for field in TOTAL_FIELDS:
+        drift |= ~Q(**{field: F(f"expected_{field}")})
+    return Node.objects.annotate(**expected_totals()).filter(drift)
+
+
+def repair_weight_totals():
+    """Recompute every node's totals in one grouped UPDATE. Returns the
+    number of nodes that had drifted."""
+    drifted = drifted_nodes().count()
+    if drifted:
+        Node.objects.update(
+            **{field: expression for field, expression in zip(TOTAL_FIELDS, expected_totals().values())}
+        )
+    return drifted
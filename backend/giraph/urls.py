@@ -1,17 +1,30 @@
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path("ping/", views.ping),
     path("get_nodes/", views.GetNodes.as_view()),
+    path("search/", views.SearchNodes.as_view()),
     path("new_node/", views.NewNode.as_view()),
     path("new_relation/", views.NewRelation.as_view()),
     path("update_node/", views.UpdateNode.as_view()),
     path("update_relation/", views.UpdateRelation.as_view()),
     path("delete_node/", views.DeleteNode.as_view()),
     path("delete_relation/", views.DeleteRelation.as_view()),
+    path("bulk_delete_nodes/", views.BulkDeleteNodes.as_view()),
+    path("bulk_delete_relations/", views.BulkDeleteRelations.as_view()),
     path("get_program_outcomes/", views.GetProgramOutcomes.as_view()),
     path("create_program_outcome/", views.CreateProgramOutcome.as_view()),
     path("delete_program_outcome/", views.DeleteProgramOutcome.as_view()),
+    path("paths/", views.OutcomePaths.as_view()),
+    path("paths/reachable/", views.ReachableOutcomes.as_view()),
+    path("paths/contributing/", views.ContributingContents.as_view()),
+    path("audit/", views.AuditLog.as_view()),
+    path("snapshots/", views.ListSnapshots.as_view()),
+    path("snapshots/create/", views.CreateSnapshot.as_view()),
+    path("snapshots/diff/", views.DiffSnapshots.as_view()),
+    path("snapshots/<int:snapshot_id>/", views.GetSnapshot.as_view()),
+    path("async/get_nodes/", async_views.get_nodes),
+    path("async/get_program_outcomes/", async_views.get_program_outcomes),
 ]
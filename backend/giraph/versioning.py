@@ -0,0 +1,104 @@
+"""Graph version stamps.
+
+Every write that changes what get_nodes/ would return bumps the scopes it
+touches. Caches of rendered graphs (payload blobs, layouts, ...) key
+themselves on the stamp and never need explicit invalidation.
+"""
+
+import time
+import uuid
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from .models import GraphVersion, LayerChoices, Node
+
+ALL = "all"
+GLOBAL = "global"
+
+
+def course_scope(course_id):
+    # Query strings and model instances spell the same UUID differently
+    return str(uuid.UUID(str(course_id)))
+
+
+def bump_graph_version(course_ids=(), program_outcomes=False):
+    """Mark the graphs of ``course_ids`` (and, with ``program_outcomes``,
+    every course graph) as changed. Two statements, whatever the number
+    of scopes; call it once per logical operation, after its writes. Bumping
+    before the write could let a concurrent render store old data under
+    the new stamp."""
+    scopes = {ALL}
+    scopes.update(course_scope(c) for c in course_ids if c is not None)
+    if program_outcomes:
+        scopes.add(GLOBAL)
+    # Versions only ever go up: each is the larger of the clock and the old
+    # version plus one, so neither a clock stepping back nor two bumps in
+    # the same nanosecond can bring back a stamp that was already served.
+    now = time.time_ns()
+    with transaction.atomic():
+        GraphVersion.objects.bulk_create(
+            [GraphVersion(scope=scope, version=now) for scope in scopes],
+            ignore_conflicts=True,
+        )
+        GraphVersion.objects.filter(scope__in=scopes).update(
+            version=Greatest(F("version") + 1, Value(now))
+        )
+
+
+def bump_for_nodes(nodes):
+    """Bump the scopes of the given Node instances."""
+    bump_graph_version(
+        course_ids={n.course_id for n in nodes},
+        program_outcomes=any(n.layer == LayerChoices.PROGRAM_OUTCOME for n in nodes),
+    )
+
+
+def bump_for_relations(node1_ids):
+    """A relation only appears in the graph of its source node's course.
+    Returns the ids of the courses bumped."""
+    course_ids = list(
+        Node.objects.filter(pk__in=node1_ids).values_list("course_id", flat=True).distinct()
+    )
+    bump_graph_version(course_ids=course_ids)
+    return course_ids
+
+
+def _stamp_scopes(course_id):
+    return [ALL] if course_id is None else [course_scope(course_id), GLOBAL]
+
+
+def _format_stamp(scopes, versions):
+    return ".".join(str(versions.get(scope, 0)) for scope in scopes)
+
+
+def graph_stamp(course_id=None):
+    """Current stamp of the course graph, or of the whole department graph."""
+    scopes = _stamp_scopes(course_id)
+    versions = dict(
+        GraphVersion.objects.filter(scope__in=scopes).values_list("scope", "version")
+    )
+    return _format_stamp(scopes, versions)
+
+
+def graph_stamps(course_ids):
+    """``{course_scope: stamp}`` for several courses, in one query."""
+    scopes = {course_scope(c): _stamp_scopes(c) for c in course_ids}
+    versions = dict(
+        GraphVersion.objects.filter(
+            scope__in={s for wanted in scopes.values() for s in wanted}
+        ).values_list("scope", "version")
+    )
+    return {scope: _format_stamp(wanted, versions) for scope, wanted in scopes.items()}
+
+
+async def agraph_stamp(course_id=None):
+    scopes = _stamp_scopes(course_id)
+    versions = {
+        scope: version
+        async for scope, version in GraphVersion.objects.filter(
+            scope__in=scopes
+        ).values_list("scope", "version")
+    }
+    return _format_stamp(scopes, versions)
@@ -1,5 +1,8 @@
-from django.db import IntegrityError
+from backend.db import retry_on_busy
+from backend.routers import replica_reads
+from django.db import IntegrityError, transaction
 from django.http import JsonResponse
+from programs.lookups import course_exists
 from programs.models import Program
 from rest_framework import status
 from rest_framework.permissions import AllowAny
@@ -8,14 +11,43 @@ from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import IsAuthenticated
 
-from .models import LayerChoices, Node, Relation
+from . import audit, bulk
+from .paths import contributing_contents, reachable_outcomes, refresh_paths
+from .models import AuditEvent, GraphSnapshot, LayerChoices, Node, OutcomePath, Relation
+from .payloads import (
+    get_graph_payload,
+    get_graph_payloads,
+    multi_payload_response,
+    parse_course_ids,
+    payload_response,
+)
+from .search import search_nodes
+from .snapshots import diff_snapshots, snapshot_payload, take_snapshot
+from .totals import detach_nodes, relation_reweighted, relations_added, relations_removed
 from .serializers import (
-    GetNodesResponseSerializer,
+    AuditEventSerializer,
+    AuditQuerySerializer,
+    BulkDeleteNodesSerializer,
+    BulkDeleteRelationsSerializer,
+    ContributingQuerySerializer,
     NewNodeSerializer,
     NewRelationSerializer,
+    NewSnapshotSerializer,
+    OutcomePathSerializer,
+    PathQuerySerializer,
+    ReachableQuerySerializer,
+    SearchQuerySerializer,
+    SearchResultSerializer,
+    SnapshotDiffQuerySerializer,
+    SnapshotSerializer,
     UpdateNodeSerializer,
     UpdateRelationSerializer,
 )
+from .versioning import (
+    bump_for_nodes,
+    bump_for_relations,
+    bump_graph_version,
+)
 
 
 def ping(request):
@@ -31,6 +63,7 @@ class NewNode(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
 
+    @retry_on_busy
     def post(self, request):
         ser = NewNodeSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
@@ -44,10 +77,15 @@ class NewNode(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        node = Node.objects.create(
-            name=ser.validated_data["name"],
-            layer=ser.validated_data["layer"],
-            course=course,
+        with transaction.atomic():
+            node = Node.objects.create(
+                name=ser.validated_data["name"],
+                layer=ser.validated_data["layer"],
+                course=course,
+            )
+            bump_for_nodes([node])
+        audit.record(
+            request, "node.create", node.id, course.pk, name=node.name, layer=node.layer
         )
         return Response(
             {"message": "Node created.", "node_id": node.id},
@@ -64,22 +102,36 @@ class NewRelation(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
 
+    @retry_on_busy
     def post(self, request):
         ser = NewRelationSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
 
         try:
-            rel = Relation.objects.create(
-                node1_id=ser.validated_data["node1_id"],
-                node2_id=ser.validated_data["node2_id"],
-                weight=int(ser.validated_data["weight"]),
-            )
+            with transaction.atomic():
+                rel = Relation.objects.create(
+                    node1_id=ser.validated_data["node1_id"],
+                    node2_id=ser.validated_data["node2_id"],
+                    weight=int(ser.validated_data["weight"]),
+                )
+                relations_added([rel])
+                refresh_paths([rel.node1_id, rel.node2_id])
+                course_id = next(iter(bump_for_relations([rel.node1_id])), None)
         except IntegrityError:
             return Response(
                 {"detail": "This relation already exists (node1 -> node2)."},
                 status=status.HTTP_409_CONFLICT,
             )
 
+        audit.record(
+            request,
+            "relation.create",
+            rel.id,
+            course_id,
+            node1_id=rel.node1_id,
+            node2_id=rel.node2_id,
+            weight=rel.weight,
+        )
         return Response(
             {"message": "Relation created.", "relation_id": rel.id},
             status=status.HTTP_201_CREATED,
@@ -90,85 +142,72 @@ class GetNodes(APIView):
     """GET /api/giraph/get_nodes/?courseId=<id>
     Returns all nodes and relations in the graph, filtered by course if provided.
     Program outcomes are always included regardless of course filter.
+    Served from the pre-rendered blob, compressed as the client accepts.
+
+    GET /api/giraph/get_nodes/?courseIds=<id>,<id>,...
+    Several course graphs at once, as {"courses": {<id>: <graph>}}.
     """
 
     authentication_classes = []
     permission_classes = [AllowAny]
 
+    @replica_reads
     def get(self, request):
-        course_id = request.query_params.get("courseId")
+        if "courseIds" in request.query_params:
+            return self.get_many(request.query_params["courseIds"])
 
-        # Program outcomes are ALWAYS included (they have course=None)
-        program_outcome_nodes = list(
-            Node.objects.filter(layer=LayerChoices.PROGRAM_OUTCOME).only(
-                "id", "name", "layer", "course_id"
-            )
-        )
+        course_id = request.query_params.get("courseId")
 
-        # Filter course-specific nodes by course if provided
         if course_id:
-            try:
-                # Verify course exists
-                course = Program.objects.get(pk=course_id)
-                course_specific_nodes = list(
-                    Node.objects.filter(course=course).exclude(
-                        layer=LayerChoices.PROGRAM_OUTCOME
-                    ).only("id", "name", "layer", "course_id")
-                )
-            except Program.DoesNotExist:
+            # Verify course exists
+            if not course_exists(course_id):
                 return Response(
                     {"detail": f"Course {course_id} not found"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
         else:
-            course_specific_nodes = list(
-                Node.objects.exclude(layer=LayerChoices.PROGRAM_OUTCOME).only(
-                    "id", "name", "layer", "course_id"
-                )
+            course_id = None
+
+        return payload_response(get_graph_payload(course_id), request)
+
+    def get_many(self, raw_ids):
+        try:
+            scopes = parse_course_ids(raw_ids)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        missing = [c for c in scopes if not course_exists(c)]
+        if missing:
+            return Response(
+                {"detail": f"Course {missing[0]} not found"},
+                status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Combine all nodes
-        nodes = course_specific_nodes + program_outcome_nodes
-        node_ids = [n.id for n in nodes]
+        payloads = get_graph_payloads(scopes)
+        return multi_payload_response({scope: payloads[scope] for scope in scopes})
 
-        # Get relations between these nodes
-        rels = list(
-            Relation.objects.filter(
-                node1_id__in=node_ids, node2_id__in=node_ids
-            ).only("id", "node1_id", "node2_id", "weight")
-        )
 
-        rel_map = {n.id: [] for n in nodes}
-        for r in rels:
-            stub = {
-                "node1_id": r.node1_id,
-                "node2_id": r.node2_id,
-                "relation_id": r.id,
-                "weight": r.weight,
-            }
-            if r.node1_id in rel_map:
-                rel_map[r.node1_id].append(stub)
-            if r.node2_id in rel_map:
-                rel_map[r.node2_id].append(stub)
-
-        cc, co, po = [], [], []
-        for n in nodes:
-            pack = {"id": n.id, "name": n.name, "relations": rel_map.get(n.id, [])}
-            if n.layer == LayerChoices.COURSE_CONTENT:
-                cc.append(pack)
-            elif n.layer == LayerChoices.COURSE_OUTCOME:
-                co.append(pack)
-            else:
-                po.append(pack)
-
-        data = {
-            "course_contents": cc,
-            "course_outcomes": co,
-            "program_outcomes": po,
-        }
-        ser = GetNodesResponseSerializer(data=data)
+class SearchNodes(APIView):
+    """GET /api/giraph/search/?q=<text>&layer=<layer>&courseId=<id>&limit=<n>
+    Full-text search over node names across all courses, best match first.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        ser = SearchQuerySerializer(data=request.query_params)
         ser.is_valid(raise_exception=True)
-        return Response(ser.data, status=status.HTTP_200_OK)
+
+        nodes = search_nodes(
+            ser.validated_data["q"],
+            layer=ser.validated_data.get("layer"),
+            course_id=ser.validated_data.get("courseId"),
+            limit=ser.validated_data["limit"],
+        )
+        return Response(
+            {"results": SearchResultSerializer(nodes, many=True).data},
+            status=status.HTTP_200_OK,
+        )
 
 
 class UpdateNode(APIView):
@@ -179,6 +218,7 @@ class UpdateNode(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
 
+    @retry_on_busy
     def post(self, request):
         ser = UpdateNodeSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
@@ -194,8 +234,13 @@ class UpdateNode(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        node.name = name
-        node.save(update_fields=["name"])
+        old_name, node.name = node.name, name
+        with transaction.atomic():
+            node.save(update_fields=["name"])
+            bump_for_nodes([node])
+        audit.record(
+            request, "node.update", node.id, node.course_id, old_name=old_name, name=name
+        )
         return Response({"message": "Node updated."}, status=status.HTTP_200_OK)
 
 
@@ -207,6 +252,7 @@ class UpdateRelation(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
 
+    @retry_on_busy
     def post(self, request):
         ser = UpdateRelationSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
@@ -214,16 +260,31 @@ class UpdateRelation(APIView):
         relation_id = ser.validated_data["relation_id"]
         weight = int(ser.validated_data["weight"])
 
-        try:
-            rel = Relation.objects.get(pk=relation_id)
-        except Relation.DoesNotExist:
-            return Response(
-                {"detail": f"Relation {relation_id} not found."},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+        with transaction.atomic():
+            try:
+                rel = Relation.objects.select_for_update().get(pk=relation_id)
+            except Relation.DoesNotExist:
+                return Response(
+                    {"detail": f"Relation {relation_id} not found."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
 
-        rel.weight = weight
-        rel.save(update_fields=["weight"])
+            old_weight = rel.weight
+            rel.weight = weight
+            rel.save(update_fields=["weight"])
+            relation_reweighted(rel, old_weight)
+            refresh_paths([rel.node1_id, rel.node2_id])
+            course_id = next(iter(bump_for_relations([rel.node1_id])), None)
+        audit.record(
+            request,
+            "relation.update",
+            rel.id,
+            course_id,
+            node1_id=rel.node1_id,
+            node2_id=rel.node2_id,
+            old_weight=old_weight,
+            weight=weight,
+        )
         return Response({"message": "Relation updated."}, status=status.HTTP_200_OK)
 
 
@@ -235,6 +296,7 @@ class DeleteNode(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
 
+    @retry_on_busy
     def delete(self, request):
         node_id = request.data.get("node_id")
         if not node_id:
@@ -251,7 +313,14 @@ class DeleteNode(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        node.delete()
+        deleted_id = node.pk
+        with transaction.atomic():
+            detach_nodes(Node.objects.filter(pk=deleted_id))
+            node.delete()
+            bump_for_nodes([node])
+        audit.record(
+            request, "node.delete", deleted_id, node.course_id, name=node.name, layer=node.layer
+        )
         return Response({"message": "Node deleted."}, status=status.HTTP_200_OK)
 
 
@@ -263,6 +332,7 @@ class DeleteRelation(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
 
+    @retry_on_busy
     def delete(self, request):
         relation_id = request.data.get("relation_id")
         if not relation_id:
@@ -271,18 +341,139 @@ class DeleteRelation(APIView):
                 status=status.HTTP_422_UNPROCESSABLE_ENTITY,
             )
 
-        try:
-            rel = Relation.objects.get(pk=relation_id)
-        except Relation.DoesNotExist:
-            return Response(
-                {"detail": f"Relation {relation_id} not found."},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+        with transaction.atomic():
+            try:
+                rel = Relation.objects.select_for_update().get(pk=relation_id)
+            except Relation.DoesNotExist:
+                return Response(
+                    {"detail": f"Relation {relation_id} not found."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
 
-        rel.delete()
+            deleted_id = rel.pk
+            rel.delete()
+            relations_removed([rel])
+            refresh_paths([rel.node1_id, rel.node2_id])
+            course_id = next(iter(bump_for_relations([rel.node1_id])), None)
+        audit.record(
+            request,
+            "relation.delete",
+            deleted_id,
+            course_id,
+            node1_id=rel.node1_id,
+            node2_id=rel.node2_id,
+            weight=rel.weight,
+        )
         return Response({"message": "Relation deleted."}, status=status.HTTP_200_OK)
 
 
+def _audit_filters(filters):
+    return {key: str(value) if key == "course_id" else value for key, value in filters.items()}
+
+
+def _bulk_delete_denied(user, course_id):
+    """Heads may bulk delete across the department; lecturers only inside
+    a course they teach. Returns the error response, if any."""
+    if user.role in ["head", "department_head"]:
+        return None
+    if course_id is None:
+        return Response(
+            {"detail": "Only department heads can bulk delete without course_id."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    if not Program.objects.filter(pk=course_id, lecturer=user).exists():
+        return Response(
+            {"detail": "You can only bulk delete in your own courses."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    return None
+
+
+class BulkDeleteNodes(APIView):
+    """DELETE /api/giraph/bulk_delete_nodes
+    Body: {"course_id": str (UUID), "layer": str, "ids": [int]}, at least one;
+    the filters combine. Deletes the matching nodes with their relations.
+    Lecturers must give course_id, of a course they teach; heads may delete
+    across courses.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @retry_on_busy
+    def delete(self, request):
+        ser = BulkDeleteNodesSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        filters = ser.validated_data
+        denied = _bulk_delete_denied(request.user, filters.get("course_id"))
+        if denied:
+            return denied
+
+        nodes = Node.objects.all()
+        if "course_id" in filters:
+            nodes = nodes.filter(course_id=filters["course_id"])
+        if "layer" in filters:
+            nodes = nodes.filter(layer=filters["layer"])
+        if "ids" in filters:
+            nodes = nodes.filter(pk__in=filters["ids"])
+
+        node_count, relation_count, per_course = bulk.delete_nodes(nodes)
+        # One event per course, so each shows up in that course's log
+        for course_id, count in per_course.items():
+            audit.record(
+                request,
+                "node.bulk_delete",
+                course_id=course_id,
+                filters=_audit_filters(filters),
+                nodes=count,
+                operation={"nodes": node_count, "relations": relation_count},
+            )
+        return Response(
+            {"deleted": {"nodes": node_count, "relations": relation_count}},
+            status=status.HTTP_200_OK,
+        )
+
+
+class BulkDeleteRelations(APIView):
+    """DELETE /api/giraph/bulk_delete_relations
+    Body: {"course_id": str (UUID), "min_weight": int, "max_weight": int,
+    "ids": [int]}, at least one; the filters combine. A relation belongs to
+    the course of its source node. Same permissions as bulk_delete_nodes.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @retry_on_busy
+    def delete(self, request):
+        ser = BulkDeleteRelationsSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        filters = ser.validated_data
+        denied = _bulk_delete_denied(request.user, filters.get("course_id"))
+        if denied:
+            return denied
+
+        relations = Relation.objects.all()
+        if "course_id" in filters:
+            relations = relations.filter(node1__course_id=filters["course_id"])
+        if "min_weight" in filters:
+            relations = relations.filter(weight__gte=filters["min_weight"])
+        if "max_weight" in filters:
+            relations = relations.filter(weight__lte=filters["max_weight"])
+        if "ids" in filters:
+            relations = relations.filter(pk__in=filters["ids"])
+
+        deleted, per_course = bulk.delete_relations(relations)
+        for course_id, count in per_course.items():
+            audit.record(
+                request,
+                "relation.bulk_delete",
+                course_id=course_id,
+                filters=_audit_filters(filters),
+                relations=count,
+                operation={"relations": deleted},
+            )
+        return Response({"deleted": {"relations": deleted}}, status=status.HTTP_200_OK)
+
+
 class GetProgramOutcomes(APIView):
     """GET /api/giraph/get_program_outcomes
     Returns all program outcomes (global, not course-specific)
@@ -291,6 +482,7 @@ class GetProgramOutcomes(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
 
+    @replica_reads
     def get(self, request):
         outcomes = list(
             Node.objects.filter(layer=LayerChoices.PROGRAM_OUTCOME).values("id", "name")
@@ -310,6 +502,7 @@ class CreateProgramOutcome(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
 
+    @retry_on_busy
     def post(self, request):
         name = request.data.get("name", "").strip()
         if not name:
@@ -324,11 +517,14 @@ class CreateProgramOutcome(APIView):
                 status=status.HTTP_422_UNPROCESSABLE_ENTITY,
             )
 
-        outcome = Node.objects.create(
-            name=name,
-            layer=LayerChoices.PROGRAM_OUTCOME,
-            course=None,  # Program outcomes are global
-        )
+        with transaction.atomic():
+            outcome = Node.objects.create(
+                name=name,
+                layer=LayerChoices.PROGRAM_OUTCOME,
+                course=None,  # Program outcomes are global
+            )
+            bump_graph_version(program_outcomes=True)
+        audit.record(request, "program_outcome.create", outcome.id, name=name)
         return Response(
             {"message": "Program outcome created.", "id": outcome.id},
             status=status.HTTP_201_CREATED,
@@ -344,6 +540,7 @@ class DeleteProgramOutcome(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
 
+    @retry_on_busy
     def delete(self, request):
         outcome_id = request.data.get("outcome_id")
         if not outcome_id:
@@ -362,13 +559,255 @@ class DeleteProgramOutcome(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        outcome.delete()
+        deleted_id = outcome.pk
+        with transaction.atomic():
+            detach_nodes(Node.objects.filter(pk=deleted_id))
+            outcome.delete()
+            bump_graph_version(program_outcomes=True)
+        audit.record(request, "program_outcome.delete", deleted_id, name=outcome.name)
         return Response(
             {"message": "Program outcome deleted."},
             status=status.HTTP_200_OK,
         )
 
 
+class CreateSnapshot(APIView):
+    """POST /api/giraph/snapshots/create/
+    Body: {"course_id": str (UUID), "semester": str}
+    Freezes the current course graph as ``semester``.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    @retry_on_busy
+    def post(self, request):
+        ser = NewSnapshotSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+
+        course_id = ser.validated_data["course_id"]
+        semester = ser.validated_data["semester"]
+        if not course_exists(course_id):
+            return Response(
+                {"detail": f"Course {course_id} not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        try:
+            snapshot = take_snapshot(course_id, semester)
+        except IntegrityError:
+            return Response(
+                {"detail": f"A snapshot for {semester} already exists."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(
+            SnapshotSerializer(snapshot).data, status=status.HTTP_201_CREATED
+        )
+
+
+class ListSnapshots(APIView):
+    """GET /api/giraph/snapshots/?courseId=<id>
+    Snapshots of a course, newest first.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        course_id = request.query_params.get("courseId")
+        if not course_id:
+            return Response(
+                {"detail": "courseId is required."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        if not course_exists(course_id):
+            return Response(
+                {"detail": f"Course {course_id} not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        snapshots = GraphSnapshot.objects.filter(course_id=course_id).order_by(
+            "-created_at", "-id"
+        )
+        return Response(SnapshotSerializer(snapshots, many=True).data)
+
+
+class GetSnapshot(APIView):
+    """GET /api/giraph/snapshots/<id>/
+    The snapshot's graph, in the same shape as get_nodes/.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, snapshot_id):
+        try:
+            snapshot = GraphSnapshot.objects.get(pk=snapshot_id)
+        except GraphSnapshot.DoesNotExist:
+            return Response(
+                {"detail": f"Snapshot {snapshot_id} not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(
+            {**SnapshotSerializer(snapshot).data, "graph": snapshot_payload(snapshot)}
+        )
+
+
+class DiffSnapshots(APIView):
+    """GET /api/giraph/snapshots/diff/?from=<id>&to=<id>
+    Edges added, removed and reweighted between two snapshots.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        ser = SnapshotDiffQuerySerializer(
+            data={
+                "from_id": request.query_params.get("from"),
+                "to_id": request.query_params.get("to"),
+            }
+        )
+        ser.is_valid(raise_exception=True)
+
+        ids = [ser.validated_data["from_id"], ser.validated_data["to_id"]]
+        snapshots = GraphSnapshot.objects.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in snapshots]
+        if missing:
+            return Response(
+                {"detail": f"Snapshot {missing[0]} not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        old, new = snapshots[ids[0]], snapshots[ids[1]]
+        return Response(
+            {"from": old.semester, "to": new.semester, **diff_snapshots(old, new)}
+        )
+
+
+class OutcomePaths(APIView):
+    """GET /api/giraph/paths/?courseId=<id>&ccId=<id>&coId=<id>&poId=<id>&limit=<n>
+    Course content → course outcome → program outcome paths with their
+    weight products, heaviest first. Every filter is optional; without
+    any, the whole department's paths.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    @replica_reads
+    def get(self, request):
+        ser = PathQuerySerializer(data=request.query_params)
+        ser.is_valid(raise_exception=True)
+        params = ser.validated_data
+
+        paths = OutcomePath.objects.all()
+        for param, field in (
+            ("courseId", "course_id"),
+            ("ccId", "course_content_id"),
+            ("coId", "course_outcome_id"),
+            ("poId", "program_outcome_id"),
+        ):
+            if param in params:
+                paths = paths.filter(**{field: params[param]})
+        paths = paths.order_by("-weight", "id")[: params["limit"]]
+        return Response({"paths": OutcomePathSerializer(paths, many=True).data})
+
+
+def _node_or_404(node_id, layer):
+    node = Node.objects.filter(pk=node_id, layer=layer).values("id", "name").first()
+    if node is None:
+        return None, Response(
+            {"detail": f"No {layer} node {node_id}."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return node, None
+
+
+class ReachableOutcomes(APIView):
+    """GET /api/giraph/paths/reachable/?ccId=<id>
+    Program outcomes a course content reaches, with the number of paths to
+    each and the sum of their weight products.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    @replica_reads
+    def get(self, request):
+        ser = ReachableQuerySerializer(data=request.query_params)
+        ser.is_valid(raise_exception=True)
+
+        node, error = _node_or_404(ser.validated_data["ccId"], LayerChoices.COURSE_CONTENT)
+        if error:
+            return error
+        return Response(
+            {"course_content": node, "program_outcomes": reachable_outcomes(node["id"])}
+        )
+
+
+class ContributingContents(APIView):
+    """GET /api/giraph/paths/contributing/?poId=<id>&courseId=<id>
+    Course contents feeding a program outcome, across all courses unless
+    courseId is given, aggregated like paths/reachable/.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    @replica_reads
+    def get(self, request):
+        ser = ContributingQuerySerializer(data=request.query_params)
+        ser.is_valid(raise_exception=True)
+
+        node, error = _node_or_404(ser.validated_data["poId"], LayerChoices.PROGRAM_OUTCOME)
+        if error:
+            return error
+        contents = contributing_contents(node["id"], ser.validated_data.get("courseId"))
+        return Response({"program_outcome": node, "course_contents": contents})
+
+
+class AuditLog(APIView):
+    """GET /api/giraph/audit/?courseId=<id>&since=<datetime>&until=<datetime>&limit=<n>
+    Graph edits, newest first. Department heads can read every course (and
+    omit courseId); lecturers only their own courses. ``until`` is
+    exclusive, so passing the oldest ``created_at`` of a page fetches the
+    next one.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        ser = AuditQuerySerializer(data=request.query_params)
+        ser.is_valid(raise_exception=True)
+        params = ser.validated_data
+        course_id = params.get("courseId")
+
+        if request.user.role not in ["head", "department_head"]:
+            if course_id is None:
+                return Response(
+                    {"detail": "courseId is required."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if not Program.objects.filter(pk=course_id, lecturer=request.user).exists():
+                return Response(
+                    {"detail": "You can only read the audit log of your own courses."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+        # Include this process's pending events
+        audit.flush()
+        events = AuditEvent.objects.all()
+        if course_id is not None:
+            events = events.filter(course_id=course_id)
+        if "since" in params:
+            events = events.filter(created_at__gte=params["since"])
+        if "until" in params:
+            events = events.filter(created_at__lt=params["until"])
+        events = events.order_by("-created_at", "-id")[: params["limit"]]
+        return Response({"events": AuditEventSerializer(events, many=True).data})
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_nodes(request):
@@ -0,0 +1,111 @@
+import multiprocessing
+import threading
+import time
+from datetime import timedelta
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import STALE_AFTER, claim_next, requeue_stale, run_job, worker_name
+
+
+def work(slot, once, poll_interval, write=print):
+    """Claim and run jobs until the queue is empty (``once``) or forever."""
+    worker = worker_name(slot)
+    while True:
+        job = claim_next(worker)
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        job = run_job(job)
+        write(f"{worker}: {job.kind} {job.id} {job.status}")
+
+
+def _thread_main(slot, once, poll_interval, write):
+    try:
+        work(slot, once, poll_interval, write)
+    finally:
+        connections.close_all()  # this thread's connections only
+
+
+def _process_main(slot, once, poll_interval):
+    django.setup()  # no-op when forked from an already set-up parent
+    try:
+        work(slot, once, poll_interval)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the Job table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Number of jobs to run at the same time.",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=["thread", "process"],
+            default="thread",
+            help="Run jobs in threads (I/O-bound work) or processes (CPU-bound work).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=float,
+            default=STALE_AFTER.total_seconds() / 60,
+            help="Requeue running jobs that have not reported for this many minutes.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run what is currently queued and exit.",
+        )
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale(timedelta(minutes=options["stale_after"]))
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s)")
+
+        once, poll_interval = options["once"], options["poll_interval"]
+        concurrency = max(1, options["concurrency"])
+        if concurrency == 1 and options["mode"] == "thread":
+            work(0, once, poll_interval, self.stdout.write)
+            return
+
+        if options["mode"] == "process":
+            # Children must not inherit the parent's open SQLite handles
+            connections.close_all()
+            pool = [
+                multiprocessing.Process(target=_process_main, args=(slot, once, poll_interval))
+                for slot in range(concurrency)
+            ]
+        else:
+            pool = [
+                threading.Thread(
+                    target=_thread_main,
+                    args=(slot, once, poll_interval, self.stdout.write),
+                    daemon=True,
+                )
+                for slot in range(concurrency)
+            ]
+        for worker in pool:
+            worker.start()
+        try:
+            for worker in pool:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in pool:
+                if isinstance(worker, multiprocessing.Process):
+                    worker.terminate()
@@ -0,0 +1,60 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+from users.models import User
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = "queued", "Queued"
+    RUNNING = "running", "Running"
+    SUCCEEDED = "succeeded", "Succeeded"
+    FAILED = "failed", "Failed"
+
+
+class Job(models.Model):
+    """A unit of background work, run by ``manage.py run_jobs``.
+
+    ``kind`` names a handler registered in some app's jobs.py; ``params``
+    are passed to it as keyword arguments and its return value is stored
+    in ``result``.
+    """
+
+    id = models.UUIDField(default=uuid.uuid4, primary_key=True, editable=False)
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10, choices=JobStatus.choices, default=JobStatus.QUEUED
+    )
+    progress = models.FloatField(default=0.0)  # 0..1
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL, related_name="jobs"
+    )
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Workers claim the oldest queued job
+            models.Index(fields=["status", "created_at"], name="job_queue_idx"),
+        ]
+
+    def report(self, progress, message=""):
+        """Record progress (0..1) from inside a handler. Runs as its own
+        UPDATE, so call it outside the handler's transactions to make it
+        visible to pollers right away."""
+        self.progress = progress
+        self.message = message
+        self.heartbeat_at = timezone.now()
+        Job.objects.filter(pk=self.pk).update(
+            progress=self.progress, message=message, heartbeat_at=self.heartbeat_at
+        )
+
+    def __str__(self):
+        return f"{self.kind} {self.id} ({self.status})"
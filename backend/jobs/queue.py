@@ -0,0 +1,112 @@
+"""Submitting, claiming and running jobs.
+
+The queue is the ``Job`` table itself, so it needs no broker and works on
+SQLite. A worker claims a job with a conditional UPDATE (queued ->
+running); if another worker got there first the UPDATE matches no row and
+it simply tries the next one.
+
+While a handler runs, a heartbeat thread touches ``heartbeat_at`` every
+``HEARTBEAT_INTERVAL``, so a long job on a live worker never looks stale;
+only jobs whose worker died stop beating and get requeued.
+"""
+
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from .models import Job, JobStatus
+from .registry import get_handler
+
+STALE_AFTER = timedelta(minutes=30)
+HEARTBEAT_INTERVAL = timedelta(minutes=1)
+
+
+def submit(kind, params=None, user=None):
+    return Job.objects.create(kind=kind, params=params or {}, created_by=user)
+
+
+def worker_name(slot=0):
+    return f"{socket.gethostname()}:{os.getpid()}:{slot}"
+
+
+def claim_next(worker):
+    """Atomically take the oldest queued job, or return None."""
+    while True:
+        job_id = (
+            Job.objects.filter(status=JobStatus.QUEUED)
+            .order_by("created_at")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=job_id, status=JobStatus.QUEUED).update(
+            status=JobStatus.RUNNING, worker=worker, started_at=now, heartbeat_at=now
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+
+
+class Heartbeat(threading.Thread):
+    """Touches a running job's ``heartbeat_at`` every ``interval`` until
+    stopped. A beat that hits a locked database is skipped; the next one
+    comes long before the job could be taken for stale."""
+
+    def __init__(self, job_id, interval):
+        super().__init__(daemon=True)
+        self.job_id = job_id
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval.total_seconds()):
+                try:
+                    Job.objects.filter(pk=self.job_id, status=JobStatus.RUNNING).update(
+                        heartbeat_at=timezone.now()
+                    )
+                except DatabaseError:
+                    pass
+        finally:
+            connections.close_all()  # this thread's connections only
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job):
+    """Run a claimed job and store its outcome. Never raises."""
+    handler = get_handler(job.kind)
+    heartbeat = Heartbeat(job.pk, HEARTBEAT_INTERVAL)
+    heartbeat.start()
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind {job.kind!r}")
+        result = handler(job, **job.params)
+    except Exception:
+        job.status = JobStatus.FAILED
+        job.error = traceback.format_exc()
+    else:
+        job.status = JobStatus.SUCCEEDED
+        job.result = result
+        job.progress = 1.0
+    finally:
+        heartbeat.stop()
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "result", "error", "progress", "finished_at"])
+    return job
+
+
+def requeue_stale(older_than=STALE_AFTER):
+    """Put back jobs whose worker stopped beating, e.g. because it was
+    killed mid-run. Returns how many were requeued."""
+    return Job.objects.filter(
+        status=JobStatus.RUNNING, heartbeat_at__lt=timezone.now() - older_than
+    ).update(status=JobStatus.QUEUED, worker="")
@@ -0,0 +1,40 @@
+"""Job kinds and their handlers.
+
+Apps register handlers in their jobs.py (autodiscovered at startup)::
+
+    @register("clone_course", roles=HEAD_ROLES)
+    def clone_course(job, course_id, name=None):
+        ...
+        return {"course_id": ...}
+
+A handler gets the Job, so it can ``job.report(progress, message)``, plus
+the job's params as keyword arguments. Its return value must be JSON
+serializable. ``roles`` limits which users may submit the kind.
+"""
+
+HEAD_ROLES = ("head", "department_head")
+
+_handlers = {}
+_roles = {}
+
+
+def register(name, roles=()):
+    def decorator(handler):
+        _handlers[name] = handler
+        _roles[name] = tuple(roles)
+        return handler
+
+    return decorator
+
+
+def get_handler(name):
+    return _handlers.get(name)
+
+
+def can_submit(name, user):
+    roles = _roles.get(name, ())
+    return not roles or user.role in roles
+
+
+def kind_names():
+    return sorted(_handlers)
@@ -0,0 +1,35 @@
+from rest_framework import serializers
+
+from .models import Job
+from .registry import get_handler, kind_names
+
+
+class SubmitJobSerializer(serializers.Serializer):
+    kind = serializers.CharField(max_length=50)
+    params = serializers.DictField(required=False, default=dict)
+
+    def validate_kind(self, value):
+        if get_handler(value) is None:
+            raise serializers.ValidationError(
+                f"Unknown job kind. Choose one of: {', '.join(kind_names())}."
+            )
+        return value
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "params",
+            "status",
+            "progress",
+            "message",
+            "result",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,130 @@
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from giraph.models import LayerChoices, Node, Relation
+from programs.models import Program
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import User
+
+from jobs.models import JobStatus
+from jobs.queue import claim_next, requeue_stale, run_job, submit
+from jobs.registry import register
+
+
+@register("test_echo")
+def echo(job, value):
+    job.report(0.5, "halfway")
+    return {"value": value}
+
+
+@register("test_slow")
+def slow(job, seconds):
+    time.sleep(seconds)
+    return {}
+
+
+@register("test_boom")
+def boom(job):
+    raise RuntimeError("boom")
+
+
+class JobQueueTest(TestCase):
+    def run_worker(self):
+        call_command("run_jobs", "--once", stdout=StringIO())
+
+    def test_worker_runs_queued_jobs(self):
+        ok = submit("test_echo", {"value": 3})
+        failed = submit("test_boom")
+        self.run_worker()
+
+        ok.refresh_from_db()
+        self.assertEqual(ok.status, JobStatus.SUCCEEDED)
+        self.assertEqual(ok.result, {"value": 3})
+        self.assertEqual(ok.progress, 1.0)
+        self.assertEqual(ok.message, "halfway")
+
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, JobStatus.FAILED)
+        self.assertIn("RuntimeError: boom", failed.error)
+
+    def test_a_job_is_claimed_once(self):
+        job = submit("test_echo", {"value": 1})
+        self.assertEqual(claim_next("a").pk, job.pk)
+        self.assertIsNone(claim_next("b"))
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = submit("test_echo", {"value": 1})
+        claim_next("a")
+        self.assertEqual(requeue_stale(older_than=timedelta(minutes=5)), 0)
+        self.assertEqual(requeue_stale(older_than=timedelta(seconds=-1)), 1)
+        self.assertEqual(run_job(claim_next("b")).status, JobStatus.SUCCEEDED)
+        job.refresh_from_db()
+        self.assertEqual(job.worker, "b")
+
+
+class JobHeartbeatTest(TransactionTestCase):
+    def test_running_jobs_keep_beating(self):
+        submit("test_slow", {"seconds": 0.3})
+        job = claim_next("a")
+        started = job.heartbeat_at
+        with mock.patch("jobs.queue.HEARTBEAT_INTERVAL", timedelta(milliseconds=20)):
+            self.assertEqual(run_job(job).status, JobStatus.SUCCEEDED)
+        job.refresh_from_db()
+        # Beats kept coming until the handler returned
+        self.assertGreater(job.heartbeat_at - started, timedelta(milliseconds=200))
+
+
+class JobApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.head = User.objects.create(username="jobhead", email="jobhead@example.com", role="head")
+        self.lecturer = User.objects.create(username="joblec", email="joblec@example.com", role="lecturer")
+        self.course = Program.objects.create(name="Graphs", lecturer=self.lecturer, university="U", department="D")
+        self.po = Node.objects.create(name="PO", layer=LayerChoices.PROGRAM_OUTCOME)
+        cc = Node.objects.create(name="CC", layer=LayerChoices.COURSE_CONTENT, course=self.course)
+        co = Node.objects.create(name="CO", layer=LayerChoices.COURSE_OUTCOME, course=self.course)
+        Relation.objects.create(node1=cc, node2=co, weight=2)
+        Relation.objects.create(node1=co, node2=self.po, weight=5)
+        self.client.force_authenticate(self.head)
+
+    def test_clone_course_job(self):
+        response = self.client.post(
+            "/api/jobs/submit/",
+            {"kind": "clone_course", "params": {"course_id": str(self.course.id), "name": "Graphs 2"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json()["status"], "queued")
+        url = f"/api/jobs/{response.json()['id']}/"
+
+        call_command("run_jobs", "--once", stdout=StringIO())
+        job = self.client.get(url).json()
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["result"]["nodes"], 2)
+
+        clone = Program.objects.get(pk=job["result"]["course_id"])
+        self.assertEqual(clone.name, "Graphs 2")
+        edges = set(
+            Relation.objects.filter(node1__course=clone).values_list("node1__name", "node2__name", "weight")
+        )
+        self.assertEqual(edges, {("CC", "CO", 2), ("CO", "PO", 5)})
+        self.assertEqual(Relation.objects.get(node1__course=clone, node2__name="PO").node2_id, self.po.id)
+
+    def test_submit_validation_and_permissions(self):
+        response = self.client.post("/api/jobs/submit/", {"kind": "nope"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(self.lecturer)
+        response = self.client.post("/api/jobs/submit/", {"kind": "clone_course"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_users_only_see_their_own_jobs(self):
+        job = submit("test_echo", {"value": 1}, user=self.head)
+        self.client.force_authenticate(self.lecturer)
+        response = self.client.get(f"/api/jobs/{job.id}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
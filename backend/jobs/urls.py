@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import get_job, submit_job
+
+urlpatterns = [
+    path("submit/", submit_job, name="submit-job"),
+    path("<uuid:pk>/", get_job, name="get-job"),
+]
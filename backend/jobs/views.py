@@ -0,0 +1,52 @@
+from backend.db import retry_on_busy
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .models import Job
+from .queue import submit
+from .registry import HEAD_ROLES, can_submit
+from .serializers import JobSerializer, SubmitJobSerializer
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@retry_on_busy
+def submit_job(request):
+    """
+    POST /api/jobs/submit/
+    Body: {"kind": str, "params": {...}}
+    Queues the job and returns it right away (202); poll /api/jobs/<id>/.
+    """
+    ser = SubmitJobSerializer(data=request.data)
+    ser.is_valid(raise_exception=True)
+    kind = ser.validated_data["kind"]
+
+    if not can_submit(kind, request.user):
+        return Response(
+            {"detail": f"You are not allowed to run {kind} jobs."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    job = submit(kind, ser.validated_data["params"], user=request.user)
+    return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_job(request, pk):
+    """
+    GET /api/jobs/<id>/
+    Status, progress and, once finished, result or error of a job. Users
+    see their own jobs; department heads see all of them.
+    """
+    job = Job.objects.filter(pk=pk).first()
+    if job is None or (
+        job.created_by_id != request.user.pk and request.user.role not in HEAD_ROLES
+    ):
+        return Response(
+            {"detail": f"Job {pk} not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return Response(JobSerializer(job).data, status=status.HTTP_200_OK)
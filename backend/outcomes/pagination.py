@@ -0,0 +1,31 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class OutcomeCursorPagination(CursorPagination):
+    ordering = "id"
+    page_size = 50
+    page_size_query_param = "limit"
+    max_page_size = 200
+
+
+class OutcomePagination(LimitOffsetPagination):
+    """Limit/offset pagination that switches to cursor pagination when the
+    request carries a ``cursor`` parameter (``?cursor=`` for the first page).
+
+    Without ``limit`` or ``cursor`` the full list is returned unpaginated,
+    as before.
+    """
+
+    max_limit = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if CursorPagination.cursor_query_param in request.query_params:
+            self.delegate = OutcomeCursorPagination()
+            return self.delegate.paginate_queryset(queryset, request, view)
+        self.delegate = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.delegate is not None:
+            return self.delegate.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -1,4 +1,7 @@
+from django.core.cache import cache
 from django.test import TestCase
+from giraph.models import LayerChoices, Node
+from users.models import User
 from .models import LearningOutcome, ProgramOutcome
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -80,3 +83,56 @@ class LearningOutcomeViewSetTest(TestCase):
     def test_delete_learning_outcome(self):
         response = self.client.delete(f"/api/outcomes/learning-outcomes/{self.learning_outcome.id}/")
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class OutcomeListFeaturesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create(username="head", email="head@example.com", role="head")
+        self.client.force_authenticate(self.user)
+        for i in range(5):
+            ProgramOutcome.objects.create(name=f"PO {i}", description="")
+
+    def test_list_without_params_is_unpaginated(self):
+        response = self.client.get("/api/outcomes/program-outcomes/")
+        self.assertEqual(len(response.json()), 5)
+
+    def test_limit_offset_pagination(self):
+        response = self.client.get("/api/outcomes/program-outcomes/", {"limit": 2, "offset": 2})
+        body = response.json()
+        self.assertEqual(body["count"], 5)
+        self.assertEqual([o["name"] for o in body["results"]], ["PO 2", "PO 3"])
+
+    def test_cursor_pagination(self):
+        response = self.client.get("/api/outcomes/program-outcomes/", {"cursor": "", "limit": 3})
+        body = response.json()
+        self.assertEqual([o["name"] for o in body["results"]], ["PO 0", "PO 1", "PO 2"])
+        response = self.client.get(body["next"])
+        self.assertEqual([o["name"] for o in response.json()["results"]], ["PO 3", "PO 4"])
+
+    def test_search_filter(self):
+        response = self.client.get("/api/outcomes/program-outcomes/", {"search": "PO 3"})
+        self.assertEqual([o["name"] for o in response.json()], ["PO 3"])
+
+    def test_bulk_create_program_outcomes_with_nodes(self):
+        data = [{"name": "Bulk A", "description": ""}, {"name": "Bulk B", "description": ""}]
+        response = self.client.post("/api/outcomes/program-outcomes/bulk_create/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(ProgramOutcome.objects.count(), 7)
+        names = set(Node.objects.filter(layer=LayerChoices.PROGRAM_OUTCOME).values_list("name", flat=True))
+        self.assertEqual(names, {"Bulk A", "Bulk B"})
+
+    def test_bulk_create_is_all_or_nothing(self):
+        data = [{"name": "Ok"}, {"name": ""}]
+        response = self.client.post("/api/outcomes/program-outcomes/bulk_create/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ProgramOutcome.objects.count(), 5)
+
+    def test_list_cache_is_invalidated_by_writes(self):
+        self.client.get("/api/outcomes/program-outcomes/")
+        with self.assertNumQueries(0):
+            self.client.get("/api/outcomes/program-outcomes/")
+        self.client.post("/api/outcomes/program-outcomes/", {"name": "PO 5"}, format="json")
+        response = self.client.get("/api/outcomes/program-outcomes/")
+        self.assertEqual(len(response.json()), 6)
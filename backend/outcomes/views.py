@@ -1,29 +1,114 @@
-from django.shortcuts import render
-from rest_framework import viewsets
+import hashlib
+
+from backend.cache import bump_version, get_or_compute, versioned_key
+from django.db import transaction
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
 from .models import ProgramOutcome, LearningOutcome
+from .pagination import OutcomePagination
 from .serializers import ProgramOutcomeSerializer, LearningOutcomeSerializer
-from giraph.models import Node  # Import your Node model
+from giraph.models import LayerChoices, Node  # Import your Node model
+from giraph.totals import detach_nodes
+from giraph.versioning import bump_graph_version
+
+LIST_CACHE_TIMEOUT = 300
+
+
+class CachedOutcomeViewSet(viewsets.ModelViewSet):
+    """ModelViewSet with pagination, name search, a ``bulk_create`` action
+    and list responses cached under a version that every write bumps."""
+
+    pagination_class = OutcomePagination
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ["name", "description"]
+    ordering_fields = ["id", "name"]
+
+    def _cache_namespace(self):
+        return f"outcomes:{self.basename}"
+
+    def invalidate_list_cache(self):
+        bump_version(self._cache_namespace())
+
+    def list(self, request, *args, **kwargs):
+        url = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+        data = get_or_compute(
+            versioned_key(self._cache_namespace(), url),
+            lambda: super(CachedOutcomeViewSet, self).list(request, *args, **kwargs).data,
+            timeout=LIST_CACHE_TIMEOUT,
+        )
+        return Response(data)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self.invalidate_list_cache()
 
-class ProgramOutcomeViewSet(viewsets.ModelViewSet):
-    queryset = ProgramOutcome.objects.all()
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.invalidate_list_cache()
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        self.invalidate_list_cache()
+
+    def bulk_create_related(self, instances):
+        """Hook for rows that must be created alongside a bulk insert."""
+
+    @action(detail=False, methods=["post"])
+    def bulk_create(self, request):
+        """POST .../bulk_create/ with a list of objects; all or nothing."""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        model = self.get_queryset().model
+        with transaction.atomic():
+            instances = model.objects.bulk_create(
+                [model(**item) for item in serializer.validated_data]
+            )
+            self.bulk_create_related(instances)
+        self.invalidate_list_cache()
+
+        return Response(
+            self.get_serializer(instances, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class ProgramOutcomeViewSet(CachedOutcomeViewSet):
+    queryset = ProgramOutcome.objects.order_by("id")
     serializer_class = ProgramOutcomeSerializer
     
     def perform_create(self, serializer):
-        instance = serializer.save()
-        # Also create the graph node
-        Node.objects.create(
-            name=instance.name,
-            layer='program_outcome',
-            # Add any other required fields
+        with transaction.atomic():
+            instance = serializer.save()
+            # Also create the graph node
+            Node.objects.create(
+                name=instance.name,
+                layer=LayerChoices.PROGRAM_OUTCOME,
+            )
+            bump_graph_version(program_outcomes=True)
+        self.invalidate_list_cache()
+
+    def bulk_create_related(self, instances):
+        Node.objects.bulk_create(
+            [
+                Node(name=instance.name, layer=LayerChoices.PROGRAM_OUTCOME)
+                for instance in instances
+            ]
         )
+        bump_graph_version(program_outcomes=True)
     
     def perform_destroy(self, instance):
         # Delete the corresponding graph node first
-        Node.objects.filter(name=instance.name, layer='program_outcome').delete()
-        instance.delete()
+        with transaction.atomic():
+            nodes = Node.objects.filter(name=instance.name, layer=LayerChoices.PROGRAM_OUTCOME)
+            detach_nodes(nodes)
+            nodes.delete()
+            instance.delete()
+            bump_graph_version(program_outcomes=True)
+        self.invalidate_list_cache()
 
-class LearningOutcomeViewSet(viewsets.ModelViewSet):
-    queryset = LearningOutcome.objects.all()
+class LearningOutcomeViewSet(CachedOutcomeViewSet):
+    queryset = LearningOutcome.objects.order_by("id")
     serializer_class = LearningOutcomeSerializer
-
-
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Program
+from .models import Program, ProgramSettings
 
 admin.site.register(Program)
+admin.site.register(ProgramSettings)
 # Register your models here.
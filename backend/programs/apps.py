@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+def invalidate_program_lookups(sender, **kwargs):
+    from .lookups import invalidate
+
+    invalidate()
 
 
 class ProgramsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'programs'
+
+    def ready(self):
+        # Also fires for cascade deletes, e.g. when a lecturer is removed
+        program = self.get_model("Program")
+        post_save.connect(invalidate_program_lookups, sender=program)
+        post_delete.connect(invalidate_program_lookups, sender=program)
@@ -0,0 +1,27 @@
+"""Async variant of list_courses for ASGI deployments."""
+
+from backend.auth import aauthenticate
+from backend.routers import replica_reads
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from .views import course_page, course_page_queryset
+
+
+@require_GET
+@replica_reads
+async def list_courses(request):
+    """GET /api/programs/async/list_courses/ — same contract as list_courses/."""
+    user = await aauthenticate(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+
+    try:
+        courses, limit = course_page_queryset(user, request.GET)
+    except ValueError as e:
+        return JsonResponse({"detail": str(e)}, status=400)
+
+    courses = [course async for course in courses.aiterator()]
+    return JsonResponse(course_page(courses, limit))
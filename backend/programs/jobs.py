@@ -0,0 +1,49 @@
+from django.db import transaction
+from giraph.models import Node, Relation
+from giraph.paths import refresh_paths
+from giraph.totals import relations_added
+from giraph.versioning import bump_graph_version
+from jobs.registry import HEAD_ROLES, register
+
+from .models import Program
+
+
+@register("clone_course", roles=HEAD_ROLES)
+def clone_course(job, course_id, name=None, lecturer_id=None):
+    """Copy a course with its graph. Relations to program outcomes keep
+    pointing at the same (global) outcome nodes."""
+    source = Program.objects.get(pk=course_id)
+    nodes = list(Node.objects.filter(course=source).order_by("id"))
+    relations = list(Relation.objects.filter(node1__course=source))
+    job.report(0.2, f"Copying {len(nodes)} nodes and {len(relations)} relations")
+
+    with transaction.atomic():
+        clone = Program.objects.create(
+            name=name or f"{source.name} (copy)",
+            lecturer_id=lecturer_id or source.lecturer_id,
+            university=source.university,
+            department=source.department,
+        )
+        copies = Node.objects.bulk_create(
+            [Node(name=n.name, layer=n.layer, course=clone) for n in nodes]
+        )
+        new_id = {old.id: new.id for old, new in zip(nodes, copies)}
+        copied = Relation.objects.bulk_create(
+            [
+                Relation(
+                    node1_id=new_id[r.node1_id],
+                    node2_id=new_id.get(r.node2_id, r.node2_id),
+                    weight=r.weight,
+                )
+                for r in relations
+            ]
+        )
+        relations_added(copied)
+        refresh_paths(new_id.values())
+        bump_graph_version(course_ids=[clone.id])
+
+    return {
+        "course_id": str(clone.id),
+        "nodes": len(copies),
+        "relations": len(relations),
+    }
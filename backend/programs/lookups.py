@@ -0,0 +1,90 @@
+"""Cached program lookups shared by the programs, users and giraph apps.
+
+Everything sits in the ``programs`` cache namespace, whose version is
+bumped whenever a Program row is saved or deleted (see apps.py), so these
+reads never have to guess at expiry.
+"""
+
+import uuid
+
+from backend.cache import (
+    aget_or_compute,
+    aversioned_key,
+    bump_version,
+    get_or_compute,
+    versioned_key,
+)
+
+from .models import Program
+
+NAMESPACE = "programs"
+
+
+def invalidate():
+    bump_version(NAMESPACE)
+
+
+def _build_index(rows):
+    all_ids, by_lecturer = [], {}
+    for pk, lecturer_id in rows:
+        all_ids.append(pk)
+        by_lecturer.setdefault(lecturer_id, []).append(pk)
+    return {
+        "all": tuple(all_ids),
+        "ids": frozenset(str(pk) for pk in all_ids),
+        "by_lecturer": {k: tuple(v) for k, v in by_lecturer.items()},
+    }
+
+
+def _course_index():
+    return get_or_compute(
+        versioned_key(NAMESPACE, "course_index"),
+        lambda: _build_index(Program.objects.values_list("id", "lecturer_id")),
+    )
+
+
+async def _acourse_index():
+    async def load():
+        return _build_index(
+            [row async for row in Program.objects.values_list("id", "lecturer_id")]
+        )
+
+    return await aget_or_compute(await aversioned_key(NAMESPACE, "course_index"), load)
+
+
+def course_ids(lecturer_id=None):
+    """Ids of every course, or of the courses taught by ``lecturer_id``."""
+    index = _course_index()
+    if lecturer_id is None:
+        return index["all"]
+    return index["by_lecturer"].get(lecturer_id, ())
+
+
+def _normalize(course_id):
+    try:
+        return str(uuid.UUID(str(course_id)))
+    except ValueError:
+        return None
+
+
+def course_exists(course_id):
+    """Cached existence check for read paths. A miss is confirmed against
+    the database, since another worker's local cache may not have seen the
+    course being created yet."""
+    course_id = _normalize(course_id)
+    if course_id is None:
+        return False
+    return (
+        course_id in _course_index()["ids"]
+        or Program.objects.filter(pk=course_id).exists()
+    )
+
+
+async def acourse_exists(course_id):
+    course_id = _normalize(course_id)
+    if course_id is None:
+        return False
+    return (
+        course_id in (await _acourse_index())["ids"]
+        or await Program.objects.filter(pk=course_id).aexists()
+    )
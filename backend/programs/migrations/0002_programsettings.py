@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:33
+
+from django.db import migrations, models
+
+
+def seed_from_head(apps, schema_editor):
+    # Settings used to live on the department head's user row
+    User = apps.get_model("users", "User")
+    ProgramSettings = apps.get_model("programs", "ProgramSettings")
+    head = User.objects.filter(role__in=["head", "department_head"]).first()
+    ProgramSettings.objects.create(
+        pk=1,
+        university=head.university if head else "",
+        department=head.department if head else "",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0001_initial'),
+        ('users', '0005_passwordresettoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramSettings',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('university', models.CharField(blank=True, max_length=200)),
+                ('department', models.CharField(blank=True, max_length=100)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'program settings',
+            },
+        ),
+        migrations.RunPython(seed_from_head, migrations.RunPython.noop),
+    ]
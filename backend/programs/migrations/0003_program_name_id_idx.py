@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0002_programsettings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(fields=['name', 'id'], name='program_name_id_idx'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from backend.cache import cache_key, get_cache, get_or_compute
 from django.db import models
 import uuid
 from users.models import User
@@ -10,5 +11,41 @@ class Program(models.Model):
     university = models.CharField(max_length=200) 
     department = models.CharField(max_length=100) 
 
+    class Meta:
+        indexes = [
+            # Keyset pagination in list_courses walks (name, id)
+            models.Index(fields=["name", "id"], name="program_name_id_idx"),
+        ]
+
     def __str__(self):
         return self.name
+
+
+class ProgramSettings(models.Model):
+    """Department-wide settings, stored once (pk=1) and read through the cache."""
+
+    CACHE_KEY = cache_key("programs", "settings")
+    # save() only clears this process's copy on a per-process cache, so
+    # other workers pick up a change when their copy expires
+    CACHE_TIMEOUT = 60
+
+    university = models.CharField(max_length=200, blank=True)
+    department = models.CharField(max_length=100, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "program settings"
+
+    @classmethod
+    def load(cls):
+        return get_or_compute(
+            cls.CACHE_KEY, lambda: cls.objects.get_or_create(pk=1)[0], cls.CACHE_TIMEOUT
+        )
+
+    def save(self, *args, **kwargs):
+        self.pk = 1
+        super().save(*args, **kwargs)
+        get_cache().delete(self.CACHE_KEY)
+
+    def __str__(self):
+        return f"{self.university} / {self.department}"
@@ -1,7 +1,28 @@
 from rest_framework import serializers
-from .models import Program
+from .models import Program, ProgramSettings
 
 class ProgramSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        # Courses default to the department-wide settings
+        if self.instance is None:
+            settings = ProgramSettings.load()
+            attrs.setdefault("university", settings.university)
+            attrs.setdefault("department", settings.department)
+        return attrs
+
     class Meta:
         model = Program
         fields = "__all__"
+        extra_kwargs = {
+            "university": {"required": False},
+            "department": {"required": False},
+        }
+
+
+class CourseListSerializer(ProgramSerializer):
+    """Course row for list_courses; expects the annotations added there."""
+
+    lecturer_name = serializers.CharField(source="lecturer.get_full_name", read_only=True)
+    course_content_count = serializers.IntegerField(read_only=True)
+    course_outcome_count = serializers.IntegerField(read_only=True)
+    relation_count = serializers.IntegerField(read_only=True)
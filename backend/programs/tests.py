@@ -1,6 +1,14 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
-from .models import Program
+from . import lookups
+from .models import Program, ProgramSettings
 from users.models import User
+from users.serializers import UserSerializer
+from giraph.models import LayerChoices, Node, Relation
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 from rest_framework import status
 
@@ -70,3 +78,150 @@ class ProgramViewsTest(TestCase):
         }
         response = self.client.put("/api/programs/program/update_program", data, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+class ProgramSettingsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.head = User.objects.create(username="head", email="head@example.com", role="head")
+        self.lecturer = User.objects.create(username="lecturer", email="lecturer@example.com", role="lecturer", department="Old")
+        self.client.force_authenticate(self.head)
+
+    def test_update_settings_does_not_rewrite_users(self):
+        data = {"university": "Test University", "department": "Computer Engineering"}
+        response = self.client.put("/api/programs/settings/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.lecturer.refresh_from_db()
+        self.assertEqual(self.lecturer.department, "Old")
+        response = self.client.get(f"/api/users/{self.lecturer.id}/")
+        self.assertEqual(response.json()["department"], "Computer Engineering")
+
+        response = self.client.get("/api/programs/settings/")
+        self.assertEqual(response.json(), data)
+
+    def test_settings_are_read_from_cache(self):
+        ProgramSettings.load()
+        with self.assertNumQueries(0):
+            ProgramSettings.load()
+
+    def test_cached_settings_expire(self):
+        # A write on another worker can't clear this worker's copy
+        ProgramSettings.load()
+        ProgramSettings.objects.filter(pk=1).update(department="Elsewhere")
+        later = time.time() + ProgramSettings.CACHE_TIMEOUT + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertEqual(ProgramSettings.load().department, "Elsewhere")
+
+    def test_lecturer_cannot_update_settings(self):
+        self.client.force_authenticate(self.lecturer)
+        response = self.client.put("/api/programs/settings/", {"department": "X"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_new_course_defaults_to_settings(self):
+        ProgramSettings.objects.update_or_create(pk=1, defaults={"university": "U", "department": "D"})
+        data = {"name": "Course", "lecturer_id": str(self.lecturer.id)}
+        response = self.client.post("/api/programs/create_course/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["department"], "D")
+
+
+class ListCoursesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.head = User.objects.create(username="head", email="head@example.com", role="head")
+        self.lecturer = User.objects.create(username="lec", email="lec@example.com", role="lecturer", first_name="Ada", last_name="Lovelace")
+        self.courses = [
+            Program.objects.create(name=f"Course {i}", lecturer=self.lecturer, university="U", department="D")
+            for i in range(5)
+        ]
+        cc = Node.objects.create(name="CC", layer=LayerChoices.COURSE_CONTENT, course=self.courses[0])
+        co = Node.objects.create(name="CO", layer=LayerChoices.COURSE_OUTCOME, course=self.courses[0])
+        Relation.objects.create(node1=cc, node2=co, weight=3)
+        self.client.force_authenticate(self.head)
+
+    def test_keyset_pagination_walks_all_courses(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get("/api/programs/list_courses/", params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            body = response.json()
+            seen += [c["name"] for c in body["results"]]
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, [f"Course {i}" for i in range(5)])
+
+    def test_courses_are_annotated_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/programs/list_courses/", {"name": "Course 0"})
+        first = response.json()["results"][0]
+        self.assertEqual(first["course_content_count"], 1)
+        self.assertEqual(first["course_outcome_count"], 1)
+        self.assertEqual(first["relation_count"], 1)
+        self.assertEqual(first["lecturer_name"], "Ada Lovelace")
+
+    def test_filter_by_lecturer(self):
+        other = User.objects.create(username="other", email="other@example.com", role="lecturer")
+        Program.objects.create(name="Other", lecturer=other, university="U", department="D")
+        response = self.client.get("/api/programs/list_courses/", {"lecturer": str(other.id)})
+        self.assertEqual([c["name"] for c in response.json()["results"]], ["Other"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/programs/list_courses/", {"cursor": "nope"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncListCoursesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.head = User.objects.create(username="head", email="head@example.com", role="head")
+        self.token = Token.objects.create(user=self.head)
+        Program.objects.create(name="Course A", lecturer=self.head, university="U", department="D")
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get("/api/programs/async/list_courses/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_lists_courses_with_token(self):
+        response = await self.async_client.get(
+            "/api/programs/async/list_courses/",
+            headers={"Authorization": f"Token {self.token.key}"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual([c["name"] for c in body["results"]], ["Course A"])
+        self.assertIsNone(body["next_cursor"])
+
+
+class ProgramLookupsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.lecturer = User.objects.create(username="lookuplec", email="lookuplec@example.com", role="lecturer")
+        self.course = Program.objects.create(name="Cached", lecturer=self.lecturer, university="U", department="D")
+
+    def test_course_ids_are_cached_and_follow_writes(self):
+        self.assertEqual(lookups.course_ids(self.lecturer.pk), (self.course.pk,))
+        with self.assertNumQueries(0):
+            self.assertEqual(lookups.course_ids(), (self.course.pk,))
+            self.assertTrue(lookups.course_exists(str(self.course.pk)))
+
+        other = Program.objects.create(name="Other", lecturer=self.lecturer, university="U", department="D")
+        self.assertEqual(set(lookups.course_ids(self.lecturer.pk)), {self.course.pk, other.pk})
+
+        self.lecturer.delete()  # cascades to both courses
+        self.assertEqual(lookups.course_ids(), ())
+        self.assertFalse(lookups.course_exists(self.course.pk))
+        self.assertFalse(lookups.course_exists("not-a-uuid"))
+
+    def test_serialized_users_share_the_course_index(self):
+        heads = [User.objects.create(username=f"h{i}", email=f"h{i}@example.com", role="head") for i in range(3)]
+        UserSerializer(heads[0]).data
+        with self.assertNumQueries(0):
+            data = UserSerializer(heads, many=True).data
+        self.assertEqual(data[2]["courseIds"], [str(self.course.pk)])
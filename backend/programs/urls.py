@@ -1,5 +1,6 @@
 from django.urls import path
 
+from . import async_views
 from .views import (
     AssignLecturerToCourse,
     CreateCourse,
@@ -16,6 +17,7 @@ urlpatterns = [
     path("program-info/", program_info, name="program-info"),
     path("settings/", program_settings, name="program-settings"),
     path("list_courses/", list_courses, name="list-courses"),
+    path("async/list_courses/", async_views.list_courses, name="async-list-courses"),
     path("create_course/", CreateCourse.as_view(), name="create-course"),
     path("assign_lecturer/", AssignLecturerToCourse.as_view(), name="assign-lecturer"),
 ]
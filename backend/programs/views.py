@@ -1,3 +1,15 @@
+import base64
+import json
+import uuid
+
+from backend.db import retry_on_busy
+from backend.routers import replica_reads
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from giraph.models import LayerChoices, Node, Relation
+from giraph.totals import detach_nodes
+from giraph.versioning import bump_graph_version
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -6,12 +18,16 @@ from rest_framework.views import APIView
 from users.models import User
 from users.serializers import UserSerializer
 
-from .models import Program
-from .serializers import ProgramSerializer
+from .models import Program, ProgramSettings
+from .serializers import CourseListSerializer, ProgramSerializer
+
+COURSE_PAGE_SIZE = 50
+MAX_COURSE_PAGE_SIZE = 200
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def program_info(request):
     """
     GET /api/programs/program-info/
@@ -24,26 +40,18 @@ def program_info(request):
 
 @api_view(["GET", "PUT"])
 @permission_classes([IsAuthenticated])
+@retry_on_busy
 def program_settings(request):
     """
     GET/PUT /api/programs/settings/
     Get or update program settings (university, department info)
     """
-    # Get the first department head user for program info
-    head = User.objects.filter(role__in=["head", "department_head"]).first()
-    
-    if not head:
-        # Create default settings if no head exists
-        if request.method == "GET":
-            return Response({
-                "university": "",
-                "department": "",
-            }, status=status.HTTP_200_OK)
-    
+    settings = ProgramSettings.load()
+
     if request.method == "GET":
         return Response({
-            "university": head.university if head else "",
-            "department": head.department if head else "",
+            "university": settings.university,
+            "department": settings.department,
         }, status=status.HTTP_200_OK)
     
     elif request.method == "PUT":
@@ -54,48 +62,130 @@ def program_settings(request):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        university = request.data.get("university", "")
-        department = request.data.get("department", "")
-        
-        # Update the head's info
-        if head:
-            head.university = university
-            head.department = department
-            head.save()
-        
-        # Optionally update all users in the same program
-        User.objects.all().update(
-            university=university,
-            department=department
-        )
+        settings.university = request.data.get("university", "")
+        settings.department = request.data.get("department", "")
+        settings.save()
         
         return Response({
-            "university": university,
-            "department": department,
+            "university": settings.university,
+            "department": settings.department,
         }, status=status.HTTP_200_OK)
 
 
+def _encode_cursor(course):
+    raw = json.dumps([course.name, str(course.id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor):
+    name, course_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return name, uuid.UUID(course_id)
+
+
+def _count_per_course(queryset, course_field):
+    """Correlated COUNT(*) subquery so counts come back in the course query."""
+    counts = (
+        queryset.filter(**{course_field: OuterRef("pk")})
+        .order_by()
+        .values(course_field)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def course_page_queryset(user, params):
+    """Build the list_courses query for ``user`` from the request params.
+
+    Returns ``(queryset, limit)``; the queryset fetches one extra row so the
+    caller can tell whether there is a next page. Raises ValueError with a
+    client-facing message on bad parameters.
+    """
+    if user.role in ["head", "department_head"]:
+        courses = Program.objects.all()
+    else:
+        courses = Program.objects.filter(lecturer=user)
+
+    name = params.get("name", "").strip()
+    if name:
+        courses = courses.filter(name__icontains=name)
+
+    lecturer_id = params.get("lecturer")
+    if lecturer_id:
+        try:
+            courses = courses.filter(lecturer_id=uuid.UUID(lecturer_id))
+        except ValueError:
+            raise ValueError("lecturer must be a UUID")
+
+    try:
+        limit = int(params.get("limit", COURSE_PAGE_SIZE))
+    except ValueError:
+        limit = COURSE_PAGE_SIZE
+    limit = max(1, min(limit, MAX_COURSE_PAGE_SIZE))
+
+    cursor = params.get("cursor")
+    if cursor:
+        try:
+            after_name, after_id = _decode_cursor(cursor)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        courses = courses.filter(
+            Q(name__gt=after_name) | Q(name=after_name, id__gt=after_id)
+        )
+
+    courses = (
+        courses.select_related("lecturer")
+        .annotate(
+            course_content_count=_count_per_course(
+                Node.objects.filter(layer=LayerChoices.COURSE_CONTENT), "course"
+            ),
+            course_outcome_count=_count_per_course(
+                Node.objects.filter(layer=LayerChoices.COURSE_OUTCOME), "course"
+            ),
+            relation_count=_count_per_course(Relation.objects.all(), "node1__course"),
+        )
+        .order_by("name", "id")[: limit + 1]
+    )
+    return courses, limit
+
+
+def course_page(courses, limit):
+    """Serialize a fetched page and compute its ``next_cursor``."""
+    next_cursor = None
+    if len(courses) > limit:
+        courses = courses[:limit]
+        next_cursor = _encode_cursor(courses[-1])
+    return {
+        "results": CourseListSerializer(courses, many=True).data,
+        "next_cursor": next_cursor,
+    }
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def list_courses(request):
     """
-    GET /api/programs/list_courses/
+    GET /api/programs/list_courses/?limit=&cursor=&name=&lecturer=
     Returns courses based on user role:
     - Lecturers see only their courses
     - Heads see all courses
+    Courses are ordered by (name, id) and paginated by keyset; pass
+    ``next_cursor`` from the previous page as ``cursor``. Each course carries
+    its lecturer name and graph node/relation counts.
     """
-    if request.user.role in ["head", "department_head"]:
-        courses = Program.objects.all()
-    else:
-        courses = Program.objects.filter(lecturer=request.user)
-    
-    serializer = ProgramSerializer(courses, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    try:
+        courses, limit = course_page_queryset(request.user, request.query_params)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(course_page(list(courses), limit), status=status.HTTP_200_OK)
 
 
 class CreateCourse(APIView):
     permission_classes = [IsAuthenticated]
 
+    @retry_on_busy
     def post(self, request):
         if request.user.role not in ["head", "department_head"]:
             return Response(
@@ -119,6 +209,7 @@ class CreateCourse(APIView):
 class AssignLecturerToCourse(APIView):
     permission_classes = [IsAuthenticated]
 
+    @retry_on_busy
     def post(self, request):
         if request.user.role not in ["head", "department_head"]:
             return Response(
@@ -160,6 +251,7 @@ class AssignLecturerToCourse(APIView):
 
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
+@retry_on_busy
 def delete_program(request, pk):
     if request.user.role not in ["head", "department_head"]:
         return Response(
@@ -175,7 +267,10 @@ def delete_program(request, pk):
             status=status.HTTP_404_NOT_FOUND,
         )
 
-    program.delete()
+    with transaction.atomic():
+        detach_nodes(program.nodes.all())
+        program.delete()
+        bump_graph_version(course_ids=[pk])
     return Response(
         {"message": "Program deleted."},
         status=status.HTTP_200_OK,
@@ -184,6 +279,7 @@ def delete_program(request, pk):
 
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated])
+@retry_on_busy
 def update_program(request, pk):
     if request.user.role not in ["head", "department_head"]:
         return Response(
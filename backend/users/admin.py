@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import User
+from .models import OutboxEmail, PasswordResetToken, User
 
 admin.site.register(User)
+admin.site.register(OutboxEmail)
+admin.site.register(PasswordResetToken)
 # Register your models here.
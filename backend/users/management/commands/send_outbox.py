@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails in batches over a reused connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain what is currently due and exit.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            try:
+                sent, failed = drain_outbox(batch_size=batch_size)
+            except Exception as e:
+                # The mail server itself is unreachable; nothing was attempted.
+                self.stderr.write(f"Outbox connection error: {e}")
+                if options["once"]:
+                    return
+                time.sleep(options["interval"])
+                continue
+
+            if sent or failed:
+                self.stdout.write(f"Outbox: {sent} sent, {failed} failed")
+            if options["once"]:
+                if sent + failed < batch_size:
+                    return
+                continue
+            if sent + failed < batch_size:
+                time.sleep(options["interval"])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users.reset_tokens import sweep_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired password reset tokens. Meant to run periodically (e.g. cron)."
+
+    def handle(self, *args, **options):
+        deleted = sweep_expired_tokens()
+        self.stdout.write(f"Deleted {deleted} expired reset tokens")
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_outboxemail'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='reset_token',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='reset_token_expiry',
+        ),
+        migrations.CreateModel(
+            name='PasswordResetToken',
+            fields=[
+                ('token_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('used_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reset_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
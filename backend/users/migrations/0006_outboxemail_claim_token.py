@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_passwordresettoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='claim_token',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
@@ -40,8 +40,6 @@ class User(AbstractBaseUser, PermissionsMixin):
     date_joined = models.DateTimeField(default=timezone.now, verbose_name="Kayıt Tarihi")
     is_active = models.BooleanField(default=True)  # Changed to True
     is_staff = models.BooleanField(default=False)
-    reset_token = models.CharField(max_length=100, null=True, blank=True)
-    reset_token_expiry = models.DateTimeField(null=True, blank=True)
     
     objects = UserManager()
     
@@ -58,3 +56,47 @@ class User(AbstractBaseUser, PermissionsMixin):
             return full_name
         else:
             return self.email
+
+
+class OutboxEmail(models.Model):
+    """Outgoing email queued by request handlers and delivered by the
+    ``send_outbox`` management command."""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=200)
+    to = models.CharField(max_length=200)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # Set by the worker that claimed the email for its current batch
+    claim_token = models.CharField(max_length=32, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.id} | {self.status} | {self.to}"
+
+
+class PasswordResetToken(models.Model):
+    """Single-use password reset token. Only the SHA-256 of the token is
+    stored, so the raw value sent by email never touches the database."""
+
+    token_hash = models.CharField(max_length=64, primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reset_tokens")
+    expires_at = models.DateTimeField(db_index=True)
+    used_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user_id} | expires {self.expires_at}"
@@ -0,0 +1,116 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+MAX_ATTEMPTS = 5
+BASE_BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 60 * 60
+# How long a claimed email is reserved for the worker sending it; one left
+# behind by a crashed worker becomes due again after this
+CLAIM_SECONDS = 10 * 60
+
+
+def enqueue_email(subject, body, to, from_email=None):
+    """Store an email for the outbox worker; never touches SMTP."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        to=to,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def backoff_for(attempts):
+    """Exponential backoff (30s, 60s, 120s, ...) capped at one hour."""
+    return timedelta(
+        seconds=min(BASE_BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+    )
+
+
+def claim_batch(batch_size):
+    """Claim up to ``batch_size`` due emails for this worker and return them.
+
+    The claim is a conditional UPDATE that pushes ``next_attempt_at`` past
+    now, so rows another worker claimed first no longer match it, and two
+    workers (or a cron run overlapping a worker) never send the same email.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    due = list(
+        OutboxEmail.objects.filter(status="pending", next_attempt_at__lte=now)
+        .order_by("next_attempt_at", "id")
+        .values_list("pk", flat=True)[:batch_size]
+    )
+    if not due:
+        return []
+    OutboxEmail.objects.filter(
+        pk__in=due, status="pending", next_attempt_at__lte=now
+    ).update(claim_token=token, next_attempt_at=now + timedelta(seconds=CLAIM_SECONDS))
+    return list(
+        OutboxEmail.objects.filter(claim_token=token, status="pending").order_by(
+            "next_attempt_at", "id"
+        )
+    )
+
+
+def drain_outbox(batch_size=50, connection=None):
+    """Deliver up to ``batch_size`` due emails over a single connection.
+
+    Returns a ``(sent, failed)`` tuple. Failed messages are rescheduled with
+    backoff until MAX_ATTEMPTS is reached, then marked as failed.
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    sent = failed = 0
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        try:
+            connection.open()
+        except Exception:
+            # Nothing was attempted: hand the batch back right away
+            OutboxEmail.objects.filter(pk__in=[e.pk for e in batch]).update(
+                next_attempt_at=timezone.now()
+            )
+            raise
+        for email in batch:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=[email.to],
+                connection=connection,
+            )
+            email.attempts += 1
+            try:
+                message.send()
+            except Exception as e:
+                failed += 1
+                email.last_error = str(e)
+                if email.attempts >= MAX_ATTEMPTS:
+                    email.status = "failed"
+                else:
+                    email.next_attempt_at = timezone.now() + backoff_for(email.attempts)
+            else:
+                sent += 1
+                email.status = "sent"
+                email.sent_at = timezone.now()
+                email.last_error = ""
+            email.save(
+                update_fields=[
+                    "status",
+                    "attempts",
+                    "next_attempt_at",
+                    "last_error",
+                    "sent_at",
+                ]
+            )
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,60 @@
+import hashlib
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from .models import PasswordResetToken
+
+TOKEN_LIFETIME = timedelta(hours=1)
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_reset_token(user):
+    """Create a fresh token for ``user``, revoking any earlier ones.
+
+    Returns the raw token; only its hash is stored.
+    """
+    token = get_random_string(64)
+    PasswordResetToken.objects.filter(user=user).delete()
+    PasswordResetToken.objects.create(
+        token_hash=hash_token(token),
+        user=user,
+        expires_at=timezone.now() + TOKEN_LIFETIME,
+    )
+    return token
+
+
+def consume_reset_token(token):
+    """Claim ``token`` exactly once.
+
+    Returns ``(user, None)`` on success or ``(None, reason)`` where reason is
+    ``"invalid"`` or ``"expired"``. The claim is a single conditional UPDATE,
+    so two concurrent requests with the same token cannot both succeed.
+    """
+    token_hash = hash_token(token)
+    try:
+        row = PasswordResetToken.objects.select_related("user").get(pk=token_hash)
+    except PasswordResetToken.DoesNotExist:
+        return None, "invalid"
+
+    now = timezone.now()
+    claimed = PasswordResetToken.objects.filter(
+        pk=token_hash, used_at__isnull=True, expires_at__gt=now
+    ).update(used_at=now)
+    if claimed:
+        return row.user, None
+    if row.used_at is None and row.expires_at <= now:
+        return None, "expired"
+    return None, "invalid"
+
+
+def sweep_expired_tokens(now=None):
+    """Delete every expired token in one statement; returns the row count."""
+    deleted, _ = PasswordResetToken.objects.filter(
+        expires_at__lte=now or timezone.now()
+    ).delete()
+    return deleted
@@ -1,4 +1,5 @@
-from programs.models import Program
+from programs.lookups import course_ids
+from programs.models import ProgramSettings
 from rest_framework import serializers
 
 from .models import User
@@ -11,27 +12,22 @@ class UserSerializer(serializers.ModelSerializer):
 
     def get_courseIds(self, obj):
         # Return list of course IDs (as strings for UUIDs) where user is the lecturer
-        if obj.role == "lecturer":
-            return [
-                str(course_id)
-                for course_id in Program.objects.filter(lecturer=obj).values_list(
-                    "id", flat=True
-                )
-            ]
-        # Department heads can access all courses
-        return [
-            str(course_id)
-            for course_id in Program.objects.all().values_list("id", flat=True)
-        ]
+        return [str(course_id) for course_id in self.get_courses(obj)]
 
     def get_courses(self, obj):
-        # Return list of course IDs as integers for filtering
+        # Lecturers see their own courses, department heads see all of them
         if obj.role == "lecturer":
-            return list(
-                Program.objects.filter(lecturer=obj).values_list("id", flat=True)
-            )
-        # Department heads can access all courses
-        return list(Program.objects.all().values_list("id", flat=True))
+            return list(course_ids(lecturer_id=obj.pk))
+        return list(course_ids())
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # University/department are department-wide settings; the user's
+        # own columns only matter when the settings are not filled in.
+        settings = ProgramSettings.load()
+        data["university"] = settings.university or data["university"]
+        data["department"] = settings.department or data["department"]
+        return data
 
     def create(self, validated_data):
         password = validated_data.pop("password", None)
@@ -1,5 +1,13 @@
-from django.test import TestCase
-from .models import User
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from .models import OutboxEmail, PasswordResetToken, User
+from .outbox import claim_batch, drain_outbox, enqueue_email
+from .reset_tokens import hash_token, issue_reset_token, sweep_expired_tokens
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
@@ -84,3 +92,97 @@ class UserViewsTest(TestCase):
     def test_delete_user(self):
         response = self.client.delete(f"/api/users/users/{self.user.id}/delete/")
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class PasswordResetOutboxTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="resetuser", email="reset@example.com", password="oldpassword")
+
+    def test_request_password_reset_enqueues_email(self):
+        response = self.client.post("/api/users/request-password-reset/", {"email": "reset@example.com"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboxEmail.objects.get()
+        self.assertEqual(queued.to, "reset@example.com")
+        self.assertEqual(queued.status, "pending")
+
+    def test_drain_outbox_sends_batch(self):
+        enqueue_email("Subject 1", "Body 1", "a@example.com")
+        enqueue_email("Subject 2", "Body 2", "b@example.com")
+        sent, failed = drain_outbox()
+        self.assertEqual((sent, failed), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(OutboxEmail.objects.exclude(status="sent").exists())
+
+    def test_claimed_emails_are_not_sent_twice(self):
+        enqueue_email("Subject 1", "Body 1", "a@example.com")
+        enqueue_email("Subject 2", "Body 2", "b@example.com")
+        # another worker claims the batch first
+        self.assertEqual(len(claim_batch(batch_size=1)), 1)
+        self.assertEqual(drain_outbox(), (1, 0))
+        self.assertEqual([m.to for m in mail.outbox], [["b@example.com"]])
+        self.assertEqual(claim_batch(batch_size=10), [])
+
+    def test_drain_outbox_retries_with_backoff(self):
+        email = enqueue_email("Subject", "Body", "a@example.com")
+        with mock.patch("django.core.mail.EmailMessage.send", side_effect=OSError("smtp down")):
+            sent, failed = drain_outbox()
+        self.assertEqual((sent, failed), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, "pending")
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        # Not due yet, so a second drain does nothing
+        self.assertEqual(drain_outbox(), (0, 0))
+
+
+class PasswordResetTokenTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="tokenuser", email="token@example.com", password="oldpassword")
+
+    def test_token_is_stored_hashed(self):
+        token = issue_reset_token(self.user)
+        self.assertFalse(PasswordResetToken.objects.filter(token_hash=token).exists())
+        self.assertTrue(PasswordResetToken.objects.filter(token_hash=hash_token(token)).exists())
+
+    def test_reset_password_consumes_token_once(self):
+        token = issue_reset_token(self.user)
+        data = {"token": token, "password": "newpassword123"}
+        response = self.client.post("/api/users/reset-password/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("newpassword123"))
+
+        response = self.client.post("/api/users/reset-password/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_failed_save_leaves_token_usable(self):
+        token = issue_reset_token(self.user)
+        data = {"token": token, "password": "newpassword123"}
+        with mock.patch.object(User, "save", side_effect=OperationalError("database is locked")):
+            response = self.client.post("/api/users/reset-password/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertIsNone(PasswordResetToken.objects.get().used_at)
+
+        response = self.client.post("/api/users/reset-password/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("newpassword123"))
+
+    def test_expired_token_is_rejected(self):
+        token = issue_reset_token(self.user)
+        PasswordResetToken.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        response = self.client.post("/api/users/reset-password/", {"token": token, "password": "x"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["error"], "Reset token has expired")
+
+    def test_sweep_deletes_only_expired_tokens(self):
+        issue_reset_token(self.user)
+        other = User.objects.create_user(username="other", email="other@example.com", password="pw")
+        issue_reset_token(other)
+        PasswordResetToken.objects.filter(user=other).update(expires_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(sweep_expired_tokens(), 1)
+        self.assertEqual(list(PasswordResetToken.objects.values_list("user_id", flat=True)), [self.user.id])
@@ -1,9 +1,10 @@
+from backend.routers import replica_reads
 from django.contrib.auth import authenticate
-from django.core.mail import send_mail
-from django.utils.crypto import get_random_string
-from django.utils import timezone
-from datetime import timedelta
-from django.conf import settings
+from django.db import transaction
+from giraph.models import Node
+from giraph.totals import detach_nodes
+from giraph.versioning import bump_graph_version
+from programs.models import Program
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.decorators import api_view, permission_classes
@@ -12,6 +13,8 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .models import User
+from .outbox import enqueue_email
+from .reset_tokens import consume_reset_token, issue_reset_token
 from .serializers import UserSerializer
 
 
@@ -167,6 +170,7 @@ def update_user(request, pk):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def get_user(request, pk):
     try:
         user = User.objects.get(pk=pk)
@@ -197,7 +201,13 @@ def delete_user(request, pk):
             status=status.HTTP_404_NOT_FOUND
         )
 
-    user.delete()
+    # The user's courses (and their graphs) go with them
+    course_ids = list(Program.objects.filter(lecturer=user).values_list("pk", flat=True))
+    with transaction.atomic():
+        detach_nodes(Node.objects.filter(course_id__in=course_ids))
+        user.delete()
+        if course_ids:
+            bump_graph_version(course_ids=course_ids)
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -214,20 +224,16 @@ def request_password_reset(request):
         user = User.objects.get(email=email)
         
         # Generate reset token
-        reset_token = get_random_string(64)
-        user.reset_token = reset_token
-        user.reset_token_expiry = timezone.now() + timedelta(hours=1)
-        user.save()
+        reset_token = issue_reset_token(user)
         
         # Construct reset URL
         frontend_url = request.headers.get('Origin', 'http://localhost:3000')
         reset_url = f"{frontend_url}/reset-password?token={reset_token}"
         
-        # Send email
-        try:
-            send_mail(
-                subject="Password Reset Request - EYS-366",
-                message=f"""
+        # Queue the email; the send_outbox worker delivers it
+        enqueue_email(
+            subject="Password Reset Request - EYS-366",
+            body=f"""
 Hello {user.first_name or user.username},
 
 You requested a password reset for your EYS-366 account.
@@ -242,19 +248,8 @@ If you didn't request this, please ignore this email.
 Best regards,
 EYS-366 Team
                 """,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-                fail_silently=False,
-            )
-            print(f"Password reset email sent to {email}")  # Debug log
-        except Exception as email_error:
-            print(f"Email sending error: {str(email_error)}")
-            import traceback
-            traceback.print_exc()
-            return Response(
-                {"error": f"Failed to send email: {str(email_error)}"}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            to=email,
+        )
         
         return Response({"message": "Password reset email sent"}, status=status.HTTP_200_OK)
         
@@ -290,20 +285,25 @@ def reset_password(request):
         )
     
     try:
-        user = User.objects.get(reset_token=token)
-        
-        # Check if token expired
-        if user.reset_token_expiry < timezone.now():
-            return Response(
-                {"error": "Reset token has expired"}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Reset password
-        user.set_password(new_password)
-        user.reset_token = None
-        user.reset_token_expiry = None
-        user.save()
+        # Claim the token and store the password together, so a failed save
+        # leaves the token usable for another attempt
+        with transaction.atomic():
+            user, reason = consume_reset_token(token)
+
+            if reason == "expired":
+                return Response(
+                    {"error": "Reset token has expired"}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if user is None:
+                return Response(
+                    {"error": "Invalid or expired reset token"}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # Reset password
+            user.set_password(new_password)
+            user.save(update_fields=["password"])
         
         print(f"Password reset successful for user: {user.username}")  # Debug log
         
@@ -312,12 +312,6 @@ def reset_password(request):
             status=status.HTTP_200_OK
         )
         
-    except User.DoesNotExist:
-        return Response(
-            {"error": "Invalid or expired reset token"}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
-        
     except Exception as e:
         import traceback
         print(f"Password reset error: {str(e)}")
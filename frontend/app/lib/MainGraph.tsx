@@ -57,7 +57,7 @@ const convertToNodes = (data: GetNodesResponse): Node[] => {
     nodes.push({
       id: `cc-${node.id}`,
       type: "graphnode",
-      position: { x: 50, y: yOffset + index * 120 },
+      position: { x: node.x ?? 50, y: node.y ?? yOffset + index * 120 },
       data: { label: node.name, apiId: node.id },
       sourcePosition: "right" as const,
       style: {
@@ -76,7 +76,7 @@ const convertToNodes = (data: GetNodesResponse): Node[] => {
     nodes.push({
       id: `co-${node.id}`,
       type: "graphnode",
-      position: { x: 500, y: yOffset + index * 120 },
+      position: { x: node.x ?? 500, y: node.y ?? yOffset + index * 120 },
       data: { label: node.name, apiId: node.id },
       sourcePosition: "right" as const,
       targetPosition: "left" as const,
@@ -96,7 +96,7 @@ const convertToNodes = (data: GetNodesResponse): Node[] => {
     nodes.push({
       id: `po-${node.id}`,
       type: "graphnode",
-      position: { x: 950, y: yOffset + index * 120 },
+      position: { x: node.x ?? 950, y: node.y ?? yOffset + index * 120 },
       data: { label: node.name, apiId: node.id },
       targetPosition: "left" as const,
       style: {
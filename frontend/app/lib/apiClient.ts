@@ -74,6 +74,9 @@ export interface NodeData {
     id: number;
     name: string;
     relations: NodeRelation[];
+    // Server-side layout; absent in payloads from older servers
+    x?: number;
+    y?: number;
 }
 
 export interface GetNodesResponse {
@@ -82,6 +85,38 @@ export interface GetNodesResponse {
     program_outcomes: NodeData[];
 }
 
+// --- Batched requests ---
+
+export interface BatchRequest {
+    method: "GET" | "POST" | "PUT" | "PATCH" | "DELETE";
+    path: string; // e.g. "/api/users/me/"
+    body?: unknown;
+}
+
+export interface BatchResponse {
+    status: number;
+    body: unknown;
+}
+
+// Several API calls in one round trip. With atomic, writes share one
+// transaction and are all rolled back if one of them fails.
+export async function batch(
+    requests: BatchRequest[],
+    atomic = false
+): Promise<BatchResponse[]> {
+    const response = await fetch(`${getBaseUrl()}/api/batch/`, {
+        method: "POST",
+        credentials: "include",
+        headers: {
+            "Content-Type": "application/json",
+            ...getAuthHeaders(),
+        },
+        body: JSON.stringify({ requests, atomic }),
+    });
+    const data = await handleResponse<{ responses: BatchResponse[] }>(response);
+    return data.responses;
+}
+
 // --- Auth Helper Functions ---
 
 function getAuthHeaders(): Record<string, string> {
@@ -106,6 +141,20 @@ export async function getNodes(
     return handleResponse<GetNodesResponse>(response);
 }
 
+export async function getNodesForCourses(
+    courseIds: (string | number)[]
+): Promise<{ courses: Record<string, GetNodesResponse> }> {
+    const ids = courseIds.map(String).join(",");
+    const response = await fetch(`${getApiBase()}/get_nodes/?courseIds=${ids}`, {
+        credentials: "include",
+        headers: {
+            "Content-Type": "application/json",
+            ...getAuthHeaders(),
+        },
+    });
+    return handleResponse<{ courses: Record<string, GetNodesResponse> }>(response);
+}
+
 export async function createRelation(
     node1_id: number,
     node2_id: number,
@@ -320,15 +369,44 @@ export async function getProgramInfo(): Promise<{ lecturers: User[] }> {
   return handleResponse<{ lecturers: User[] }>(response);
 }
 
-export async function getCourses(): Promise<Course[]> {
-  const response = await fetch(`${getBaseUrl()}/api/programs/list_courses/`, {
-    credentials: "include",
-    headers: {
-      "Content-Type": "application/json",
-      ...getAuthHeaders(),
-    },
+export interface CoursePage {
+  results: Course[];
+  next_cursor: string | null;
+}
+
+export async function getCoursePage(params: {
+  cursor?: string;
+  limit?: number;
+  name?: string;
+  lecturer?: string;
+} = {}): Promise<CoursePage> {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== "") query.set(key, String(value));
   });
-  return handleResponse<Course[]>(response);
+  const response = await fetch(
+    `${getBaseUrl()}/api/programs/list_courses/?${query.toString()}`,
+    {
+      credentials: "include",
+      headers: {
+        "Content-Type": "application/json",
+        ...getAuthHeaders(),
+      },
+    }
+  );
+  return handleResponse<CoursePage>(response);
+}
+
+// Walks every page of list_courses
+export async function getCourses(): Promise<Course[]> {
+  const courses: Course[] = [];
+  let cursor: string | undefined;
+  do {
+    const page = await getCoursePage({ cursor, limit: 200 });
+    courses.push(...page.results);
+    cursor = page.next_cursor ?? undefined;
+  } while (cursor);
+  return courses;
 }
 
 export interface User {
@@ -565,8 +643,12 @@ export interface Course {
   id: string;
   name: string;
   lecturer?: string;
+  lecturer_name?: string;
   university?: string;
   department?: string;
+  course_content_count?: number;
+  course_outcome_count?: number;
+  relation_count?: number;
 }
 
 export async function requestPasswordReset(email: string): Promise<{ message: string }> {
@@ -4,6 +4,7 @@ import { Avatar, Button, Group, Menu, Text } from "@mantine/core";
 import Link from "next/link";
 import { usePathname, useRouter } from "next/navigation";
 import { Suspense, useEffect, useState } from "react";
+import { getCourses } from "./apiClient";
 import { AuthProvider, useAuth } from "./AuthContext";
 import NewItemButton from "./NewItemButton";
 import UploadCSVButton from "./UploadCSVButton";
@@ -24,27 +25,7 @@ function HeaderContent() {
   useEffect(() => {
     if (user && pathname === "/graph") {
       setLoadingCourses(true);
-      const endpoint = "/api/programs/list_courses/";
-      const url = `${
-        process.env.NEXT_PUBLIC_API_URL || "http://127.0.0.1:8000"
-      }${endpoint}`;
-
-      // Get auth token
-      const token = localStorage.getItem("auth_token");
-
-      fetch(url, {
-        credentials: "include",
-        headers: {
-          "Content-Type": "application/json",
-          ...(token ? { Authorization: `Token ${token}` } : {}),
-        },
-      })
-        .then(async (res) => {
-          if (!res.ok) {
-            throw new Error(`HTTP error! status: ${res.status}`);
-          }
-          return res.json();
-        })
+      getCourses()
         .then((data) => {
           // Filter courses for lecturer if needed
           if (user.role === "lecturer" && user.courses) {